@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Column storage for JSON Lines recipe catalogs (one recipe object per line).
+# A catalog is reduced to what planning needs up front: recipe ids, the byte
+# offset of every line, meal-type and tag masks, and a (recipes x nutrients)
+# float64 matrix (NaN where a recipe lacks a nutrient). Titles, ingredients
+# and the rest are read back from the catalog line on demand.
+#
+# `compile_catalog` stores those columns next to the catalog (<name>.npy with
+# the nutrients, memory-mapped and shared by all workers on a host, plus
+# <name>.index.npz; named after the full file name, never just its stem) so
+# opening a catalog doesn't parse it; without a compiled index that matches
+# the file, `load_catalog` streams the catalog once instead.
+
+CATALOG_INDEX_FORMAT = 1
+
+
+def compiled_catalog_paths(path: Path) -> Tuple[Path, Path]:
+    """Where the compiled columns of the catalog at `path` live: (nutrient matrix .npy, index .npz)."""
+    return path.with_name(path.name + ".npy"), path.with_name(path.name + ".index.npz")
+
+
+class CatalogColumns:
+    """The columns of one JSON Lines catalog (see the module comment)."""
+
+    def __init__(self, ids: List[str], offsets: np.ndarray, meal_names: List[str], meals: np.ndarray,
+                 tag_names: List[str], tags: np.ndarray, nutrient_keys: List[str], values: np.ndarray,
+                 common_keys: bool, sha256: str):
+        self.ids = ids
+        self.offsets = offsets  # n + 1 entries; line i is bytes offsets[i]:offsets[i + 1]
+        self.meal_names = meal_names
+        self.meals = meals  # (n x len(meal_names)) bool
+        self.tag_names = tag_names
+        self.tags = tags  # (n x len(tag_names)) bool
+        self.nutrient_keys = nutrient_keys  # in order of first appearance
+        self.values = values  # (n x len(nutrient_keys)) float64, NaN = missing
+        self.common_keys = common_keys  # every recipe has exactly `nutrient_keys`, in that order
+        self.sha256 = sha256
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _flags(names: Dict[str, int], rows: List[List[int]]) -> np.ndarray:
+    out = np.zeros((len(rows), len(names)), dtype=bool)
+    for i, cols in enumerate(rows):
+        out[i, cols] = True
+    return out
+
+
+def scan_catalog(path: Path) -> CatalogColumns:
+    """Read the columns of the catalog at `path` in one streaming pass (no recipe is kept)."""
+    sha = hashlib.sha256()
+    ids: List[str] = []
+    offsets: List[int] = []
+    meal_col: Dict[str, int] = {}
+    tag_col: Dict[str, int] = {}
+    key_col: Dict[str, int] = {}
+    meal_rows: List[List[int]] = []
+    tag_rows: List[List[int]] = []
+    first_keys: Optional[Tuple[str, ...]] = None
+    common_keys = True
+    values = np.full((1024, 32), np.nan)
+    pos = 0
+    with open(path, "rb") as f:
+        for line in f:
+            sha.update(line)
+            start, pos = pos, pos + len(line)
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            i = len(ids)
+            ids.append(r["recipe_id"])
+            offsets.append(start)
+            meal_rows.append([meal_col.setdefault(m, len(meal_col)) for m in r["meal_types"]])
+            tag_rows.append([tag_col.setdefault(t, len(tag_col)) for t in r["tags"]])
+            nutrients = r["nutrients_per_serving"]
+            keys = tuple(nutrients)
+            if first_keys is None:
+                first_keys = keys
+            elif keys != first_keys:
+                common_keys = False
+            cols = [key_col.setdefault(k, len(key_col)) for k in keys]
+            if i >= values.shape[0] or len(key_col) > values.shape[1]:
+                grown = np.full((max(values.shape[0], 2 * i + 1), max(values.shape[1], 2 * len(key_col))), np.nan)
+                grown[:values.shape[0], :values.shape[1]] = values
+                values = grown
+            values[i, cols] = [float(v) for v in nutrients.values()]
+    offsets.append(pos)
+    return CatalogColumns(
+        ids=ids,
+        offsets=np.array(offsets, dtype=np.int64),
+        meal_names=list(meal_col),
+        meals=_flags(meal_col, meal_rows),
+        tag_names=list(tag_col),
+        tags=_flags(tag_col, tag_rows),
+        nutrient_keys=list(key_col),
+        values=np.ascontiguousarray(values[:len(ids), :len(key_col)]),
+        common_keys=common_keys,
+        sha256=sha.hexdigest(),
+    )
+
+
+def compile_catalog(path: Path, source: Optional[Path] = None) -> Tuple[Path, Path]:
+    """Write the compiled columns (.npy + .index.npz) of the catalog at `path` next to it.
+
+    With `source`, the columns are read from that file instead: a temp file
+    about to be renamed to `path` (the rename keeps size and mtime, so the
+    index matches `path` from the moment it appears).
+    """
+    source = source or path
+    st = source.stat()
+    columns = scan_catalog(source)
+    npy_path, index_path = compiled_catalog_paths(path)
+    header = {
+        "format": CATALOG_INDEX_FORMAT,
+        "source": {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": columns.sha256},
+        "meal_names": columns.meal_names,
+        "tag_names": columns.tag_names,
+        "nutrient_keys": columns.nutrient_keys,
+        "common_keys": columns.common_keys,
+    }
+    # write to temp files and rename so running workers never see a half-written artifact
+    tmp_npy = npy_path.with_name(npy_path.name + ".tmp")
+    with open(tmp_npy, "wb") as f:
+        np.save(f, columns.values)
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_index, "wb") as f:
+        np.savez(f, header=np.array(json.dumps(header, ensure_ascii=False)), ids=np.array(columns.ids, dtype=str),
+                 offsets=columns.offsets, meals=columns.meals, tags=columns.tags)
+    os.replace(tmp_npy, npy_path)
+    os.replace(tmp_index, index_path)
+    return npy_path, index_path
+
+
+def load_compiled_catalog(path: Path) -> Optional[CatalogColumns]:
+    """The compiled columns of `path`, or None if there are none or they describe another file."""
+    npy_path, index_path = compiled_catalog_paths(path)
+    if not (npy_path.exists() and index_path.exists()):
+        return None
+    try:
+        with np.load(index_path) as index:
+            header: Dict[str, Any] = json.loads(str(index["header"]))
+            arrays = {k: index[k] for k in ("ids", "offsets", "meals", "tags")}
+    except (OSError, ValueError, KeyError):
+        return None
+    src = header.get("source", {})
+    if header.get("format") != CATALOG_INDEX_FORMAT or not path.exists():
+        return None
+    st = path.stat()
+    if src.get("size") != st.st_size:
+        return None
+    # mtime is the cheap check; fall back to the content hash (e.g. after a fresh checkout)
+    if src.get("mtime_ns") != st.st_mtime_ns and src.get("sha256") != hashlib.sha256(path.read_bytes()).hexdigest():
+        return None
+    values = np.load(npy_path, mmap_mode="r")
+    n = len(arrays["ids"])
+    if values.shape != (n, len(header["nutrient_keys"])) or arrays["offsets"].shape != (n + 1,):
+        return None
+    return CatalogColumns(
+        ids=arrays["ids"].tolist(),
+        offsets=arrays["offsets"],
+        meal_names=header["meal_names"],
+        meals=arrays["meals"],
+        tag_names=header["tag_names"],
+        tags=arrays["tags"],
+        nutrient_keys=header["nutrient_keys"],
+        values=values,
+        common_keys=header["common_keys"],
+        sha256=src["sha256"],
+    )
+
+
+def load_catalog(path: Path) -> CatalogColumns:
+    """Compiled columns when they match the catalog, else a streaming scan of it."""
+    columns = load_compiled_catalog(path)
+    return columns if columns is not None else scan_catalog(path)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import inspect
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+# Argument grammars shared by the chat commands. Named groups become extra
+# handler arguments (a date also yields its month).
+MONTH = r"(?P<month>\d{4}-\d{2})"
+DATE = r"(?P<date>(?P<month>\d{4}-\d{2})-\d{2})"
+
+
+@dataclass(frozen=True)
+class Arg:
+    """One positional argument of a chat command.
+
+    `pattern` must match the whole token; its named groups (or, without
+    groups, the token itself under `name`) are passed to the handler.
+    `choices` maps lowercased aliases to values instead. Missing arguments
+    use `default()` or, if there is none, the command's usage reply.
+    `error` is the reply for a token that doesn't match (default: usage).
+    """
+
+    name: str
+    pattern: Optional[str] = None
+    choices: Optional[Dict[str, str]] = None
+    default: Optional[Callable[[], str]] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Command:
+    name: str
+    aliases: Tuple[str, ...]
+    args: Tuple[Arg, ...]
+    handler: Callable[..., Any]
+    usage: str
+    is_async: bool = False
+    _matchers: List[Optional["re.Pattern[str]"]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.is_async = inspect.iscoroutinefunction(self.handler)
+        self._matchers = [re.compile(a.pattern) if a.pattern else None for a in self.args]
+
+    def bind(self, tokens: Sequence[str]) -> Dict[str, str]:
+        """Handler kwargs for the argument tokens; raises UsageError."""
+        kwargs: Dict[str, str] = {}
+        for i, (arg, matcher) in enumerate(zip(self.args, self._matchers)):
+            if i < len(tokens):
+                token = tokens[i]
+            elif arg.default is not None:
+                token = arg.default()
+            else:
+                raise UsageError(self.usage)
+            if arg.choices is not None:
+                value = arg.choices.get(token.lower())
+                if value is None:
+                    raise UsageError(arg.error or self.usage)
+                kwargs[arg.name] = value
+                continue
+            m = matcher.fullmatch(token) if matcher is not None else None
+            if matcher is not None and m is None:
+                raise UsageError(arg.error or self.usage)
+            groups = {k: v for k, v in m.groupdict().items() if v is not None} if m is not None else {}
+            kwargs.update(groups or {arg.name: token})
+        return kwargs
+
+
+class UsageError(Exception):
+    """A command was recognized but its arguments don't fit; the message is the reply."""
+
+
+class CommandRouter:
+    """Declarative chat command registry: alias -> command dispatch table, argument grammars compiled once.
+
+    Async handlers are awaited; sync handlers (session store, grocery lists,
+    ...) run in the threadpool, as sync endpoints do, so they never block the
+    event loop. Every dispatch is timed per command (unknown and empty
+    messages included); see `stats()`.
+    """
+
+    def __init__(self, empty_reply: str, unknown_reply: str):
+        self.empty_reply = empty_reply
+        self.unknown_reply = unknown_reply
+        self.commands: List[Command] = []
+        self._table: Dict[str, Command] = {}
+        self._stats: Dict[str, List[float]] = {}  # name -> [calls, usage errors, total ms, max ms]
+        self._lock = threading.Lock()
+
+    def command(self, name: str, *aliases: str, args: Sequence[Arg] = (), usage: Optional[str] = None):
+        """Register the decorated handler(context, **args) under `name` and `aliases` (case-insensitive)."""
+        def register(handler: Callable[..., Any]) -> Callable[..., Any]:
+            cmd = Command(name, tuple(aliases), tuple(args), handler, usage or f"Formato: {name}")
+            for alias in (name, *aliases):
+                if alias.lower() in self._table:
+                    raise ValueError(f"Chat command alias registered twice: {alias}")
+                self._table[alias.lower()] = cmd
+            self.commands.append(cmd)
+            return handler
+        return register
+
+    def parse(self, text: str) -> Tuple[Optional[Command], Dict[str, str]]:
+        """(command, handler kwargs) for a message; (None, {}) if the command is unknown. Raises UsageError."""
+        parts = text.split()
+        if not parts:
+            return None, {}
+        cmd = self._table.get(parts[0].lower())
+        if cmd is None:
+            return None, {}
+        return cmd, cmd.bind(parts[1:])
+
+    async def dispatch(self, text: str, context: Any) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        name = "empty"
+        usage_error = False
+        try:
+            text = text.strip()
+            if not text:
+                return {"reply": self.empty_reply}
+            try:
+                cmd, kwargs = self.parse(text)
+            except UsageError as e:
+                name = self._table[text.split()[0].lower()].name
+                usage_error = True
+                return {"reply": str(e)}
+            if cmd is None:
+                name = "unknown"
+                return {"reply": self.unknown_reply}
+            name = cmd.name
+            if cmd.is_async:
+                return await cmd.handler(context, **kwargs)
+            return await run_in_threadpool(cmd.handler, context, **kwargs)
+        finally:
+            self._record(name, usage_error, (time.perf_counter() - t0) * 1000.0)
+
+    def _record(self, name: str, usage_error: bool, ms: float) -> None:
+        with self._lock:
+            s = self._stats.setdefault(name, [0, 0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += usage_error
+            s[2] += ms
+            s[3] = max(s[3], ms)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per command: calls, usage_errors, mean_ms, max_ms, total_ms."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": int(calls),
+                    "usage_errors": int(errors),
+                    "mean_ms": round(total / calls, 4) if calls else 0.0,
+                    "max_ms": round(peak, 4),
+                    "total_ms": round(total, 4),
+                }
+                for name, (calls, errors, total, peak) in self._stats.items()
+            }
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .inventory import build_grocery_list
+from .metrics import STAGE_SECONDS
+from .nutrition import get_nutrition_db
+from .optimizer import optimize_month_plan
+from .planner import build_month_plan, build_month_plans, get_recipe_book
+
+
+class PlannerBusy(Exception):
+    """Too many planning jobs queued; callers should answer 503."""
+
+
+# -- jobs (run in a pool worker, or inline) ------------------------------------
+
+
+def _warm() -> None:
+    get_nutrition_db()
+    get_recipe_book()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def plan_month(yyyy_mm: str, user_profile: Dict[str, Any], solver: str = "greedy",
+               time_budget_ms: float = 300.0) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Month plan plus its grocery list (see inventory.build_grocery_list)."""
+    book = get_recipe_book()
+    if solver == "optimize":
+        month_plan = optimize_month_plan(yyyy_mm, user_profile, book, time_budget_ms=time_budget_ms)
+    else:
+        month_plan = build_month_plan(yyyy_mm, user_profile, book)
+    return month_plan, build_grocery_list(month_plan, book, get_nutrition_db())
+
+
+def split_time_budget(solvers: Sequence[Tuple[str, float]], total_ms: float) -> List[Tuple[str, float]]:
+    """Scale the "optimize" budgets of one batch down so that together they stay within `total_ms`.
+
+    A batch is one planner job whose optimizer runs go one after another, so
+    without a cap a large batch could hold its planner slot for hours.
+    """
+    asked = sum(budget for solver, budget in solvers if solver == "optimize")
+    if asked <= total_ms:
+        return list(solvers)
+    scale = total_ms / asked
+    return [(solver, int(budget * scale) if solver == "optimize" else budget) for solver, budget in solvers]
+
+
+def plan_months(jobs: Sequence[Tuple[str, Dict[str, Any]]],
+                solvers: Optional[Sequence[Tuple[str, float]]] = None) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any], float]], float]:
+    """Batched `plan_month`: ([(month_plan, grocery, grocery_ms)], planning_ms).
+
+    `solvers` gives (solver, time_budget_ms) per job; "optimize" jobs start
+    from their batched greedy plan.
+    """
+    book = get_recipe_book()
+    db = get_nutrition_db()
+    t0 = time.perf_counter()
+    plans = build_month_plans(jobs, book)
+    for i, (solver, budget) in enumerate(solvers or ()):
+        if solver == "optimize":
+            yyyy_mm, profile = jobs[i]
+            plans[i] = optimize_month_plan(yyyy_mm, profile, book, time_budget_ms=budget, initial=plans[i])
+    plan_ms = (time.perf_counter() - t0) * 1000.0
+    out = []
+    for plan in plans:
+        t = time.perf_counter()
+        grocery = build_grocery_list(plan, book, db)
+        out.append((plan, grocery, (time.perf_counter() - t) * 1000.0))
+    return out, plan_ms
+
+
+# -- executor ------------------------------------------------------------------
+
+
+class PlannerExecutor:
+    """Runs CPU-bound planning jobs off the event loop.
+
+    With `max_workers` > 0 jobs go to a ProcessPoolExecutor whose workers
+    load NutritionDB/RecipeBook once at start-up; with 0 they run inline in
+    the threadpool (previous behaviour). At most `max_pending` jobs may be
+    queued or running; beyond that `run` (and `reserve`) raise PlannerBusy.
+    """
+
+    def __init__(self, max_workers: int = 0, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self.max_workers <= 0 or self._pool is not None:
+            return
+        # spawn, not fork: the parent already runs threads (event loop, session flusher)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm,
+        )
+        # start every worker now so the first requests don't pay for the warm-up
+        for f in [self._pool.submit(_ping) for _ in range(self.max_workers)]:
+            f.result()
+
+    @property
+    def inline(self) -> bool:
+        """True when jobs run in this process (no pool)."""
+        return self._pool is None
+
+    def reserve(self, name: str) -> Callable[[], None]:
+        """Count a job the caller runs itself (e.g. a streamed plan) against `max_pending`.
+
+        Raises PlannerBusy like `run`; returns the release function, which
+        is safe to call more than once.
+        """
+        if self.pending >= self.max_pending:
+            raise PlannerBusy(f"{self.pending} planning jobs pending")
+        self.pending += 1
+        t0 = time.perf_counter()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.pending -= 1
+                STAGE_SECONDS.observe(time.perf_counter() - t0, f"job:{name}")
+        return release
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            raise PlannerBusy(f"{self.pending} planning jobs pending")
+        self.pending += 1
+        t0 = time.perf_counter()
+        try:
+            if self._pool is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            # queueing included; with a process pool the inner stages are timed in the workers, not here
+            STAGE_SECONDS.observe(time.perf_counter() - t0, f"job:{fn.__name__}")
+
+
+def create_planner_executor() -> PlannerExecutor:
+    """PlannerExecutor sized by $MEALBOT_PLANNER_WORKERS (default 0 = inline) and $MEALBOT_PLANNER_MAX_PENDING."""
+    return PlannerExecutor(
+        max_workers=int(os.environ.get("MEALBOT_PLANNER_WORKERS", "0")),
+        max_pending=int(os.environ.get("MEALBOT_PLANNER_MAX_PENDING", "64")),
+    )
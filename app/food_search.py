@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _trigrams(s: str) -> Set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class FoodSearchIndex:
+    """Search index over lowercased food names; results are row numbers.
+
+    - `search`: substring/regex match with exactly the semantics (and dataset
+      order) of the old pandas `str.contains` scan. Literal queries of 3+
+      characters only verify the rows in the rarest trigram's postings list.
+    - `search_tokens`: every query token must prefix-match a name token (AND),
+      results ranked.
+    - `search_many`: resolves a batch of `search` queries, sharing one scan of
+      the names for the queries the trigram postings can't serve.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names: List[str] = [n.lower() for n in names]
+        self._grams: Dict[str, List[int]] = {}
+        self._tokens: Dict[str, List[int]] = {}
+        self._name_tokens: List[List[str]] = []
+        for i, name in enumerate(self.names):
+            for g in _trigrams(name):
+                self._grams.setdefault(g, []).append(i)
+            toks = _TOKEN_RE.findall(name)
+            self._name_tokens.append(toks)
+            for t in set(toks):
+                self._tokens.setdefault(t, []).append(i)
+        self._vocab: List[str] = sorted(self._tokens)
+
+    # -- substring ---------------------------------------------------------
+
+    def _candidates(self, q: str) -> Optional[List[int]]:
+        """Rows that may contain literal `q`, ascending; None means "scan everything"."""
+        if len(q) < 3 or _REGEX_META.intersection(q):
+            return None
+        best: Optional[List[int]] = None
+        for g in _trigrams(q):
+            posting = self._grams.get(g)
+            if posting is None:
+                return []
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best
+
+    def search(self, query: str, limit: int = 10, ranked: bool = False) -> List[int]:
+        return self.search_many([query], limit=limit, ranked=ranked)[0]
+
+    def search_many(self, queries: Iterable[str], limit: int = 10, ranked: bool = False) -> List[List[int]]:
+        queries = list(queries)
+        resolved: Dict[str, List[int]] = {}
+        scans: Dict[str, "re.Pattern[str]"] = {}
+        for query in queries:
+            q = query.lower()
+            if q in resolved or q in scans:
+                continue
+            cand = self._candidates(q)
+            if cand is None:
+                scans[q] = re.compile(q)
+                resolved[q] = []
+                continue
+            hits: List[int] = []
+            for i in cand:
+                if q in self.names[i]:
+                    hits.append(i)
+                    if not ranked and len(hits) >= limit:
+                        break
+            resolved[q] = hits
+
+        if scans:
+            open_scans = dict(scans)
+            for i, name in enumerate(self.names):
+                done = []
+                for q, pat in open_scans.items():
+                    if pat.search(name):
+                        hits = resolved[q]
+                        hits.append(i)
+                        if not ranked and len(hits) >= limit:
+                            done.append(q)
+                for q in done:
+                    del open_scans[q]
+                if not open_scans:
+                    break
+
+        out = []
+        for query in queries:
+            q = query.lower()
+            hits = resolved[q]
+            if ranked:
+                hits = sorted(hits, key=lambda i: self._substring_rank(q, i))
+            out.append(hits[:max(limit, 0)])
+        return out
+
+    def _substring_rank(self, q: str, i: int):
+        name = self.names[i]
+        pos = name.find(q)
+        if pos < 0:  # regex query; keep dataset order among these
+            return (1, 0, len(name), i)
+        at_boundary = pos == 0 or not name[pos - 1].isalnum()
+        return (0 if at_boundary else 1, pos, len(name), i)
+
+    # -- tokens ------------------------------------------------------------
+
+    def _prefix_rows(self, prefix: str) -> Set[int]:
+        rows: Set[int] = set()
+        j = bisect_left(self._vocab, prefix)
+        while j < len(self._vocab) and self._vocab[j].startswith(prefix):
+            rows.update(self._tokens[self._vocab[j]])
+            j += 1
+        return rows
+
+    def search_tokens(self, query: str, limit: int = 10) -> List[int]:
+        """Rows where every query token prefix-matches some name token, best first.
+
+        Ranking: more exact token matches, then earlier matches in the name,
+        then shorter names, then dataset order.
+        """
+        q_tokens = _TOKEN_RE.findall(query.lower())
+        if not q_tokens:
+            return []
+        rows: Optional[Set[int]] = None
+        for t in sorted(set(q_tokens), key=len, reverse=True):
+            found = self._prefix_rows(t)
+            rows = found if rows is None else rows & found
+            if not rows:
+                return []
+
+        def rank(i: int):
+            toks = self._name_tokens[i]
+            exact = sum(1 for t in q_tokens if t in toks)
+            first = sum(next(p for p, nt in enumerate(toks) if nt.startswith(t)) for t in q_tokens)
+            return (-exact, first, len(toks), i)
+
+        return sorted(rows, key=rank)[:max(limit, 0)]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from .metrics import timed
 from .planner import RecipeBook
 
 
@@ -25,6 +28,7 @@ def _load_packaging_rules() -> Dict[str, Any]:
 _PACKAGING = _load_packaging_rules()
 
 
+@timed("aggregate_grocery_list")
 def aggregate_grocery_list(month_plan: Dict[str, Any], recipe_book: RecipeBook) -> Dict[str, float]:
     """Return total grams per food_key required for the whole month."""
     totals: Dict[str, float] = {}
@@ -99,25 +103,145 @@ def round_for_purchase(food_key: str, grams: float, food_name: Optional[str] = N
     return f"{kg:.1f} kg"
 
 
+@timed("grocery_list_items")
 def grocery_list_items(totals: Dict[str, float], nutrition_db) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     for fk, g in totals.items():
-        row = nutrition_db.get_food_row(fk)
-        name = row["food"]
+        name = nutrition_db.food_name(fk)
         items.append({
             "food_key": fk,
             "name": name,
             "total_grams": g,
             "rounded_purchase_qty": round_for_purchase(fk, g, food_name=name),
+            "notes": None,
         })
     items.sort(key=lambda x: x["name"])
     return items
 
 
-def apply_meal_to_inventory(recipe, servings: float, inventory: Dict[str, float]) -> Dict[str, float]:
-    inv = inventory.copy()
+def build_grocery_list(month_plan: Dict[str, Any], recipe_book: RecipeBook, nutrition_db) -> Dict[str, Any]:
+    """Totals, display items and an ETag for a plan; cache it alongside the plan."""
+    totals = aggregate_grocery_list(month_plan, recipe_book)
+    items = grocery_list_items(totals, nutrition_db)
+    digest = hashlib.sha256(json.dumps(items, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return {"totals": totals, "items": items, "etag": f'"{digest[:32]}"'}
+
+
+# -- consumption ledger -------------------------------------------------------
+#
+# Each session keeps its current `inventory` plus an append-only `ledger` of
+# events. Every event records the deltas it actually applied (grams, negative
+# for consumption), so the inventory can be updated in place per food_key,
+# undone/replayed without going back to the plan, and re-materialized at any
+# point by folding the deltas over the initial totals.
+
+
+def meal_usage(recipe, servings: float) -> Dict[str, float]:
+    """Grams per food_key used by `servings` of `recipe`."""
+    usage: Dict[str, float] = {}
     for ing in recipe.ingredients:
         fk = str(ing["food_key"])
-        used = float(ing["grams"]) * float(servings)
-        inv[fk] = round(max(0.0, float(inv.get(fk, 0.0)) - used), 1)
-    return inv
+        usage[fk] = usage.get(fk, 0.0) + float(ing["grams"]) * float(servings)
+    return usage
+
+
+def consume(usage: Dict[str, float], inventory: Dict[str, float]) -> Dict[str, float]:
+    """Subtract `usage` from `inventory` in place (clamped at 0); return the applied deltas."""
+    deltas: Dict[str, float] = {}
+    for fk, used in usage.items():
+        before = float(inventory.get(fk, 0.0))
+        after = round(max(0.0, before - used), 1)
+        inventory[fk] = after
+        deltas[fk] = round(after - before, 1)
+    return deltas
+
+
+def _give_back(deltas: Dict[str, float], inventory: Dict[str, float]) -> Dict[str, float]:
+    """Reverse consumption `deltas` in place; return the applied (positive) deltas."""
+    applied: Dict[str, float] = {}
+    for fk, d in deltas.items():
+        before = float(inventory.get(fk, 0.0))
+        after = round(before - d, 1)
+        inventory[fk] = after
+        applied[fk] = round(after - before, 1)
+    return applied
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def ledger_append(ledger: List[Dict[str, Any]], kind: str, deltas: Dict[str, float], **fields: Any) -> Dict[str, Any]:
+    event = {"seq": len(ledger) + 1, "ts": _now(), "kind": kind, **fields, "deltas": deltas}
+    ledger.append(event)
+    return event
+
+
+def _cook_event(ledger: List[Dict[str, Any]], seq: int) -> Dict[str, Any]:
+    if not 1 <= seq <= len(ledger) or ledger[seq - 1]["kind"] != "cook":
+        raise KeyError(f"No cook event with seq {seq}")
+    return ledger[seq - 1]
+
+
+def _is_applied(ledger: List[Dict[str, Any]], seq: int) -> bool:
+    applied = False
+    for ev in ledger:
+        if ev["seq"] == seq:
+            applied = True
+        elif ev.get("target_seq") == seq:
+            applied = ev["kind"] == "replay"
+    return applied
+
+
+def record_cook(ledger: List[Dict[str, Any]], inventory: Dict[str, float], recipe, servings: float, **fields: Any) -> Dict[str, Any]:
+    """Consume a cooked meal from `inventory` in place and log it."""
+    usage = meal_usage(recipe, servings)
+    deltas = consume(usage, inventory)
+    return ledger_append(ledger, "cook", deltas, recipe_id=recipe.recipe_id, servings=float(servings),
+                         usage={k: round(v, 1) for k, v in usage.items()}, **fields)
+
+
+def undo_cook(ledger: List[Dict[str, Any]], inventory: Dict[str, float], seq: int) -> Dict[str, Any]:
+    """Give back what cook event `seq` actually removed; logged as an "undo" event."""
+    _cook_event(ledger, seq)
+    if not _is_applied(ledger, seq):
+        raise ValueError(f"Cook event {seq} is already undone")
+    deltas = _give_back(_last_deltas(ledger, seq), inventory)
+    return ledger_append(ledger, "undo", deltas, target_seq=seq)
+
+
+def replay_cook(ledger: List[Dict[str, Any]], inventory: Dict[str, float], seq: int) -> Dict[str, Any]:
+    """Re-apply the recorded usage of an undone cook event; logged as a "replay" event."""
+    target = _cook_event(ledger, seq)
+    if _is_applied(ledger, seq):
+        raise ValueError(f"Cook event {seq} is currently applied")
+    deltas = consume(target["usage"], inventory)
+    return ledger_append(ledger, "replay", deltas, target_seq=seq)
+
+
+def _last_deltas(ledger: List[Dict[str, Any]], seq: int) -> Dict[str, float]:
+    """Deltas of the most recent application (cook or replay) of event `seq`."""
+    deltas = ledger[seq - 1]["deltas"]
+    for ev in ledger[seq:]:
+        if ev["kind"] == "replay" and ev.get("target_seq") == seq:
+            deltas = ev["deltas"]
+    return deltas
+
+
+def inventory_snapshot(initial: Dict[str, float], ledger: List[Dict[str, Any]], upto_seq: Optional[int] = None,
+                       at: Optional[datetime] = None) -> Tuple[Dict[str, float], int]:
+    """Materialize the inventory after event `upto_seq` and/or as of time `at` (default: now).
+
+    Returns the inventory and the seq of the last event folded in (0 = none).
+    """
+    inv = dict(initial)
+    last = 0
+    for ev in ledger:
+        if upto_seq is not None and ev["seq"] > upto_seq:
+            break
+        if at is not None and datetime.fromisoformat(ev["ts"]) > at:
+            break
+        for fk, d in ev["deltas"].items():
+            inv[fk] = round(float(inv.get(fk, 0.0)) + d, 1)
+        last = ev["seq"]
+    return inv, last
@@ -3,7 +3,10 @@ from __future__ import annotations
 import os
 from typing import List, Dict, Any
 
+from .metrics import timed
 
+
+@timed("render_recipe_basic")
 def render_recipe_basic(title: str, ingredients: List[Dict[str, Any]], max_minutes: int = 35) -> str:
     lines = [f"{title}", f"Tempo stimato: {max_minutes} min", "", "Ingredienti:"]
     for ing in ingredients:
@@ -1,18 +1,54 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import concurrent.futures
+import os
+import re
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from typing import Dict, Any
-from datetime import date
-
-from .models import StartMonthRequest, StartMonthResponse, CookMealRequest, CookMealResponse, ChatMessageRequest, ChatMessageResponse
-from .nutrition import NutritionDB
-from .planner import build_month_plan, RecipeBook
-from .inventory import aggregate_grocery_list, grocery_list_items, apply_meal_to_inventory
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, Any, Optional
+from datetime import date, datetime, timezone
+import json
+import time
+
+from .models import (
+    StartMonthRequest, StartMonthResponse, BatchStartMonthRequest, BatchStartMonthResponse, CookMealRequest, CookMealResponse, ChatMessageRequest, ChatMessageResponse,
+    DayPlan, GroceryItem, GroceryList, LedgerEventRequest, InventoryChangeResponse, InventorySnapshotResponse,
+)
+from .nutrition import get_nutrition_db
+from .planner import day_index, find_day, get_recipe_book, iter_month_days
+from .executor import PlannerBusy, create_planner_executor, plan_month, plan_months, split_time_budget
+from .inventory import build_grocery_list, record_cook, undo_cook, replay_cook, inventory_snapshot
 from .llm_recipes import render_recipe_basic
+from .sessions import create_session_store
+from .plan_cache import create_plan_cache, plan_key
+from .responses import FastJSONResponse, model_response
+from .chat_commands import DATE, MONTH, Arg, CommandRouter
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as metrics, MetricsMiddleware
+from .profiling import ProfilingMiddleware, SlowRequestLog, is_admin, profile_directory, profiling_active
+
+# CPU-bound planning runs through this executor (process pool when
+# MEALBOT_PLANNER_WORKERS > 0, otherwise the threadpool).
+planner_executor = create_planner_executor()
+# Total optimizer time of one /start_month/batch (its items' budgets are scaled down to fit).
+BATCH_TIME_BUDGET_MS = float(os.environ.get("MEALBOT_BATCH_TIME_BUDGET_MS", "10000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    planner_executor.start()
+    yield
+    planner_executor.shutdown()
+    sessions.close()
 
-app = FastAPI(title="MealPlanner Chatbot Backend", version="0.1.0")
+
+app = FastAPI(title="MealPlanner Chatbot Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS
 #
@@ -29,89 +65,426 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# per-route latency histograms for /metrics (outermost: times CORS handling too)
+app.add_middleware(MetricsMiddleware)
 
-db = NutritionDB()
-book = RecipeBook()
+# Admin tools (profiling, slow-request log) exist only when MEALBOT_ADMIN_TOKEN
+# is set; otherwise the middleware is not even installed.
+ADMIN_TOKEN = os.environ.get("MEALBOT_ADMIN_TOKEN") or None
+PROFILE_DIR = profile_directory()
+slow_requests = SlowRequestLog(size=int(os.environ.get("MEALBOT_SLOW_LOG_SIZE", "20")))
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware, token=ADMIN_TOKEN, directory=PROFILE_DIR, slow_log=slow_requests)
 
-# Simple in-memory session store (replace with DB for production)
-SESSIONS: Dict[str, Dict[str, Any]] = {}
+db = get_nutrition_db()
+# Shared catalog; get_recipe_book() hot-reloads it when the recipes file changes.
+get_recipe_book()
 
+# Plan state per (session_id, month); MEALBOT_SESSION_STORE picks the backend
+# (in-memory LRU by default, sqlite:///... to share state between workers).
+sessions = create_session_store()
 
-def _session_key(month: str) -> str:
-    return month
+# Finished (plan, grocery) pairs by month + profile + catalog/dataset version;
+# identical /start_month requests skip the planner entirely.
+plan_cache = create_plan_cache()
 
 
-@app.post("/start_month", response_model=StartMonthResponse)
-def start_month(req: StartMonthRequest):
-    user_profile = req.user_profile.model_dump()
-    month_plan = build_month_plan(req.month, user_profile)
-    totals = aggregate_grocery_list(month_plan, book)
-    items = grocery_list_items(totals, db)
-    inventory = totals.copy()
+def _require_session(sess: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if sess is None:
+        raise HTTPException(status_code=404, detail="Month not initialized. Call /start_month first")
+    return sess
+
+
+def _get_session(session_id: str, month: str) -> Dict[str, Any]:
+    return _require_session(sessions.get(session_id, month))
+
+
+def _catalog_recipe(book, recipe_id: str):
+    """A recipe a stored plan refers to; 409 if a catalog reload removed it since the plan was made."""
+    if recipe_id not in book.by_id:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Recipe {recipe_id} is no longer in the catalog: replan this month with /start_month",
+        )
+    return book.by_id[recipe_id]
+
+
+def _grocery(session_id: str, month: str, sess: Dict[str, Any]) -> Dict[str, Any]:
+    """The session's cached grocery list; computed on first use for sessions stored without one."""
+    grocery = sess.get("grocery")
+    if grocery is None:
+        book = get_recipe_book()
+        for day in sess["month_plan"]["days"]:
+            for meal in ("breakfast", "lunch", "dinner"):
+                _catalog_recipe(book, day[meal]["recipe_id"])
+        grocery = build_grocery_list(sess["month_plan"], book, db)
 
-    key = _session_key(req.month)
-    SESSIONS[key] = {
+        def fill_in(current: Optional[Dict[str, Any]]) -> None:
+            # a plan stored meanwhile already carries its own grocery list
+            if current is not None and current.get("grocery") is None:
+                current["grocery"] = grocery
+
+        sessions.update(session_id, month, fill_in)
+    return grocery
+
+
+async def _run_planner(fn, *args):
+    if profiling_active.get():
+        # keep profiled planning in this process, where the sampler can see it
+        return await run_in_threadpool(fn, *args)
+    try:
+        return await planner_executor.run(fn, *args)
+    except PlannerBusy:
+        raise HTTPException(status_code=503, detail="Planner busy, retry shortly", headers={"Retry-After": "1"})
+
+
+def _plan_key(month: str, user_profile: Dict[str, Any], solver: str, time_budget_ms: float) -> str:
+    return plan_key(month, user_profile, get_recipe_book().version, db.version, solver, time_budget_ms)
+
+
+def _store_plan(session_id: str, month: str, user_profile: Dict[str, Any], month_plan: Dict[str, Any], grocery: Dict[str, Any],
+                key: Optional[str] = None) -> Dict[str, Any]:
+    """Replace the session state with a new plan and build the /start_month response."""
+    inventory = grocery["totals"].copy()
+
+    # The grocery list only depends on the plan: it is cached here and
+    # replaced together with the plan on the next /start_month.
+    sessions.put(session_id, month, {
         "user_profile": user_profile,
         "month_plan": month_plan,
+        "day_index": day_index(month_plan),
+        "grocery": grocery,
         "inventory": inventory,
-    }
+        "ledger": [],
+        "plan_key": key,
+    })
 
     return {
-        "month_plan": month_plan,
-        "grocery_list": {"items": items},
+        "month_plan": {"month": month_plan["month"], "days": month_plan["days"], "solver": month_plan.get("solver")},
+        "grocery_list": {"items": grocery["items"]},
         "inventory": inventory,
     }
 
 
+@app.post("/start_month", response_model=StartMonthResponse)
+async def start_month(req: StartMonthRequest):
+    return model_response(StartMonthResponse, await _start_month(req))
+
+
+async def _start_month(req: StartMonthRequest) -> Dict[str, Any]:
+    user_profile = req.user_profile.model_dump()
+    key = _plan_key(req.month, user_profile, req.solver, req.time_budget_ms)
+    cached = plan_cache.get(key)
+    if cached is not None:
+        month_plan, grocery = cached
+    else:
+        month_plan, grocery = await _run_planner(plan_month, req.month, user_profile, req.solver, req.time_budget_ms)
+        plan_cache.put(key, month_plan, grocery)
+    return _store_plan(req.session_id, req.month, user_profile, month_plan, grocery, key)
+
+
+def _plan_is_current(req: StartMonthRequest) -> bool:
+    """Would /start_month leave the session exactly as it is? (same plan key, nothing cooked yet)"""
+    sess = sessions.get(req.session_id, req.month)
+    if sess is None or sess.get("ledger") or not sess.get("plan_key"):
+        return False
+    return sess["plan_key"] == _plan_key(req.month, req.user_profile.model_dump(), req.solver, req.time_budget_ms)
+
+
+@app.post("/start_month/batch", response_model=BatchStartMonthResponse)
+async def start_month_batch(req: BatchStartMonthRequest):
+    """Plan many households at once: one catalog, users of the same month scored together."""
+    t0 = time.perf_counter()
+    profiles = [item.user_profile.model_dump() for item in req.items]
+    keys = [_plan_key(item.month, profile, item.solver, item.time_budget_ms) for item, profile in zip(req.items, profiles)]
+    planned: list = [None] * len(req.items)
+    misses = []
+    for i, key in enumerate(keys):
+        cached = plan_cache.get(key)
+        if cached is not None:
+            planned[i] = (*cached, 0.0)
+        else:
+            misses.append(i)
+
+    plan_ms = 0.0
+    if misses:
+        jobs = [(req.items[i].month, profiles[i]) for i in misses]
+        solvers = split_time_budget([(req.items[i].solver, req.items[i].time_budget_ms) for i in misses], BATCH_TIME_BUDGET_MS)
+        for i, (solver, budget) in zip(misses, solvers):
+            # cached under the budget the plan actually got
+            keys[i] = _plan_key(req.items[i].month, profiles[i], solver, budget)
+        fresh, plan_ms = await _run_planner(plan_months, jobs, solvers)
+        for i, result in zip(misses, fresh):
+            planned[i] = result
+            plan_cache.put(keys[i], result[0], result[1])
+
+    missed = set(misses)
+    results = []
+    for i, (item, profile, (plan, grocery, grocery_ms)) in enumerate(zip(req.items, profiles, planned)):
+        resp = _store_plan(item.session_id, item.month, profile, plan, grocery, keys[i])
+        results.append({
+            **resp,
+            "session_id": item.session_id,
+            "month": item.month,
+            "timings_ms": {
+                "plan": round(plan_ms / len(misses), 3) if i in missed else 0.0,
+                "grocery": round(grocery_ms, 3),
+            },
+        })
+    return model_response(BatchStartMonthResponse, {
+        "results": results,
+        "timings_ms": {
+            "plan": round(plan_ms, 3),
+            "total": round((time.perf_counter() - t0) * 1000.0, 3),
+        },
+    })
+
+
+def _stream_event(fmt: str, event: str, data: str) -> str:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return f'{{"event":"{event}","data":{data}}}\n'
+
+
+STREAM_QUEUE_CHUNKS = 8  # chunks a streamed response may run ahead of the client
+
+
+async def _drain_in_thread(chunks, release: Optional[Callable[[], None]] = None):
+    """Run a blocking chunk generator in one worker thread, handing chunks to the event loop as they appear.
+
+    (StreamingResponse would otherwise hop to the threadpool once per chunk.)
+    The hand-off queue is bounded, so a slow client throttles the producer;
+    when the response ends early (client gone) the producer stops at its
+    next chunk and closes `chunks`. `release` (a planner slot) is called
+    once the producer has stopped.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    done = object()
+
+    def hand_over(item) -> bool:
+        fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                fut.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if cancelled.is_set():
+                    fut.cancel()
+                    return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if cancelled.is_set() or not hand_over(chunk):
+                    return
+        except BaseException as exc:  # surfaced in the response task
+            hand_over(exc)
+        else:
+            hand_over(done)
+        finally:
+            chunks.close()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is done:
+                break
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+    finally:
+        cancelled.set()
+        try:
+            await asyncio.shield(producer)
+        finally:
+            if release is not None:
+                release()
+
+
+def _stream_month(fmt: str, req: StartMonthRequest, user_profile: Dict[str, Any], key: str,
+                  planned: Optional[tuple]):
+    """Events of /start_month/stream: one "day" per DayPlan, one "grocery_item" per item, "inventory", "done".
+
+    Greedy plans that are not cached (and planner jobs running in this
+    process) are planned here, day by day, so each day is sent as soon as it
+    exists. The session is stored once the plan is complete, exactly as
+    /start_month would store it.
+    """
+    if planned is not None:
+        month_plan, grocery = planned
+        for day in month_plan["days"]:
+            yield _stream_event(fmt, "day", DayPlan.model_validate(day).model_dump_json())
+    else:
+        book = get_recipe_book()
+        days = []
+        for day in iter_month_days(req.month, user_profile, book):
+            days.append(day)
+            yield _stream_event(fmt, "day", DayPlan.model_validate(day).model_dump_json())
+        month_plan = {"month": req.month, "days": days}
+        grocery = build_grocery_list(month_plan, book, db)
+        plan_cache.put(key, month_plan, grocery)
+
+    resp = _store_plan(req.session_id, req.month, user_profile, month_plan, grocery, key)
+    # everything after the days is ready at once: send it as a single chunk
+    tail = [_stream_event(fmt, "grocery_item", GroceryItem.model_validate(item).model_dump_json())
+            for item in resp["grocery_list"]["items"]]
+    inventory = {k: float(v) for k, v in resp["inventory"].items()}
+    tail.append(_stream_event(fmt, "inventory", json.dumps(inventory, separators=(",", ":"))))
+    done = {"month": req.month, "days": len(month_plan["days"]), "solver": month_plan.get("solver")}
+    tail.append(_stream_event(fmt, "done", json.dumps(done, separators=(",", ":"))))
+    yield "".join(tail)
+
+
+@app.post("/start_month/stream")
+async def start_month_stream(req: StartMonthRequest, request: Request, format: Optional[str] = Query(None, pattern="^(ndjson|sse)$")):
+    """/start_month as a stream (NDJSON by default, Server-Sent Events with format=sse or Accept: text/event-stream)."""
+    fmt = format or ("sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson")
+    user_profile = req.user_profile.model_dump()
+    key = _plan_key(req.month, user_profile, req.solver, req.time_budget_ms)
+    planned = plan_cache.get(key)
+    # The optimizer only has a plan at the end of its budget, and a process pool keeps
+    # planning off this process's GIL: in both cases plan first, then stream the result.
+    if planned is None and (req.solver == "optimize" or not (planner_executor.inline or profiling_active.get())):
+        planned = await _run_planner(plan_month, req.month, user_profile, req.solver, req.time_budget_ms)
+        plan_cache.put(key, *planned)
+    release = None
+    if planned is None:
+        # planned day by day in a worker thread: holds a planner slot like any other job
+        try:
+            release = planner_executor.reserve("stream_month")
+        except PlannerBusy:
+            raise HTTPException(status_code=503, detail="Planner busy, retry shortly", headers={"Retry-After": "1"})
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _drain_in_thread(_stream_month(fmt, req, user_profile, key, planned), release),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # also frees the slot if the response ends before the body was ever iterated
+        background=BackgroundTask(release) if release is not None else None,
+    )
+
+
+@app.get("/grocery/{month}", response_model=GroceryList)
+def get_grocery(month: str, request: Request, session_id: str = "default"):
+    grocery = _grocery(session_id, month, _get_session(session_id, month))
+    etag = grocery["etag"]
+    inm = request.headers.get("if-none-match", "")
+    # weak comparison (RFC 9110): proxies and compression layers may hand back W/"<etag>"
+    if etag in (t.strip().removeprefix("W/") for t in inm.split(",")) or inm.strip() == "*":
+        return Response(status_code=304, headers={"ETag": etag})
+    return model_response(GroceryList, {"items": grocery["items"]}, headers={"ETag": etag})
+
+
 @app.get("/day/{month}/{date}")
-def get_day(month: str, date: str):
-    key = _session_key(month)
-    if key not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Month not initialized. Call /start_month first")
-    plan = SESSIONS[key]["month_plan"]
-    for d in plan["days"]:
-        if d["date"] == date:
-            return d
-    raise HTTPException(status_code=404, detail="Date not found in month plan")
+def get_day(month: str, date: str, session_id: str = "default"):
+    return FastJSONResponse(_day(month, date, session_id))
+
+
+def _day(month: str, date: str, session_id: str = "default") -> Dict[str, Any]:
+    sess = _get_session(session_id, month)
+    day = find_day(sess["month_plan"], date, sess.get("day_index"))
+    if day is None:
+        raise HTTPException(status_code=404, detail="Date not found in month plan")
+    return day
 
 
 @app.post("/cook", response_model=CookMealResponse)
 def cook(req: CookMealRequest):
+    return model_response(CookMealResponse, _cook(req))
+
+
+def _cook(req: CookMealRequest) -> Dict[str, Any]:
     # req.date is YYYY-MM-DD; infer month
     month = req.date[:7]
-    key = _session_key(month)
-    if key not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Month not initialized. Call /start_month first")
 
-    sess = SESSIONS[key]
-    day = next((d for d in sess["month_plan"]["days"] if d["date"] == req.date), None)
-    if not day:
-        raise HTTPException(status_code=404, detail="Date not found")
+    def cook_meal(sess: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        sess = _require_session(sess)
+        day = find_day(sess["month_plan"], req.date, sess.get("day_index"))
+        if not day:
+            raise HTTPException(status_code=404, detail="Date not found")
 
-    meal_item = day[req.meal]
-    recipe = book.by_id[meal_item["recipe_id"]]
-    servings = float(meal_item["servings"])
+        meal_item = day[req.meal]
+        recipe = _catalog_recipe(get_recipe_book(), meal_item["recipe_id"])
+        servings = float(meal_item["servings"])
 
-    # Build ingredient list with human names, and scale grams
-    ingredients = []
-    for ing in recipe.ingredients:
-        fk = str(ing["food_key"])
-        grams = round(float(ing["grams"]) * servings, 1)
-        name = db.get_food_row(fk)["food"]
-        ingredients.append({"food_key": fk, "name": name, "grams": grams})
+        # Build ingredient list with human names, and scale grams
+        ingredients = []
+        for ing in recipe.ingredients:
+            fk = str(ing["food_key"])
+            grams = round(float(ing["grams"]) * servings, 1)
+            name = db.food_name(fk)
+            ingredients.append({"food_key": fk, "name": name, "grams": grams})
 
-    text = render_recipe_basic(recipe.title, ingredients, max_minutes=sess["user_profile"]["preferences"]["max_prep_minutes"])
+        text = render_recipe_basic(recipe.title, ingredients, max_minutes=sess["user_profile"]["preferences"]["max_prep_minutes"])
 
-    inv_after = apply_meal_to_inventory(recipe, servings, sess["inventory"])
-    sess["inventory"] = inv_after
+        inventory = sess["inventory"]
+        event = record_cook(sess.setdefault("ledger", []), inventory, recipe, servings, date=req.date, meal=req.meal)
+        return {
+            "recipe_id": recipe.recipe_id,
+            "servings": servings,
+            "ingredients": ingredients,
+            "recipe_text": text,
+            # copied: the response is serialized after other cooks may have changed the inventory
+            "inventory_after": dict(inventory) if req.inventory_mode == "full" else None,
+            "inventory_delta": {fk: inventory[fk] for fk in event["deltas"]},
+            "ledger_seq": event["seq"],
+        }
+
+    return sessions.update(req.session_id, month, cook_meal)
+
+
+def _ledger_change(req: LedgerEventRequest, apply) -> Dict[str, Any]:
+    def change(sess: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        inventory = _require_session(sess)["inventory"]
+        try:
+            event = apply(sess.setdefault("ledger", []), inventory, req.seq)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return {
+            "ledger_seq": event["seq"],
+            "target_seq": req.seq,
+            "inventory_delta": {fk: inventory[fk] for fk in event["deltas"]},
+        }
+
+    return sessions.update(req.session_id, req.month, change)
+
+
+@app.post("/cook/undo", response_model=InventoryChangeResponse)
+def cook_undo(req: LedgerEventRequest):
+    return _ledger_change(req, undo_cook)
+
+
+@app.post("/cook/replay", response_model=InventoryChangeResponse)
+def cook_replay(req: LedgerEventRequest):
+    return _ledger_change(req, replay_cook)
 
-    return {
-        "recipe_id": recipe.recipe_id,
-        "servings": servings,
-        "ingredients": ingredients,
-        "recipe_text": text,
-        "inventory_after": inv_after,
-    }
+
+@app.get("/inventory/{month}", response_model=InventorySnapshotResponse)
+def get_inventory(
+    month: str,
+    session_id: str = "default",
+    seq: Optional[int] = Query(None, description="materialize after this ledger event"),
+    at: Optional[datetime] = Query(None, description="materialize as of this time (ISO 8601, UTC if naive)"),
+):
+    sess = _get_session(session_id, month)
+    ledger = sess.get("ledger", [])
+    if seq is None and at is None:
+        return {"month": month, "seq": len(ledger), "inventory": sess["inventory"]}
+    if at is not None and at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    initial = _grocery(session_id, month, sess)["totals"]
+    inventory, last_seq = inventory_snapshot(initial, ledger, upto_seq=seq, at=at)
+    return {"month": month, "seq": last_seq, "inventory": inventory}
+
+
+@app.get("/ledger/{month}")
+def get_ledger(month: str, session_id: str = "default"):
+    return {"month": month, "events": _get_session(session_id, month).get("ledger", [])}
 
 
 CHAT_HTML = """<!doctype html>
@@ -173,94 +546,180 @@ def chat_ui():
     return CHAT_HTML
 
 
-def _format_grocery(month: str) -> str:
-    key = _session_key(month)
-    if key not in SESSIONS:
+def _format_grocery(month: str, session_id: str = "default") -> str:
+    sess = sessions.get(session_id, month)
+    if sess is None:
         return "Mese non inizializzato. Usa: pianifica YYYY-MM"
-    sess = SESSIONS[key]
-    totals = sess["inventory"]  # remaining; but spesa is based on initial totals
-    # re-build from plan to show purchase quantities
-    plan = sess["month_plan"]
-    totals_initial = aggregate_grocery_list(plan, book)
-    items = grocery_list_items(totals_initial, db)
+    # spesa is based on the initial totals, not the remaining inventory
+    items = _grocery(session_id, month, sess)["items"]
     lines = [f"Spesa per {month} (quantità arrotondate):"]
     for it in items:
         lines.append(f"- {it['name']}: {it['rounded_purchase_qty']} (uso stimato {it['total_grams']} g)")
     return "\n".join(lines)
 
 
+chat_router = CommandRouter(
+    empty_reply="Scrivi un comando. Es: pianifica 2026-03",
+    unknown_reply="Comando non riconosciuto. Usa: pianifica, spesa, giorno, ricetta.",
+)
+
+MEAL_ALIASES = {
+    "colazione": "breakfast",
+    "pranzo": "lunch",
+    "cena": "dinner",
+    "breakfast": "breakfast",
+    "lunch": "lunch",
+    "dinner": "dinner",
+}
+
+
+def _this_month() -> str:
+    return date.today().strftime("%Y-%m")
+
+
+def _today() -> str:
+    return date.today().isoformat()
+
+
+@chat_router.command("pianifica", "start", "plan", args=[Arg("month", MONTH, default=_this_month)],
+                     usage="Formato: pianifica YYYY-MM")
+async def _chat_plan(req: ChatMessageRequest, month: str):
+    # use defaults if not provided
+    start_req = StartMonthRequest(month=month, session_id=req.session_id)
+    if not _plan_is_current(start_req):
+        await _start_month(start_req)
+    return {
+        "reply": f"OK. Ho generato il piano per {month} e la spesa.\nPuoi: \n- vedere la spesa\n- aprire un giorno\n- generare una ricetta.",
+        "actions": [
+            {"type": "SHOW_GROCERY_LIST", "payload": {"month": month}},
+            {"type": "SHOW_DAY", "payload": {"date": f"{month}-01"}},
+        ],
+        "data": {"month": month},
+    }
+
+
+@chat_router.command("spesa", "grocery", args=[Arg("month", MONTH, default=_this_month)],
+                     usage="Formato: spesa YYYY-MM")
+def _chat_grocery(req: ChatMessageRequest, month: str):
+    return {
+        "reply": _format_grocery(month, req.session_id),
+        "actions": [{"type": "SHOW_GROCERY_LIST", "payload": {"month": month}}],
+        "data": {"month": month},
+    }
+
+
+@chat_router.command("giorno", "day", args=[Arg("date", DATE, default=_today)],
+                     usage="Formato: giorno YYYY-MM-DD")
+def _chat_day(req: ChatMessageRequest, date: str, month: str):
+    try:
+        day = _day(month, date, req.session_id)
+    except HTTPException as e:
+        return {"reply": str(e.detail)}
+    b = day["breakfast"]; l = day["lunch"]; di = day["dinner"]
+    return {
+        "reply": f"{date}\n- colazione: {b['recipe_id']} (serv {b['servings']})\n- pranzo: {l['recipe_id']} (serv {l['servings']})\n- cena: {di['recipe_id']} (serv {di['servings']})",
+        "actions": [{"type": "SHOW_DAY", "payload": {"date": date}}],
+    }
+
+
+@chat_router.command("ricetta", "cook", "recipe",
+                     args=[Arg("date", DATE), Arg("meal", choices=MEAL_ALIASES, error="Pasto non valido: usa colazione/pranzo/cena")],
+                     usage="Formato: ricetta YYYY-MM-DD (colazione|pranzo|cena)")
+def _chat_cook(req: ChatMessageRequest, date: str, month: str, meal: str):
+    try:
+        resp = _cook(CookMealRequest(date=date, meal=meal, session_id=req.session_id))
+    except HTTPException as e:
+        return {"reply": str(e.detail)}
+    return {
+        "reply": resp["recipe_text"],
+        "data": {"recipe_id": resp["recipe_id"], "date": date, "meal": meal},
+    }
+
+
 @app.post("/chat/message", response_model=ChatMessageResponse)
-def chat_message(req: ChatMessageRequest):
+async def chat_message(req: ChatMessageRequest):
     # New frontend sends `message`; legacy embedded chat sends `text`.
-    text_raw = (req.message or req.text or "").strip()
-    text = text_raw
-    if not text:
-        return {"reply": "Scrivi un comando. Es: pianifica 2026-03"}
-
-    parts = text.split()
-    cmd = parts[0].lower()
-
-    if cmd in {"pianifica", "start"}:
-        month = parts[1] if len(parts) > 1 else date.today().strftime("%Y-%m")
-        # use defaults if not provided
-        start_req = StartMonthRequest(month=month)
-        resp = start_month(start_req)
-        return {
-            "reply": f"OK. Ho generato il piano per {month} e la spesa.\nPuoi: \n- vedere la spesa\n- aprire un giorno\n- generare una ricetta.",
-            "actions": [
-                {"type": "SHOW_GROCERY_LIST", "payload": {"month": month}},
-                {"type": "SHOW_DAY", "payload": {"date": f"{month}-01"}},
-            ],
-            "data": {"month": month},
-        }
+    return await chat_router.dispatch(req.message or req.text or "", req)
 
-    if cmd in {"spesa", "grocery"}:
-        month = parts[1] if len(parts) > 1 else date.today().strftime("%Y-%m")
-        return {
-            "reply": _format_grocery(month),
-            "actions": [{"type": "SHOW_GROCERY_LIST", "payload": {"month": month}}],
-            "data": {"month": month},
-        }
 
-    if cmd in {"giorno", "day"}:
-        d = parts[1] if len(parts) > 1 else date.today().isoformat()
-        month = d[:7]
-        try:
-            day = get_day(month, d)
-        except HTTPException as e:
-            return {"reply": str(e.detail)}
-        b = day["breakfast"]; l = day["lunch"]; di = day["dinner"]
-        return {
-            "reply": f"{d}\n- colazione: {b['recipe_id']} (serv {b['servings']})\n- pranzo: {l['recipe_id']} (serv {l['servings']})\n- cena: {di['recipe_id']} (serv {di['servings']})",
-            "actions": [{"type": "SHOW_DAY", "payload": {"date": d}}],
-        }
+@app.get("/chat/stats")
+def chat_stats():
+    """Per-command call counts and timings of /chat/message."""
+    return chat_router.stats()
+
+
+def _session_cache_samples():
+    hits, misses = getattr(sessions, "decoded_hits", None), getattr(sessions, "decoded_misses", None)
+    if hits is None:
+        return []
+    return [({"cache": "session_decoded", "result": "hit"}, hits), ({"cache": "session_decoded", "result": "miss"}, misses)]
+
+
+def _cache_ratio_samples():
+    plan = plan_cache.stats()
+    out = [({"cache": "plan"}, plan["hit_ratio"])]
+    hits, misses = getattr(sessions, "decoded_hits", 0), getattr(sessions, "decoded_misses", 0)
+    if hits + misses:
+        out.append(({"cache": "session_decoded"}, round(hits / (hits + misses), 4)))
+    return out
+
+
+metrics.collect("mealbot_cache_lookups_total", "counter", "Cache lookups by cache and result.", lambda: [
+    ({"cache": "plan", "result": "hit"}, plan_cache.hits),
+    ({"cache": "plan", "result": "disk_hit"}, plan_cache.disk_hits),
+    ({"cache": "plan", "result": "miss"}, plan_cache.misses),
+    *_session_cache_samples(),
+])
+metrics.collect("mealbot_cache_hit_ratio", "gauge", "Hits / lookups since start.", _cache_ratio_samples)
+metrics.gauge("mealbot_plan_cache_entries", "Plans held in memory by the plan cache.", lambda: len(plan_cache))
+metrics.gauge("mealbot_sessions", "(session_id, month) states in the session store (SQLite: recounted every 30 s).",
+              lambda: sessions.approx_len())
+metrics.gauge("mealbot_planner_pending_jobs", "Planning jobs queued or running.", lambda: planner_executor.pending)
+metrics.collect("mealbot_data_info", "gauge", "Versions of the loaded recipe catalog and nutrition dataset (plan cache keys).",
+                lambda: [({"catalog_version": get_recipe_book().version, "nutrition_version": db.version}, 1)])
+metrics.collect("mealbot_chat_commands_total", "counter", "/chat/message commands handled.",
+                lambda: [({"command": name}, s["calls"]) for name, s in chat_router.stats().items()])
+metrics.collect("mealbot_chat_command_seconds_total", "counter", "Time spent handling each chat command.",
+                lambda: [({"command": name}, s["total_ms"] / 1000.0) for name, s in chat_router.stats().items()])
+
+
+def _require_admin(request: Request) -> None:
+    if not is_admin(request.headers, ADMIN_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@app.get("/admin/slow")
+def admin_slow_requests(request: Request):
+    """Slowest recent requests (this worker), slowest first."""
+    _require_admin(request)
+    return slow_requests.snapshot()
+
+
+@app.get("/admin/profiles")
+def admin_profiles(request: Request):
+    """Stored request profiles, newest first."""
+    _require_admin(request)
+    files = sorted(PROFILE_DIR.glob("*.collapsed"), key=lambda p: p.stat().st_mtime, reverse=True) if PROFILE_DIR.exists() else []
+    return [{"name": p.stem, "bytes": p.stat().st_size} for p in files[:100]]
+
+
+_PROFILE_NAME = re.compile(r"[0-9A-Za-z-]+")
+
+
+@app.get("/admin/profiles/{name}", response_class=PlainTextResponse)
+def admin_profile(name: str, request: Request):
+    """One profile in collapsed-stack format (flamegraph.pl, speedscope)."""
+    _require_admin(request)
+    path = PROFILE_DIR / f"{name}.collapsed"
+    if not _PROFILE_NAME.fullmatch(name) or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(path.read_text(encoding="utf-8"))
 
-    if cmd in {"ricetta", "cook"}:
-        if len(parts) < 3:
-            return {"reply": "Formato: ricetta YYYY-MM-DD (colazione|pranzo|cena)"}
-        d = parts[1]
-        meal_raw = parts[2].lower()
-        meal_map = {
-            "colazione": "breakfast",
-            "pranzo": "lunch",
-            "cena": "dinner",
-            "breakfast": "breakfast",
-            "lunch": "lunch",
-            "dinner": "dinner",
-        }
-        if meal_raw not in meal_map:
-            return {"reply": "Pasto non valido: usa colazione/pranzo/cena"}
-        meal = meal_map[meal_raw]
-        try:
-            resp = cook(CookMealRequest(date=d, meal=meal))
-        except HTTPException as e:
-            return {"reply": str(e.detail)}
-        return {
-            "reply": resp["recipe_text"],
-            "data": {"recipe_id": resp["recipe_id"], "date": d, "meal": meal},
-        }
 
-    return {"reply": "Comando non riconosciuto. Usa: pianifica, spesa, giorno, ricetta."}
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition for this worker process."""
+    return Response(metrics.expose(), media_type=METRICS_CONTENT_TYPE)
 
 
 ### NOTE: a second/older chat UI was removed to avoid duplicate routes.
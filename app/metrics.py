@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition (format 0.0.4), without the client library:
+# histograms with fixed buckets plus collector callbacks that read gauges and
+# counters from their owners (caches, session store, ...) at scrape time.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _fmt_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Histogram:
+    """Cumulative-bucket histogram family keyed by label values."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for values, counts in sorted(series.items()):
+            labels = list(zip(self.label_names, values))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_fmt_labels(labels + [('le', _fmt_value(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(labels)} {_fmt_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_fmt_labels(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Histograms plus collectors; `expose()` renders the whole /metrics page."""
+
+    def __init__(self):
+        self.histograms: List[Histogram] = []
+        # name -> (type, help, callback returning [(labels, value)])
+        self._collectors: Dict[str, Tuple[str, str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = {}
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str], buckets: Sequence[float]) -> Histogram:
+        h = Histogram(name, help, label_names, buckets)
+        self.histograms.append(h)
+        return h
+
+    def collect(self, name: str, kind: str, help: str,
+                fn: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> None:
+        """Register a gauge/counter family whose samples `fn` computes at scrape time."""
+        self._collectors[name] = (kind, help, fn)
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float]) -> None:
+        self.collect(name, "gauge", help, lambda: [({}, fn())])
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for name, (kind, help, fn) in self._collectors.items():
+            try:
+                samples = list(fn())
+            except Exception:  # a broken collector must not take /metrics down
+                continue
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{name}{_fmt_labels(sorted(labels.items()))} {_fmt_value(value)}")
+        for h in self.histograms:
+            lines += h.expose()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "mealbot_http_request_duration_seconds", "HTTP request latency by route (until the last body byte).",
+    ("method", "route"), REQUEST_BUCKETS,
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "mealbot_stage_duration_seconds", "Wall time of internal planner/inventory stages (sampled where noted).",
+    ("stage",), STAGE_BUCKETS,
+)
+
+_request_counts: Dict[Tuple[str, str, str], int] = {}
+_request_lock = threading.Lock()
+_stage_calls: Dict[str, "_StageCalls"] = {}
+
+
+class _StageCalls:
+    __slots__ = ("n",)
+
+    def __init__(self):
+        self.n = 0
+
+
+def timed(stage: str, sample_every: int = 1) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Record the decorated function's wall time under `stage`.
+
+    With `sample_every` > 1 only every n-th call is timed (for sub-microsecond
+    lookups); `mealbot_stage_calls_total` still counts every call.
+    """
+    calls = _stage_calls.setdefault(stage, _StageCalls())
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            calls.n += 1  # not locked: a rare lost increment is fine for a rate
+            if sample_every > 1 and calls.n % sample_every:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - t0, stage)
+        return wrapper
+    return decorate
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), else the peak from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+REGISTRY.collect("mealbot_stage_calls_total", "counter", "Calls of each timed stage.",
+                 lambda: [({"stage": s}, c.n) for s, c in sorted(_stage_calls.items())])
+REGISTRY.collect("mealbot_http_requests_total", "counter", "HTTP requests by route and status.",
+                 lambda: [({"method": m, "route": r, "status": s}, n) for (m, r, s), n in sorted(_request_counts.items())])
+REGISTRY.gauge("mealbot_process_resident_memory_bytes", "Resident memory of this worker process.", rss_bytes)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by method and route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status: List[Optional[int]] = [None]
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                _record_request(scope, status[0], time.perf_counter() - t0)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            _record_request(scope, 500, time.perf_counter() - t0)
+            raise
+
+
+def _record_request(scope, status: Optional[int], seconds: float) -> None:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    method = scope.get("method", "")
+    REQUEST_SECONDS.observe(seconds, method, path)
+    key = (method, path, str(status or 0))
+    with _request_lock:
+        _request_counts[key] = _request_counts.get(key, 0) + 1
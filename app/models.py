@@ -44,9 +44,15 @@ class UserProfile(BaseModel):
     daily_targets: DailyTargets = Field(default_factory=DailyTargets)
     preferences: Preferences = Field(default_factory=Preferences)
 
+Solver = Literal["greedy", "optimize"]
+
 class StartMonthRequest(BaseModel):
     month: str  # YYYY-MM
     user_profile: UserProfile = Field(default_factory=UserProfile)
+    session_id: str = "default"
+    # "optimize": improve the greedy plan on daily macro/micro targets within time_budget_ms
+    solver: Solver = "greedy"
+    time_budget_ms: int = Field(300, ge=0, le=10_000)
 
 class MealPlanItem(BaseModel):
     recipe_id: str
@@ -62,6 +68,7 @@ class DayPlan(BaseModel):
 class MonthPlan(BaseModel):
     month: str
     days: List[DayPlan]
+    solver: Optional[Dict[str, Any]] = None  # optimizer summary, "optimize" mode only
 
 class GroceryItem(BaseModel):
     food_key: str
@@ -78,16 +85,49 @@ class StartMonthResponse(BaseModel):
     grocery_list: GroceryList
     inventory: Dict[str, float]  # food_key -> grams_remaining
 
+class BatchStartMonthRequest(BaseModel):
+    items: List[StartMonthRequest] = Field(min_length=1, max_length=1000)
+
+class BatchStartMonthResult(StartMonthResponse):
+    session_id: str
+    month: str
+    # "plan" is the item's even share of the batched planning time
+    timings_ms: Dict[str, float]
+
+class BatchStartMonthResponse(BaseModel):
+    results: List[BatchStartMonthResult]
+    timings_ms: Dict[str, float]
+
 class CookMealRequest(BaseModel):
     date: str
     meal: Literal["breakfast", "lunch", "dinner"]
+    session_id: str = "default"
+    # "delta": skip the full inventory_after map, inventory_delta has the changed keys
+    inventory_mode: Literal["full", "delta"] = "full"
 
 class CookMealResponse(BaseModel):
     recipe_id: str
     servings: float
     ingredients: List[Dict[str, float | str]]
     recipe_text: str
-    inventory_after: Dict[str, float]
+    inventory_after: Optional[Dict[str, float]] = None  # omitted in "delta" mode
+    inventory_delta: Dict[str, float] = Field(default_factory=dict)  # food_key -> grams_remaining, changed keys only
+    ledger_seq: Optional[int] = None
+
+class LedgerEventRequest(BaseModel):
+    month: str  # YYYY-MM
+    seq: int  # ledger seq of the cook event to undo/replay
+    session_id: str = "default"
+
+class InventoryChangeResponse(BaseModel):
+    ledger_seq: int
+    target_seq: int
+    inventory_delta: Dict[str, float]
+
+class InventorySnapshotResponse(BaseModel):
+    month: str
+    seq: int  # last ledger event included
+    inventory: Dict[str, float]
 
 
 class ChatMessageRequest(BaseModel):
@@ -1,67 +1,276 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-import pandas as pd
+import numpy as np
+
+from .food_search import FoodSearchIndex
+from .metrics import timed
 
 DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "nutrition.csv"
 
+COMPILED_FORMAT = 1
+
+
+def compiled_paths(csv_path: Path) -> Tuple[Path, Path]:
+    """Where the compiled form of `csv_path` lives: (nutrient matrix .npy, index .json)."""
+    return csv_path.with_suffix(".npy"), csv_path.with_suffix(".index.json")
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class FoodRow(Mapping):
+    """Read-only view of one food, shaped like the dict `get_food_row` used to build.
+
+    Text columns map to str, nutrient columns to float (None when missing).
+    Nothing is copied until a value is read.
+    """
+
+    __slots__ = ("_db", "_i")
+
+    def __init__(self, db: "NutritionDB", i: int):
+        self._db = db
+        self._i = i
+
+    def __getitem__(self, key: str):
+        db = self._db
+        if key == "food":
+            return db.foods[self._i]
+        if key == "food_key":
+            return db.food_keys[self._i]
+        if key == "group":
+            return db.groups[self._i]
+        j = db._col.get(key)
+        if j is None:
+            raise KeyError(key)
+        v = db.values[self._i, j]
+        return None if v != v else float(v)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._db.columns)
+
+    def __len__(self) -> int:
+        return len(self._db.columns)
+
+    def __repr__(self) -> str:
+        return f"FoodRow({dict(self)!r})"
+
+
 class NutritionDB:
     """Nutrition lookup. All nutrient values are per 100 g.
 
     The shipped dataset is a compact CSV (8,463 foods, 28 nutrient columns),
     commonly used in public educational material and derived from USDA food
     composition sources.
+
+    Storage is columnar: nutrients live in one contiguous float64 matrix
+    (`values`, rows x `nutrient_cols`) and text columns in plain lists, with a
+    food_key -> row dict for O(1) access. float64 keeps per-recipe totals
+    bit-identical to the original pandas path. `version` identifies the
+    dataset content (first 16 hex digits of the CSV's sha256).
+
+    If `scripts/compile_nutrition.py` has compiled the CSV, the matrix is
+    memory-mapped from the .npy (pages shared by all workers on a host) and
+    the CSV is not parsed at all. A compiled artifact whose recorded source
+    does not match the CSV is ignored and the CSV is used instead.
     """
 
-    def __init__(self, csv_path: Optional[Path] = None):
+    def __init__(self, csv_path: Optional[Path] = None, use_compiled: bool = True):
         path = csv_path or DATA_PATH
-        self.df = pd.read_csv(path)
-        self.df["food"] = self.df["food"].astype(str)
-        self.df["food_key"] = self.df["food"].str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True).str.strip("_")
-        self.df.set_index("food_key", inplace=True, drop=False)
+        self.source = "csv"
+        if use_compiled and self._load_compiled(path):
+            self.source = "compiled"
+        else:
+            self._load_csv(path)
+            self.version = _sha256(path)[:16]
+        self._init_index()
+
+    def _load_csv(self, path: Path) -> None:
+        import pandas as pd  # only needed when there is no usable compiled artifact
+
+        df = pd.read_csv(path)
+        df["food"] = df["food"].astype(str)
+        df["food_key"] = df["food"].str.lower().str.replace(r"[^a-z0-9]+", "_", regex=True).str.strip("_")
 
         # Determine which nutrient columns are available
-        self.nutrient_cols = [c for c in self.df.columns if c not in {"food", "food_key", "group"}]
+        self.nutrient_cols: List[str] = [c for c in df.columns if c not in {"food", "food_key", "group"}]
+        self.columns: List[str] = list(df.columns)
+        self.values: np.ndarray = np.ascontiguousarray(df[self.nutrient_cols].to_numpy(dtype=np.float64))
+        self.foods: List[str] = df["food"].tolist()
+        self.food_keys: List[str] = df["food_key"].tolist()
+        self.groups: List[str] = df["group"].astype(str).tolist()
+
+    def _load_compiled(self, csv_path: Path) -> bool:
+        npy_path, index_path = compiled_paths(csv_path)
+        if not (npy_path.exists() and index_path.exists()):
+            return False
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except ValueError:
+            return False
+        src = index.get("source", {})
+        if index.get("format") != COMPILED_FORMAT or not csv_path.exists():
+            return False
+        st = csv_path.stat()
+        if src.get("size") != st.st_size:
+            return False
+        # mtime is the cheap check; fall back to the content hash (e.g. after a fresh checkout)
+        if src.get("mtime_ns") != st.st_mtime_ns and src.get("sha256") != _sha256(csv_path):
+            return False
+        values = np.load(npy_path, mmap_mode="r")
+        if values.shape != (len(index["food_keys"]), len(index["nutrient_cols"])):
+            return False
+        self.version = src["sha256"][:16]
+        self.nutrient_cols = index["nutrient_cols"]
+        self.columns = index["columns"]
+        self.values = values
+        self.foods = index["foods"]
+        self.food_keys = index["food_keys"]
+        self.groups = index["groups"]
+        return True
+
+    def compile(self, csv_path: Optional[Path] = None) -> Tuple[Path, Path]:
+        """Write the compiled (.npy + index) form of this database next to `csv_path`."""
+        path = csv_path or DATA_PATH
+        npy_path, index_path = compiled_paths(path)
+        st = path.stat()
+        index = {
+            "format": COMPILED_FORMAT,
+            "source": {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(path)},
+            "columns": self.columns,
+            "nutrient_cols": self.nutrient_cols,
+            "foods": self.foods,
+            "food_keys": self.food_keys,
+            "groups": self.groups,
+        }
+        # write to temp files and rename so running workers never see a half-written artifact
+        tmp_npy = npy_path.with_name(npy_path.name + ".tmp")
+        with open(tmp_npy, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.values, dtype=np.float64))
+        tmp_index = index_path.with_name(index_path.name + ".tmp")
+        tmp_index.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_npy, npy_path)
+        os.replace(tmp_index, index_path)
+        return npy_path, index_path
+
+    def _init_index(self) -> None:
+        self._col = {c: j for j, c in enumerate(self.nutrient_cols)}
+        self._present = ~np.isnan(self.values)
+        self._search_index: Optional[FoodSearchIndex] = None
+        # first occurrence wins for the (rare) duplicated keys
+        self._row: Dict[str, int] = {}
+        for i, k in enumerate(self.food_keys):
+            self._row.setdefault(k, i)
+
+    def __len__(self) -> int:
+        return len(self.food_keys)
 
     def has_food(self, food_key: str) -> bool:
-        return food_key in self.df.index
+        return food_key in self._row
 
-    def get_food_row(self, food_key: str) -> Dict:
-        if food_key not in self.df.index:
+    def row_index(self, food_key: str) -> int:
+        i = self._row.get(food_key)
+        if i is None:
             raise KeyError(f"Unknown food_key: {food_key}")
-        row = self.df.loc[food_key]
-        out: Dict = {}
-        for k, v in row.items():
-            if k == "food":
-                out[k] = str(v)
-                continue
-            if k == "food_key":
-                out[k] = str(v)
-                continue
-            if k == "group":
-                out[k] = str(v)
-                continue
-            if pd.isna(v):
-                out[k] = None
-            else:
-                out[k] = float(v)
-        return out
+        return i
+
+    @timed("get_food_row", sample_every=64)
+    def get_food_row(self, food_key: str) -> FoodRow:
+        return FoodRow(self, self.row_index(food_key))
+
+    def food_name(self, food_key: str) -> str:
+        return self.foods[self.row_index(food_key)]
+
+    @property
+    def search_index(self) -> FoodSearchIndex:
+        # built on first use: the API process never searches
+        if self._search_index is None:
+            self._search_index = FoodSearchIndex(self.foods)
+        return self._search_index
+
+    def _records(self, rows: List[int]) -> List[Dict[str, str]]:
+        return [{"food": self.foods[i], "food_key": self.food_keys[i], "group": self.groups[i]} for i in rows]
+
+    def search(self, query: str, limit: int = 10, ranked: bool = False):
+        """Foods whose lowercased name matches `query` (a regex, like pandas str.contains).
+
+        Results are in dataset order unless `ranked`, which puts matches at the
+        start of a word, earlier in the name and in shorter names first.
+        """
+        return self._records(self.search_index.search(query, limit=limit, ranked=ranked))
+
+    def search_many(self, queries: List[str], limit: int = 10, ranked: bool = False):
+        """`search` for a batch of queries in one pass; one result list per query."""
+        return [self._records(rows) for rows in self.search_index.search_many(queries, limit=limit, ranked=ranked)]
 
-    def search(self, query: str, limit: int = 10):
-        q = query.lower()
-        m = self.df[self.df["food"].str.lower().str.contains(q, na=False)].head(limit)
-        return m[["food", "food_key", "group"]].to_dict(orient="records")
+    def search_tokens(self, query: str, limit: int = 10):
+        """Foods where every word of `query` is a prefix of a word in the name, best match first."""
+        return self._records(self.search_index.search_tokens(query, limit=limit))
+
+    def nutrient_vector(self, food_key: str, grams: float) -> np.ndarray:
+        """Nutrients for `grams` as a vector aligned with `nutrient_cols` (NaN = missing)."""
+        return self.values[self.row_index(food_key)] * (grams / 100.0)
 
     def nutrients_for_grams(self, food_key: str, grams: float) -> Dict[str, float]:
         """Return nutrient totals for a given amount in grams."""
-        row = self.get_food_row(food_key)
-        factor = grams / 100.0
-        out: Dict[str, float] = {}
-        for c in self.nutrient_cols:
-            v = row.get(c)
-            if v is None:
-                continue
-            out[c] = float(v) * factor
+        i = self.row_index(food_key)
+        vec = self.values[i] * (grams / 100.0)
+        return {c: float(v) for c, v, ok in zip(self.nutrient_cols, vec.tolist(), self._present[i].tolist()) if ok}
+
+    def nutrients_for_ingredients(self, ingredients: Sequence[Dict]) -> Dict[str, float]:
+        """Nutrient totals of `[{"food_key", "grams"}, ...]` (see `nutrients_for_recipes`)."""
+        return self.nutrients_for_recipes([ingredients])[0]
+
+    def nutrients_for_recipes(self, recipes: Sequence[Sequence[Dict]]) -> List[Dict[str, float]]:
+        """Nutrient totals for many ingredient lists at once.
+
+        This is the sparse product W @ values, W being the (recipes x foods)
+        matrix of grams/100: the nutrient rows of all ingredients are gathered
+        and scaled in one array op, then summed into their recipe with
+        np.add.at. Keys, key order and float values are the same as summing
+        `nutrients_for_grams` ingredient by ingredient: a nutrient is present
+        if any ingredient has it, in order of first appearance, and additions
+        happen in ingredient order.
+        """
+        counts = np.fromiter((len(ings) for ings in recipes), dtype=np.intp, count=len(recipes))
+        rows = np.fromiter((self.row_index(str(ing["food_key"])) for ings in recipes for ing in ings),
+                           dtype=np.intp, count=int(counts.sum()))
+        scale = np.fromiter((float(ing["grams"]) for ings in recipes for ing in ings),
+                            dtype=np.float64, count=len(rows)) / 100.0
+        owner = np.repeat(np.arange(len(recipes)), counts)
+        present = self._present[rows]
+
+        totals = np.zeros((len(recipes), len(self.nutrient_cols)), dtype=np.float64)
+        np.add.at(totals, owner, np.where(present, self.values[rows] * scale[:, None], 0.0))
+
+        # position of the first ingredient providing each nutrient, per recipe
+        starts = np.cumsum(counts) - counts
+        never = np.iinfo(np.intp).max
+        first = np.full(totals.shape, never, dtype=np.intp)
+        np.minimum.at(first, owner, np.where(present, (np.arange(len(rows)) - starts[owner])[:, None], never))
+
+        out: List[Dict[str, float]] = []
+        cols = self.nutrient_cols
+        for first_r, totals_r in zip(first, totals.tolist()):
+            js = np.flatnonzero(first_r != never)
+            js = js[np.argsort(first_r[js], kind="stable")].tolist()
+            out.append({cols[j]: totals_r[j] for j in js})
         return out
+
+
+_DB: Optional[NutritionDB] = None
+
+
+def get_nutrition_db() -> NutritionDB:
+    """Process-wide NutritionDB, loaded on first use."""
+    global _DB
+    if _DB is None:
+        _DB = NutritionDB()
+    return _DB
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import timed
+from .planner import MEALS, RecipeBook, build_month_plan, get_recipe_book, sum_nutrients
+
+SERVINGS_GRID = np.round(np.arange(0.6, 1.6001, 0.05), 2)
+RECENT_WINDOW = 8  # same no-repeat window (in meals) as the greedy planner
+MICRO_WEIGHT = 0.5
+VARIETY_WEIGHT = 2.0
+
+
+class _MonthState:
+    """Whole-month assignment of (recipe, servings) per meal with cached day totals and costs."""
+
+    def __init__(self, plan: Dict[str, Any], book: RecipeBook, user_profile: Dict[str, Any]):
+        targets = user_profile["daily_targets"]
+        prefs = user_profile["preferences"]
+        keys = book.nutrient_keys or (tuple(book.recipes[0].nutrients_per_serving) if book.recipes else ())
+        macros = {k: float(v) for k, v in targets["macros_g"].items() if k in keys}
+        micros = {k: float(v) for k, v in (targets.get("micros") or {}).items() if k in keys and k not in macros}
+        self.keys = list(macros) + list(micros)
+        self.target = np.array([macros[k] for k in macros] + [micros[k] for k in micros], dtype=np.float64)
+        self.scale = 1.0 / np.maximum(self.target, 1e-6)
+        self.n_macros = len(macros)
+
+        self.recipes = {m: book.scorer_for(m).recipes for m in MEALS}
+        self.recipe_ids = {m: book.scorer_for(m).recipe_ids for m in MEALS}
+        self.nutrients = {m: book.scorer_for(m).nutrient_columns(self.keys) for m in MEALS}
+        self.penalty = {m: book.scorer_for(m).penalties(prefs) for m in MEALS}
+
+        self.dates = [d["date"] for d in plan["days"]]
+        n_days = len(self.dates)
+        self.choice = np.zeros((n_days, len(MEALS)), dtype=np.int64)
+        self.servings = np.zeros((n_days, len(MEALS)), dtype=np.float64)
+        for d, day in enumerate(plan["days"]):
+            for m, meal in enumerate(MEALS):
+                self.choice[d, m] = book.scorer_for(meal).position(day[meal]["recipe_id"])
+                self.servings[d, m] = float(day[meal]["servings"])
+
+        self.variety_target = min(int(prefs.get("variety", 0) or 0), sum(len(rs) for rs in self.recipes.values()))
+        self.counts: Dict[str, int] = {}
+        for d in range(n_days):
+            for m in range(len(MEALS)):
+                rid = self.rid(d, m)
+                self.counts[rid] = self.counts.get(rid, 0) + 1
+
+        self.totals = np.zeros((n_days, len(self.keys)), dtype=np.float64)
+        for d in range(n_days):
+            for m, meal in enumerate(MEALS):
+                self.totals[d] += self.servings[d, m] * self.nutrients[meal][self.choice[d, m]]
+        self.day_cost = np.array([self._day_cost(t) for t in self.totals])
+
+    def rid(self, d: int, m: int) -> str:
+        return self.recipe_ids[MEALS[m]][self.choice[d, m]]
+
+    def _day_cost(self, totals: np.ndarray) -> float:
+        return float(self._day_costs(totals[None, :])[0])
+
+    def _day_costs(self, totals: np.ndarray) -> np.ndarray:
+        """Cost of each row of `totals`: normalized L1 on macros + normalized micro shortfall."""
+        rel = (totals - self.target) * self.scale
+        macro = np.abs(rel[:, :self.n_macros]).sum(axis=1)
+        micro = np.maximum(-rel[:, self.n_macros:], 0.0).sum(axis=1)
+        return macro + MICRO_WEIGHT * micro
+
+    def variety_cost(self) -> float:
+        return VARIETY_WEIGHT * max(0, self.variety_target - len(self.counts))
+
+    def objective(self) -> float:
+        pen = sum(float(self.penalty[meal][self.choice[:, m]].sum()) for m, meal in enumerate(MEALS))
+        return float(self.day_cost.sum()) + pen + self.variety_cost()
+
+    def blocked(self, d: int, m: int, rid: str) -> bool:
+        """Would `rid` at (d, m) repeat within RECENT_WINDOW meals of another slot?"""
+        p = d * len(MEALS) + m
+        n_slots = len(self.dates) * len(MEALS)
+        for q in range(max(0, p - RECENT_WINDOW), min(n_slots, p + RECENT_WINDOW + 1)):
+            if q != p and self.rid(*divmod(q, len(MEALS))) == rid:
+                return True
+        return False
+
+    def try_move(self, d: int, m: int, j: int) -> bool:
+        """Put candidate `j` (best servings on the grid) at (d, m) if that lowers the objective."""
+        meal = MEALS[m]
+        cur = int(self.choice[d, m])
+        old_rid = self.rid(d, m)
+        new_rid = self.recipe_ids[meal][j]
+        if j != cur and self.blocked(d, m, new_rid):
+            return False
+
+        base = self.totals[d] - self.servings[d, m] * self.nutrients[meal][cur]
+        grid_totals = base[None, :] + SERVINGS_GRID[:, None] * self.nutrients[meal][j][None, :]
+        costs = self._day_costs(grid_totals)
+        g = int(np.argmin(costs))
+        delta = float(costs[g]) - float(self.day_cost[d]) + float(self.penalty[meal][j] - self.penalty[meal][cur])
+        if j != cur:
+            before = self.variety_cost()
+            distinct = len(self.counts) - (self.counts[old_rid] == 1) + (new_rid not in self.counts)
+            delta += VARIETY_WEIGHT * max(0, self.variety_target - distinct) - before
+        if delta >= -1e-9:
+            return False
+
+        if j != cur:
+            self.counts[old_rid] -= 1
+            if not self.counts[old_rid]:
+                del self.counts[old_rid]
+            self.counts[new_rid] = self.counts.get(new_rid, 0) + 1
+        self.choice[d, m] = j
+        self.servings[d, m] = float(SERVINGS_GRID[g])
+        self.totals[d] = grid_totals[g]
+        self.day_cost[d] = float(costs[g])
+        return True
+
+    def to_plan(self, yyyy_mm: str) -> Dict[str, Any]:
+        days = []
+        for d, date_str in enumerate(self.dates):
+            items = {}
+            chosen = []
+            for m, meal in enumerate(MEALS):
+                r = self.recipes[meal][self.choice[d, m]]
+                s = round(float(self.servings[d, m]), 2)
+                items[meal] = {"recipe_id": r.recipe_id, "servings": s}
+                chosen.append((r, s))
+            days.append({"date": date_str, **items, "totals": sum_nutrients(chosen)})
+        return {"month": yyyy_mm, "days": days}
+
+
+@timed("optimize_month_plan")
+def optimize_month_plan(yyyy_mm: str, user_profile: Dict[str, Any], book: Optional[RecipeBook] = None,
+                        time_budget_ms: float = 300.0, initial: Optional[Dict[str, Any]] = None,
+                        seed: int = 0, max_iterations: Optional[int] = None) -> Dict[str, Any]:
+    """Improve a month plan jointly over recipe choice x servings within a wall-clock budget.
+
+    Starts from the greedy plan (or `initial`) and runs a local search over
+    single-meal moves (swap recipe + best servings on a 0.05 grid, or
+    re-tune servings). The objective covers daily macro *and* micro
+    targets, preference penalties, the no-repeat window and
+    `preferences.variety`. The search is anytime: whatever it holds when the
+    budget runs out is returned, and if nothing improved that is the greedy
+    plan itself. The returned plan carries a "solver" summary.
+    """
+    t0 = time.perf_counter()
+    book = book or get_recipe_book()
+    greedy = initial or build_month_plan(yyyy_mm, user_profile, book)
+    state = _MonthState(greedy, book, user_profile)
+    start_obj = state.objective()
+
+    deadline = t0 + max(0.0, time_budget_ms) / 1000.0
+    rng = random.Random(seed)
+    n_days = len(state.dates)
+    iterations = accepted = 0
+    while n_days and time.perf_counter() < deadline:
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        iterations += 1
+        d = rng.randrange(n_days)
+        m = rng.randrange(len(MEALS))
+        # one move in four only re-tunes servings of the current recipe
+        j = int(state.choice[d, m]) if rng.random() < 0.25 else rng.randrange(len(state.recipes[MEALS[m]]))
+        if state.try_move(d, m, j):
+            accepted += 1
+
+    improved = accepted > 0
+    # a copy of `greedy`, never the caller's `initial`, gets the summary
+    plan = state.to_plan(yyyy_mm) if improved else dict(greedy)
+    plan["solver"] = {
+        "mode": "optimize",
+        "objective_start": round(start_obj, 4),
+        "objective": round(state.objective(), 4),
+        "improved": improved,
+        "iterations": iterations,
+        "accepted_moves": accepted,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+    }
+    return plan
+
+
+def plan_quality(plan: Dict[str, Any], user_profile: Dict[str, Any]) -> Tuple[float, float]:
+    """(mean abs % deviation from daily macro targets, mean % shortfall on micro targets)."""
+    targets = user_profile["daily_targets"]
+    macros = targets["macros_g"]
+    micros = targets.get("micros") or {}
+    macro_dev: List[float] = []
+    micro_short: List[float] = []
+    for day in plan["days"]:
+        tot = day["totals"]
+        for k, t in macros.items():
+            if k in tot and t:
+                macro_dev.append(abs(tot[k] - t) / t * 100.0)
+        for k, t in micros.items():
+            if k in tot and t:
+                micro_short.append(max(0.0, t - tot[k]) / t * 100.0)
+    return _mean(macro_dev), _mean(micro_short)
+
+
+def _mean(xs: List[float]) -> float:
+    return sum(xs) / len(xs) if xs else 0.0
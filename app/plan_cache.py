@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+CachedPlan = Tuple[Dict[str, Any], Dict[str, Any]]  # (month_plan, grocery)
+
+
+def plan_key(month: str, user_profile: Dict[str, Any], catalog_version: str, nutrition_version: str,
+             solver: str = "greedy", time_budget_ms: float = 0) -> str:
+    """Content address of a plan: month + canonical profile JSON + catalog/dataset versions + solver."""
+    canonical = json.dumps(user_profile, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    solver_part = solver if solver == "greedy" else f"{solver}:{time_budget_ms}"
+    blob = "\n".join([month, canonical, catalog_version, nutrition_version, solver_part])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+PLAN_SUFFIX = ".plan.json"
+_LEGACY_FILE = re.compile(r"[0-9a-f]{64}\.json")
+
+
+class PlanCache:
+    """LRU of (month_plan, grocery) by `plan_key`, optionally persisted as `<key>.plan.json` files.
+
+    The directory holds at most `max_disk_entries` files (0 = no limit): when
+    a put goes over, the least recently used files (by mtime; a disk hit
+    touches its file) are deleted down to 90% of the limit. Plans keyed on
+    an old catalog or nutrition version are never read again, so they are
+    the first to go after a data rebuild. The directory is also pruned when
+    the cache is created.
+
+    Cached values are shared between sessions: treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[Path] = None, max_disk_entries: int = 4096):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self._disk_entries = 0
+        self._data: "OrderedDict[str, CachedPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # files named before PLAN_SUFFIX existed: <sha256>.json
+            for path in self.directory.glob("*.json"):
+                if _LEGACY_FILE.fullmatch(path.name):
+                    path.unlink(missing_ok=True)
+            self._prune_disk(self.max_disk_entries)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _file(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{PLAN_SUFFIX}"
+
+    def get(self, key: str) -> Optional[CachedPlan]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.directory is not None:
+            try:
+                stored = json.loads(self._file(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                stored = None
+            if stored is not None:
+                try:
+                    os.utime(self._file(key))  # recently used: evicted last
+                except OSError:
+                    pass
+                value = (stored["month_plan"], stored["grocery"])
+                self._remember(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, month_plan: Dict[str, Any], grocery: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._remember(key, (month_plan, grocery))
+        if self.directory is not None:
+            path = self._file(key)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"month_plan": month_plan, "grocery": grocery}, ensure_ascii=False), encoding="utf-8")
+            new = not path.exists()  # overwriting a plan doesn't add a file
+            os.replace(tmp, path)
+            with self._lock:
+                self._disk_entries += new
+                over = 0 < self.max_disk_entries < self._disk_entries
+            if over:
+                self._prune_disk(int(self.max_disk_entries * 0.9))
+
+    def _prune_disk(self, keep: int) -> None:
+        """Delete the least recently used plan files beyond the newest `keep` (no limit if max_disk_entries <= 0)."""
+        assert self.directory is not None
+        files = []
+        for path in self.directory.glob(f"*{PLAN_SUFFIX}"):  # only plan files: the directory may hold others
+            try:
+                files.append((path.stat().st_mtime_ns, path))
+            except OSError:  # removed meanwhile (another worker sharing the directory)
+                pass
+        evict = len(files) - keep if self.max_disk_entries > 0 else 0
+        files.sort()
+        for _, path in files[:max(0, evict)]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self.disk_evictions += max(0, evict)
+            self._disk_entries = len(files) - max(0, evict)
+
+    def _remember(self, key: str, value: CachedPlan) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk_entries": self._disk_entries if self.directory is not None else 0,
+            "disk_evictions": self.disk_evictions,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_plan_cache() -> PlanCache:
+    """PlanCache sized by $MEALBOT_PLAN_CACHE_SIZE (0 disables), persisted under $MEALBOT_PLAN_CACHE_DIR if set
+    (at most $MEALBOT_PLAN_CACHE_DISK_ENTRIES files, default 4096, 0 = no limit)."""
+    directory = os.environ.get("MEALBOT_PLAN_CACHE_DIR")
+    return PlanCache(
+        max_entries=int(os.environ.get("MEALBOT_PLAN_CACHE_SIZE", "256")),
+        directory=Path(directory) if directory else None,
+        max_disk_entries=int(os.environ.get("MEALBOT_PLAN_CACHE_DISK_ENTRIES", "4096")),
+    )
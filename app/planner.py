@@ -1,18 +1,62 @@
 from __future__ import annotations
 
 import calendar
+import functools
+import hashlib
+import os
+import threading
 from dataclasses import dataclass
 from datetime import date
-from typing import Dict, List, Tuple, Any
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import json
 from pathlib import Path
 
+import numpy as np
+
+from .catalog import load_catalog
+from .metrics import timed
 from .nutrition import NutritionDB
+from .scoring import MACRO_KEYS, PENALTY_TAGS, RecipeScorer
+
+# MEALBOT_RECIPES_PATH points the app at another catalog (e.g. a synthetic one for benchmarks);
+# a .jsonl catalog is opened lazily (LazyRecipeBook)
+RECIPES_PATH = Path(os.environ.get("MEALBOT_RECIPES_PATH") or Path(__file__).resolve().parents[1] / "data" / "recipes.json")
+
+MEALS = ("breakfast", "lunch", "dinner")
+
+LAZY_RECIPE_CACHE_SIZE = 4096  # recipes a LazyRecipeBook keeps parsed
+
+CATALOG_MANIFEST_FORMAT = 1
+
+
+def catalog_manifest_path(path: Path) -> Path:
+    """Sidecar written by scripts/build_recipes.py next to a catalog: version id + per-recipe content hashes.
+
+    Named after the full file name, so recipes.json and recipes.jsonl side by side keep separate manifests.
+    """
+    return path.with_name(path.name + ".manifest.json")
 
-RECIPES_PATH = Path(__file__).resolve().parents[1] / "data" / "recipes.json"
 
-@dataclass
+def _manifest_version(path: Path, size: int, sha256: Callable[[], str]) -> Optional[str]:
+    """The catalog version recorded by the build, if its manifest describes the file at `path`.
+
+    `size` and `sha256` (called only when the mtime differs) describe the catalog bytes.
+    """
+    try:
+        manifest = json.loads(catalog_manifest_path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    src = manifest.get("source", {})
+    if manifest.get("format") != CATALOG_MANIFEST_FORMAT or src.get("size") != size:
+        return None
+    # mtime is the cheap check; fall back to the content hash (e.g. after a fresh checkout)
+    if src.get("mtime_ns") != path.stat().st_mtime_ns and src.get("sha256") != sha256():
+        return None
+    return manifest.get("catalog_version")
+
+@dataclass(frozen=True)
 class Recipe:
     recipe_id: str
     title: str
@@ -22,13 +66,204 @@ class Recipe:
     nutrients_per_serving: Dict[str, float]
 
 class RecipeBook:
+    """Read-only recipe catalog.
+
+    Per-meal candidate lists are built once at load time; treat the book as
+    immutable and share it (see `get_recipe_book`).
+    """
+
     def __init__(self, path: Path = RECIPES_PATH):
-        data = json.loads(path.read_text(encoding="utf-8"))
-        self.recipes: List[Recipe] = [Recipe(**r) for r in data]
+        raw = path.read_bytes()
+        data = json.loads(raw.decode("utf-8"))
+        self.path = path
+        # content version of the catalog; plan caches key on it. A build manifest's
+        # version survives re-serialization; otherwise it's the file's hash.
+        sha256 = hashlib.sha256(raw).hexdigest
+        self.version = _manifest_version(path, len(raw), sha256) or sha256()[:16]
+        self.recipes: Tuple[Recipe, ...] = tuple(Recipe(**r) for r in data)
         self.by_id = {r.recipe_id: r for r in self.recipes}
+        self._by_meal: Dict[str, Tuple[Recipe, ...]] = {
+            meal: tuple(r for r in self.recipes if meal in r.meal_types) for meal in MEALS
+        }
+        # nutrient key order shared by every recipe (None if they differ); enables array day totals
+        key_sets = {tuple(r.nutrients_per_serving) for r in self.recipes}
+        self.nutrient_keys: Optional[Tuple[str, ...]] = key_sets.pop() if len(key_sets) == 1 else None
+        self._scorers: Dict[str, RecipeScorer] = {
+            meal: RecipeScorer(rs, self.nutrient_keys) for meal, rs in self._by_meal.items()
+        }
+
+    def for_meal(self, meal: str) -> Tuple[Recipe, ...]:
+        found = self._by_meal.get(meal)
+        if found is None:
+            return tuple(r for r in self.recipes if meal in r.meal_types)
+        return found
+
+    def scorer_for(self, meal: str) -> RecipeScorer:
+        scorer = self._scorers.get(meal)
+        if scorer is None:
+            scorer = RecipeScorer(self.for_meal(meal))
+        return scorer
+
+
+class _LazyRecipes(Sequence):
+    """Recipes of a LazyRecipeBook at the given rows (all rows if None), parsed on access."""
+
+    def __init__(self, book: "LazyRecipeBook", rows: Optional[np.ndarray] = None):
+        self._book = book
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._book._ids) if self._rows is None else len(self._rows)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._book._recipe(i if self._rows is None else int(self._rows[i]))
+
+
+class _LazyById(Mapping):
+    """recipe_id -> Recipe of a LazyRecipeBook, parsed on access."""
+
+    def __init__(self, book: "LazyRecipeBook"):
+        self._book = book
+
+    def __getitem__(self, recipe_id: str) -> Recipe:
+        return self._book._recipe(self._book._row[recipe_id])
+
+    def __contains__(self, recipe_id) -> bool:
+        return recipe_id in self._book._row
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._book._ids)
+
+    def __len__(self) -> int:
+        return len(self._book._ids)
+
+
+class _MealPositions(Mapping):
+    """recipe_id -> (position in one meal's candidates,), from the book's row index."""
+
+    def __init__(self, row: Dict[str, int], position: np.ndarray):
+        self._row = row
+        self._position = position  # per book row, -1 if not a candidate
+
+    def __getitem__(self, recipe_id: str) -> Tuple[int, ...]:
+        p = int(self._position[self._row[recipe_id]])
+        if p < 0:
+            raise KeyError(recipe_id)
+        return (p,)
 
-    def for_meal(self, meal: str) -> List[Recipe]:
-        return [r for r in self.recipes if meal in r.meal_types]
+    def __iter__(self) -> Iterator[str]:
+        return (rid for rid, i in self._row.items() if self._position[i] >= 0)
+
+    def __len__(self) -> int:
+        return int((self._position >= 0).sum())
+
+
+def _take_rows(values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """values[rows], as a view (no copy of a memory-mapped matrix) when the rows are contiguous."""
+    if len(rows) and rows[-1] - rows[0] == len(rows) - 1:
+        return values[rows[0]:rows[-1] + 1]
+    return values[rows]
+
+
+class LazyRecipeBook(RecipeBook):
+    """RecipeBook over a JSON Lines catalog (one recipe per line), for very large catalogs.
+
+    Only the columns planning needs are held (see app/catalog.py): ids, line
+    offsets, meal/tag masks and the nutrient matrix, memory-mapped when the
+    catalog has been compiled. `recipes`, `by_id`, `for_meal()` and the
+    scorers' `recipes` are lazy sequences; a Recipe is parsed from its line
+    when it's accessed (the last LAZY_RECIPE_CACHE_SIZE stay cached). Recipe
+    ids must be unique.
+    """
+
+    def __init__(self, path: Path = RECIPES_PATH):
+        self.path = path
+        self._file = open(path, "rb")  # a rebuild renames a new file over `path`; this one stays readable
+        self._file_lock = threading.Lock()
+        size = os.fstat(self._file.fileno()).st_size
+        cols = load_catalog(path)
+        self.version = _manifest_version(path, size, lambda: cols.sha256) or cols.sha256[:16]
+        self._ids = cols.ids
+        self._offsets = cols.offsets
+        self._row = {rid: i for i, rid in enumerate(cols.ids)}
+        if len(self._row) != len(cols.ids):
+            raise ValueError(f"{path}: duplicate recipe_id")
+        self._recipe = functools.lru_cache(maxsize=LAZY_RECIPE_CACHE_SIZE)(self._read_recipe)
+        self.recipes = _LazyRecipes(self)
+        self.by_id = _LazyById(self)
+        self.nutrient_keys = tuple(cols.nutrient_keys) if cols.common_keys and cols.ids else None
+
+        self._meal_rows = {m: np.flatnonzero(cols.meals[:, j]) for j, m in enumerate(cols.meal_names)}
+        tag_col = {t: j for j, t in enumerate(cols.tag_names)}
+        key_col = {k: j for j, k in enumerate(cols.nutrient_keys)}
+        self._by_meal = {}
+        self._scorers = {}
+        for meal in MEALS:
+            rows = self._meal_rows.get(meal, np.zeros(0, dtype=np.int64))
+            values = _take_rows(cols.values, rows)
+            macros = np.zeros((len(rows), len(MACRO_KEYS)), dtype=np.float64)
+            for c, k in enumerate(MACRO_KEYS):
+                if k in key_col:
+                    macros[:, c] = np.nan_to_num(values[:, key_col[k]], nan=0.0)
+            tags = {
+                t: cols.tags[rows, tag_col[t]] if t in tag_col else np.zeros(len(rows), dtype=bool)
+                for t in PENALTY_TAGS
+            }
+            position = np.full(len(cols.ids), -1, dtype=np.int64)
+            position[rows] = np.arange(len(rows))
+            self._by_meal[meal] = _LazyRecipes(self, rows)
+            self._scorers[meal] = RecipeScorer.from_arrays(
+                self._by_meal[meal], [cols.ids[i] for i in rows.tolist()], macros,
+                values if self.nutrient_keys is not None else None, self.nutrient_keys,
+                tags, _MealPositions(self._row, position), (cols.nutrient_keys, values),
+            )
+
+    def _read_recipe(self, row: int) -> Recipe:
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        with self._file_lock:
+            self._file.seek(start)
+            line = self._file.read(end - start)
+        return Recipe(**json.loads(line))
+
+    def for_meal(self, meal: str) -> Sequence[Recipe]:
+        found = self._by_meal.get(meal)
+        if found is None:
+            return _LazyRecipes(self, self._meal_rows.get(meal, np.zeros(0, dtype=np.int64)))
+        return found
+
+    def __del__(self):
+        file = getattr(self, "_file", None)
+        if file is not None:
+            file.close()
+
+
+def open_recipe_book(path: Path = RECIPES_PATH) -> RecipeBook:
+    """LazyRecipeBook for a .jsonl catalog, else RecipeBook."""
+    return LazyRecipeBook(path) if path.suffix == ".jsonl" else RecipeBook(path)
+
+
+_BOOKS: Dict[Path, Tuple[int, RecipeBook]] = {}
+_BOOKS_LOCK = threading.Lock()
+
+
+def get_recipe_book(path: Path = RECIPES_PATH) -> RecipeBook:
+    """Return the shared RecipeBook for `path`, reloading only when its mtime changes."""
+    mtime = path.stat().st_mtime_ns
+    cached = _BOOKS.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _BOOKS_LOCK:
+        cached = _BOOKS.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, open_recipe_book(path))
+            _BOOKS[path] = cached
+    return cached[1]
 
 
 def month_dates(yyyy_mm: str) -> List[str]:
@@ -37,6 +272,19 @@ def month_dates(yyyy_mm: str) -> List[str]:
     return [date(y, m, d).isoformat() for d in range(1, last + 1)]
 
 
+def day_index(month_plan: Dict[str, Any]) -> Dict[str, int]:
+    """date -> position in month_plan["days"]; build once and keep next to the plan."""
+    return {d["date"]: i for i, d in enumerate(month_plan["days"])}
+
+
+def find_day(month_plan: Dict[str, Any], date_str: str, index: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    """O(1) day lookup via `index` (see `day_index`), scanning only when no index is available."""
+    if index is None:
+        return next((d for d in month_plan["days"] if d["date"] == date_str), None)
+    i = index.get(date_str)
+    return None if i is None else month_plan["days"][i]
+
+
 def _macro_targets_for_meal(daily_macros: Dict[str, float], meal: str) -> Dict[str, float]:
     split = {"breakfast": 0.25, "lunch": 0.35, "dinner": 0.40}[meal]
     return {k: float(v) * split for k, v in daily_macros.items()}
@@ -75,7 +323,8 @@ def _penalty(recipe: Recipe, prefs: Dict[str, str]) -> float:
     return pen
 
 
-def choose_recipe(recipes: List[Recipe], target_macros: Dict[str, float], prefs: Dict[str, str], recent_ids: List[str]) -> Recipe:
+def choose_recipe(recipes: Sequence[Recipe], target_macros: Dict[str, float], prefs: Dict[str, str], recent_ids: List[str]) -> Recipe:
+    """Scalar reference implementation; the planner uses `RecipeScorer.choose`."""
     best: Tuple[float, Recipe] | None = None
     for r in recipes:
         if r.recipe_id in recent_ids:
@@ -113,29 +362,98 @@ def sum_nutrients(items: List[Tuple[Recipe, float]]) -> Dict[str, float]:
     return {k: round(v, 2) for k, v in totals.items()}
 
 
-def build_month_plan(yyyy_mm: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+@timed("build_month_plan")
+def build_month_plan(yyyy_mm: str, user_profile: Dict[str, Any], book: Optional[RecipeBook] = None) -> Dict[str, Any]:
+    return {"month": yyyy_mm, "days": list(iter_month_days(yyyy_mm, user_profile, book))}
+
+
+def iter_month_days(yyyy_mm: str, user_profile: Dict[str, Any], book: Optional[RecipeBook] = None) -> Iterator[Dict[str, Any]]:
+    """The days of `build_month_plan`, yielded one at a time as they are planned."""
     prefs = user_profile["preferences"]
     daily_targets = user_profile["daily_targets"]
     daily_macros = daily_targets["macros_g"]
 
-    book = RecipeBook()
+    book = book or get_recipe_book()
     dates = month_dates(yyyy_mm)
 
     recent: List[str] = []
-    days = []
 
     for d in dates:
         day_items = {}
         chosen: List[Tuple[Recipe, float]] = []
-        for meal in ["breakfast", "lunch", "dinner"]:
+        for meal in MEALS:
             target = _macro_targets_for_meal(daily_macros, meal)
-            r = choose_recipe(book.for_meal(meal), target, prefs, recent_ids=recent[-8:])
+            r = book.scorer_for(meal).choose(target, prefs, recent_ids=recent[-8:])
             s = round(scale_servings(r, target), 2)
             day_items[meal] = {"recipe_id": r.recipe_id, "servings": s}
             chosen.append((r, s))
             recent.append(r.recipe_id)
 
         totals = sum_nutrients(chosen)
-        days.append({"date": d, **day_items, "totals": totals})
+        yield {"date": d, **day_items, "totals": totals}
+
+
+@timed("build_month_plans")
+def build_month_plans(jobs: Sequence[Tuple[str, Dict[str, Any]]], book: Optional[RecipeBook] = None) -> List[Dict[str, Any]]:
+    """Plan many (month, user_profile) pairs at once, scoring all users of a month together.
+
+    Gives the same plans as calling `build_month_plan` on each pair.
+    """
+    book = book or get_recipe_book()
+    groups: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+    for i, (yyyy_mm, profile) in enumerate(jobs):
+        keys = tuple(k for k in profile["daily_targets"]["macros_g"] if k in MACRO_KEYS)
+        groups.setdefault((yyyy_mm, keys), []).append(i)
+
+    plans: List[Dict[str, Any]] = [{} for _ in jobs]
+    for (yyyy_mm, keys), idxs in groups.items():
+        profiles = [jobs[i][1] for i in idxs]
+        for i, plan in zip(idxs, _build_month_plan_group(yyyy_mm, keys, profiles, book)):
+            plans[i] = plan
+    return plans
+
+
+def _build_month_plan_group(yyyy_mm: str, keys: Tuple[str, ...], profiles: List[Dict[str, Any]], book: RecipeBook) -> List[Dict[str, Any]]:
+    n = len(profiles)
+    meal_targets = {
+        meal: [_macro_targets_for_meal(p["daily_targets"]["macros_g"], meal) for p in profiles] for meal in MEALS
+    }
+    meal_arrays = {
+        meal: (
+            np.array([[t[k] for k in keys] for t in meal_targets[meal]], dtype=np.float64).reshape(n, len(keys)),
+            np.vstack([book.scorer_for(meal).penalties(p["preferences"]) for p in profiles]),
+        )
+        for meal in MEALS
+    }
+
+    nutrient_keys = book.nutrient_keys
+    recents: List[List[str]] = [[] for _ in profiles]
+    days: List[List[Dict[str, Any]]] = [[] for _ in profiles]
+    for d in month_dates(yyyy_mm):
+        day_items: List[Dict[str, Any]] = [{} for _ in profiles]
+        chosen: List[List[Tuple[Recipe, float]]] = [[] for _ in profiles]
+        day_totals = None
+        for meal in MEALS:
+            scorer = book.scorer_for(meal)
+            targets, penalties = meal_arrays[meal]
+            picks = scorer.choose_batch_indices(targets, keys, penalties, [r[-8:] for r in recents])
+            servings = []
+            for u, i in enumerate(picks.tolist()):
+                r = scorer.recipes[i]
+                s = round(scale_servings(r, meal_targets[meal][u]), 2)
+                servings.append(s)
+                day_items[u][meal] = {"recipe_id": r.recipe_id, "servings": s}
+                chosen[u].append((r, s))
+                recents[u].append(r.recipe_id)
+            if nutrient_keys is not None:
+                # same additions in the same order as sum_nutrients, so identical floats
+                meal_totals = scorer.nutrients[picks] * np.array(servings)[:, None]
+                day_totals = meal_totals if day_totals is None else day_totals + meal_totals
+        for u in range(n):
+            if day_totals is None:
+                totals = sum_nutrients(chosen[u])
+            else:
+                totals = {k: round(v, 2) for k, v in zip(nutrient_keys, day_totals[u].tolist())}
+            days[u].append({"date": d, **day_items[u], "totals": totals})
 
-    return {"month": yyyy_mm, "days": days}
+    return [{"month": yyyy_mm, "days": dd} for dd in days]
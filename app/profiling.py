@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import contextvars
+import heapq
+import hmac
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Request-scoped profiling for admins. Nothing here runs unless
+# MEALBOT_ADMIN_TOKEN is set (main.py only installs the middleware then);
+# a request is profiled when it also carries the admin token and asks for it
+# with `X-MealBot-Profile: 1` or `?profile=1`.
+
+ADMIN_HEADER = "x-mealbot-admin-token"
+PROFILE_HEADER = "x-mealbot-profile"
+
+APP_ROOT = str(Path(__file__).resolve().parent)
+
+# True while the current request is being profiled; the planner checks it to
+# run in this process (where the sampler can see it) instead of the pool.
+profiling_active: contextvars.ContextVar[bool] = contextvars.ContextVar("profiling_active", default=False)
+
+
+def is_admin(headers: Dict[str, str], token: Optional[str]) -> bool:
+    supplied = headers.get(ADMIN_HEADER)
+    return bool(token) and supplied is not None and hmac.compare_digest(supplied, token)
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of every other thread every `interval` seconds.
+
+    Only stacks that pass through this package are kept (idle threadpool
+    workers and the event loop's select() are dropped), so concurrent requests
+    can show up, but idle time doesn't. Output is collapsed-stack format
+    (`frame;frame;frame count`), readable by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="mealbot-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.is_set():
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = self._collapse(frame)
+                if stack is not None:
+                    if tid not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    self.stacks[f"{names.get(tid, tid)};{stack}"] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame) -> Optional[str]:
+        frames: List[str] = []
+        ours = False
+        while frame is not None:
+            code = frame.f_code
+            ours = ours or code.co_filename.startswith(APP_ROOT)
+            module = frame.f_globals.get("__name__", "?")
+            frames.append(f"{module}.{getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+        if not ours:
+            return None
+        frames.reverse()
+        return ";".join(frames)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+class SlowRequestLog:
+    """The `size` slowest requests of the current and the previous `window_seconds`."""
+
+    def __init__(self, size: int = 20, window_seconds: float = 600.0):
+        self.size = size
+        self.window_seconds = window_seconds
+        self._current: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._previous: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._window_start = time.monotonic()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def accepts(self, seconds: float) -> bool:
+        """Cheap unlocked pre-check: could a request this slow enter the log?"""
+        heap = self._current
+        return len(heap) < self.size or seconds > heap[0][0] or time.monotonic() - self._window_start >= self.window_seconds
+
+    def offer(self, seconds: float, info: Dict[str, Any]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window_seconds:
+                self._previous, self._current = self._current, []
+                self._window_start = now
+            entry = (seconds, next(self._seq), {**info, "ms": round(seconds * 1000.0, 3), "at": time.time()})
+            if len(self._current) < self.size:
+                heapq.heappush(self._current, entry)
+            elif seconds > self._current[0][0]:
+                heapq.heapreplace(self._current, entry)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self._current + self._previous, reverse=True)[:self.size]
+        return [info for _, _, info in entries]
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: admin-requested profiles plus the slow-request log.
+
+    A profiled request gets `X-MealBot-Profile: <name>` in its response and
+    its collapsed stacks are written to `directory/<name>.collapsed`. Only
+    one request is profiled at a time; others asking meanwhile get
+    `X-MealBot-Profile: busy` and run normally.
+    """
+
+    def __init__(self, app, token: str, directory: Path, slow_log: SlowRequestLog, interval: float = 0.001):
+        self.app = app
+        self.token = token
+        self.directory = Path(directory)
+        self.slow_log = slow_log
+        self.interval = interval
+        self._busy = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _wants_profile(self, scope) -> bool:
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", ())}
+        if not is_admin(headers, self.token):
+            return False
+        query = scope.get("query_string", b"").decode("latin-1")
+        return headers.get(PROFILE_HEADER) == "1" or "profile=1" in query.split("&")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status: List[Optional[int]] = [None]
+        profiler: Optional[SamplingProfiler] = None
+        name: Optional[str] = None
+        if self._wants_profile(scope):
+            if self._busy.acquire(blocking=False):
+                name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(self._ids)}"
+                profiler = SamplingProfiler(self.interval)
+            else:
+                name = "busy"
+
+        async def send_wrapped(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if name is not None:
+                    message = {**message, "headers": [*message.get("headers", []), (PROFILE_HEADER.encode(), name.encode())]}
+            await send(message)
+
+        token = profiling_active.set(True) if profiler is not None else None
+        if profiler is not None:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapped)
+        finally:
+            if profiler is not None:
+                profiling_active.reset(token)
+                profiler.stop()
+                try:
+                    self._write(name, scope, profiler)
+                finally:
+                    self._busy.release()
+            seconds = time.perf_counter() - t0
+            if self.slow_log.accepts(seconds):
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                query = scope.get("query_string", b"").decode("latin-1")
+                self.slow_log.offer(seconds, {
+                    "method": scope.get("method"), "route": route,
+                    "path": scope.get("path", "") + (f"?{query}" if query else ""), "status": status[0],
+                    "profile": name,
+                })
+
+    def _write(self, name: str, scope, profiler: SamplingProfiler) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{name}.collapsed").write_text(profiler.collapsed(), encoding="utf-8")
+
+
+def profile_directory() -> Path:
+    """$MEALBOT_PROFILE_DIR, default <tmp>/mealbot-profiles."""
+    return Path(os.environ.get("MEALBOT_PROFILE_DIR") or Path(tempfile.gettempdir()) / "mealbot-profiles")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Optional, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # plain json fallback: same output, slower
+    orjson = None
+
+# MEALBOT_STRICT_RESPONSES=1 validates every fast response against its model
+# (what FastAPI's response_model would do); tests can also flip STRICT directly.
+STRICT = os.environ.get("MEALBOT_STRICT_RESPONSES", "").lower() in {"1", "true", "yes"}
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_response(model: Type[BaseModel], content: Any, strict: Optional[bool] = None, **kwargs: Any) -> FastJSONResponse:
+    """Send `content` as `model` without re-validating it.
+
+    Handlers build their payloads already in the model's shape (every field
+    present, floats as floats), so FastAPI's response_model pass would only
+    copy them. Returning a Response skips it; `response_model` on the route
+    still documents the schema.
+    """
+    if STRICT if strict is None else strict:
+        content = model.model_validate(content).model_dump(mode="json")
+    return FastJSONResponse(content, **kwargs)
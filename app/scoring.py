@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .planner import Recipe
+
+MACRO_KEYS = ("protein", "carbohydrates", "total_fat", "fiber")
+_COL = {k: j for j, k in enumerate(MACRO_KEYS)}
+# recipe tags the preference penalties look at
+PENALTY_TAGS = ("refined_sugar", "contains_dairy", "low_gluten", "gluten_free")
+
+
+class RecipeScorer:
+    """Vectorized equivalent of `planner.choose_recipe` over a fixed candidate list.
+
+    Macros are kept as a dense (n_recipes x len(MACRO_KEYS)) float64 array and
+    the tags that drive preference penalties as boolean masks, so a pick is a
+    handful of array ops instead of a Python loop per recipe. Column-by-column
+    accumulation keeps the float results (and therefore the picks, including
+    ties) identical to the scalar implementation.
+    """
+
+    def __init__(self, recipes: Sequence["Recipe"], nutrient_keys: Optional[Sequence[str]] = None):
+        recipes = tuple(recipes)
+        n = len(recipes)
+        macros = np.array(
+            [[float(r.nutrients_per_serving.get(k, 0.0)) for k in MACRO_KEYS] for r in recipes],
+            dtype=np.float64,
+        ).reshape(n, len(MACRO_KEYS))
+        # full per-serving nutrients, only when every recipe has exactly `nutrient_keys`
+        nutrients: Optional[np.ndarray] = None
+        if nutrient_keys is not None:
+            nutrients = np.array(
+                [[float(r.nutrients_per_serving[k]) for k in nutrient_keys] for r in recipes], dtype=np.float64
+            ).reshape(n, len(nutrient_keys))
+        tag_sets = [set(r.tags) for r in recipes]
+        tags = {t: np.array([t in ts for ts in tag_sets], dtype=bool) for t in PENALTY_TAGS}
+        positions: Dict[str, List[int]] = {}
+        for i, r in enumerate(recipes):
+            positions.setdefault(r.recipe_id, []).append(i)
+        self._init(recipes, [r.recipe_id for r in recipes], macros, nutrients, nutrient_keys, tags, positions)
+
+    @classmethod
+    def from_arrays(cls, recipes: Sequence["Recipe"], recipe_ids: Sequence[str], macros: np.ndarray,
+                    nutrients: Optional[np.ndarray], nutrient_keys: Optional[Sequence[str]],
+                    tags: Dict[str, np.ndarray], positions: Mapping[str, Sequence[int]],
+                    table: Optional[Tuple[Sequence[str], np.ndarray]] = None) -> "RecipeScorer":
+        """A scorer over precomputed columns; `recipes` may be a lazy sequence (see planner.LazyRecipeBook).
+
+        `tags` maps each of PENALTY_TAGS to a mask, `positions` maps a recipe
+        id to its positions, and `table` is (keys, matrix with NaN for missing
+        nutrients) for `nutrient_columns`.
+        """
+        scorer = cls.__new__(cls)
+        scorer._init(recipes, recipe_ids, macros, nutrients, nutrient_keys, tags, positions, table)
+        return scorer
+
+    def _init(self, recipes, recipe_ids, macros, nutrients, nutrient_keys, tags, positions, table=None) -> None:
+        self.recipes: Sequence["Recipe"] = recipes
+        self.recipe_ids: Sequence[str] = recipe_ids
+        self.macros = macros
+        self.nutrients: Optional[np.ndarray] = nutrients
+        self.nutrient_keys = tuple(nutrient_keys) if nutrient_keys is not None else None
+        self.refined_sugar = tags["refined_sugar"]
+        self.contains_dairy = tags["contains_dairy"]
+        self.low_gluten = tags["low_gluten"]
+        self.gluten_free = tags["gluten_free"]
+        self._positions: Mapping[str, Sequence[int]] = positions
+        self._table = table
+        self._penalties: Dict[Tuple, np.ndarray] = {}
+
+    def nutrient_columns(self, keys: Sequence[str]) -> np.ndarray:
+        """(n_recipes x len(keys)) per-serving amounts, 0.0 where a recipe lacks a nutrient."""
+        n = len(self.recipes)
+        if self._table is not None:
+            table_keys, values = self._table
+            col = {k: j for j, k in enumerate(table_keys)}
+            out = np.zeros((n, len(keys)), dtype=np.float64)
+            for c, k in enumerate(keys):
+                if k in col:
+                    out[:, c] = values[:, col[k]]
+            return np.nan_to_num(out, nan=0.0)
+        if self.nutrients is not None and all(k in self.nutrient_keys for k in keys):
+            return self.nutrients[:, [self.nutrient_keys.index(k) for k in keys]].reshape(n, len(keys))
+        return np.array([[float(r.nutrients_per_serving.get(k, 0.0)) for k in keys] for r in self.recipes],
+                        dtype=np.float64).reshape(n, len(keys))
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def penalties(self, prefs: Dict[str, str]) -> np.ndarray:
+        """Per-recipe preference penalty, same rules as `planner._penalty`."""
+        key = (prefs.get("refined_sugar"), prefs.get("dairy_limit_level"), prefs.get("gluten_limit_level"))
+        pen = self._penalties.get(key)
+        if pen is not None:
+            return pen
+        sugar, dairy, gluten = key
+        pen = np.zeros(len(self.recipes), dtype=np.float64)
+        if sugar == "avoid":
+            pen += np.where(self.refined_sugar, 1000.0, 0.0)
+        if dairy == "none":
+            pen += np.where(self.contains_dairy, 1000.0, 0.0)
+        elif dairy == "low":
+            pen += np.where(self.contains_dairy, 4.0, 0.0)
+        if gluten == "very_low":
+            pen += np.where(self.low_gluten, 2.0, 0.0)
+            pen += np.where(~self.gluten_free, 10.0, 0.0)
+        pen.setflags(write=False)
+        self._penalties[key] = pen
+        return pen
+
+    def distances(self, target_macros: Dict[str, float]) -> np.ndarray:
+        """Normalized L1 distance of every recipe to `target_macros`."""
+        d = np.zeros(len(self.recipes), dtype=np.float64)
+        for k, t in target_macros.items():
+            j = _COL.get(k)
+            if j is None:
+                continue
+            d += np.abs(self.macros[:, j] - t) / max(float(t), 1e-6)
+        return d
+
+    def position(self, recipe_id: str) -> int:
+        """Position of `recipe_id` in `recipes` (the last one if it repeats)."""
+        return self._positions[recipe_id][-1]
+
+    def exclusion_mask(self, recent_ids: Sequence[str]) -> np.ndarray:
+        mask = np.zeros(len(self.recipes), dtype=bool)
+        for rid in recent_ids:
+            for i in self._positions.get(rid, ()):
+                mask[i] = True
+        return mask
+
+    def choose_batch(self, targets: np.ndarray, keys: Sequence[str], penalties: np.ndarray,
+                     recent_ids: Sequence[Sequence[str]]) -> List["Recipe"]:
+        """`choose` for many users in one pass.
+
+        `targets` is (n_users x len(keys)) with columns in each user's target
+        order (users with a different key order must go in separate batches to
+        keep the float sums identical), `penalties` is (n_users x n_recipes).
+        """
+        return [self.recipes[i] for i in self.choose_batch_indices(targets, keys, penalties, recent_ids)]
+
+    def choose_batch_indices(self, targets: np.ndarray, keys: Sequence[str], penalties: np.ndarray,
+                             recent_ids: Sequence[Sequence[str]]) -> np.ndarray:
+        """Positions in `recipes` of the `choose_batch` picks."""
+        n_users = targets.shape[0]
+        scores = np.zeros((n_users, len(self.recipes)), dtype=np.float64)
+        for c, k in enumerate(keys):
+            t = targets[:, c:c + 1]
+            scores += np.abs(self.macros[:, _COL[k]] - t) / np.maximum(t, 1e-6)
+        scores += penalties
+        excluded = np.zeros_like(scores, dtype=bool)
+        for u, recent in enumerate(recent_ids):
+            for rid in recent:
+                for i in self._positions.get(rid, ()):
+                    excluded[u, i] = True
+        scores[excluded] = np.inf
+        picks = np.argmin(scores, axis=1)
+        # fallback allow repeats
+        picks[excluded.all(axis=1)] = 0
+        return picks
+
+    def choose(self, target_macros: Dict[str, float], prefs: Dict[str, str], recent_ids: Sequence[str]) -> "Recipe":
+        scores = self.distances(target_macros) + self.penalties(prefs)
+        excluded = self.exclusion_mask(recent_ids)
+        if excluded.all():
+            # fallback allow repeats
+            return self.recipes[0]
+        scores[excluded] = np.inf
+        return self.recipes[int(np.argmin(scores))]
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+SessionKey = Tuple[str, str]  # (session_id, month)
+T = TypeVar("T")
+
+
+class SessionStore(ABC):
+    """Per-user plan state keyed by (session_id, month).
+
+    State is a JSON-serializable dict. Treat what `get` returns as read-only:
+    replace a state with `put`, or change it with `update`, which is atomic
+    with respect to every other writer of the store (other threads, and for
+    shared stores other processes).
+    """
+
+    @abstractmethod
+    def get(self, session_id: str, month: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, month: str, state: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, session_id: str, month: str, change: Callable[[Optional[Dict[str, Any]]], T]) -> T:
+        """Modify the current state in place with `change(state)` and store it; returns what `change` returned.
+
+        `change` gets None when there is no state (nothing is stored then).
+        It must raise before modifying the state if it rejects it, and it may
+        be called again on a fresh state when another writer got there first,
+        so it should have no other side effects.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str, month: str) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def approx_len(self) -> int:
+        """Number of states, possibly slightly stale (cheap enough for every metrics scrape)."""
+        return len(self)
+
+    def close(self) -> None:
+        """Release the store's resources (no-op for in-memory stores)."""
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store with optional TTL. Not shared between workers."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[SessionKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # one lock per key serializes put/update of that state (weakly held: idle keys don't accumulate)
+        self._key_locks: "weakref.WeakValueDictionary[SessionKey, threading.Lock]" = weakref.WeakValueDictionary()
+
+    def _key_lock(self, key: SessionKey) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, session_id: str, month: str) -> Optional[Dict[str, Any]]:
+        key = (session_id, month)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if self.ttl_seconds is not None and time.monotonic() - item[0] > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def _store(self, key: SessionKey, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), state)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def put(self, session_id: str, month: str, state: Dict[str, Any]) -> None:
+        key = (session_id, month)
+        with self._key_lock(key):
+            self._store(key, state)
+
+    def update(self, session_id: str, month: str, change: Callable[[Optional[Dict[str, Any]]], T]) -> T:
+        key = (session_id, month)
+        with self._key_lock(key):
+            state = self.get(session_id, month)
+            result = change(state)
+            if state is not None:
+                self._store(key, state)  # refreshes the TTL
+            return result
+
+    def delete(self, session_id: str, month: str) -> None:
+        with self._lock:
+            self._data.pop((session_id, month), None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Conflict(Exception):
+    """Another writer changed the row since it was read."""
+
+
+_DETACHED = ("inventory", "ledger")  # state keys the SQLite store keeps outside the `state` column
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store that any number of worker processes can share.
+
+    The database runs in WAL mode so readers never block the writer. Every
+    write is committed before it returns, so the next request sees it in
+    whichever worker it lands. `update` is a compare-and-swap: the change is
+    applied to a freshly decoded state and committed only if no other writer
+    got there in the meantime; otherwise it is retried on the new state.
+
+    A state is split in three: the plan part (profile, plan, grocery list,
+    ...) is one JSON column, the inventory has its own column and the ledger
+    is an append-only table keyed (session_id, month, seq). An update that
+    only logs events (a cook, undo or replay) rewrites the inventory and
+    inserts the new rows; the primary key rejects a second event with the
+    same seq, and `UPDATE ... WHERE version = ?` a plan replaced meanwhile.
+    Anything else rewrites the plan part and bumps the row version.
+
+    The version is the ns timestamp of the last plan write. Decoded plan
+    parts and ledgers are kept in a small per-process LRU and reused while the
+    version is unchanged, so repeated reads cost two indexed SELECTs (row
+    and new events) instead of re-parsing the whole plan. `get` hands out a
+    fresh top-level dict, so a caller that sets a key on it can't
+    desynchronize the cache from the database; `update` always works on a
+    freshly decoded state.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: Optional[float] = None, decoded_cache_size: int = 1024,
+                 count_interval: float = 30.0):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self.decoded_cache_size = decoded_cache_size
+        self._decoded: "OrderedDict[SessionKey, Tuple[int, Dict[str, Any], List[Any]]]" = OrderedDict()
+        self.decoded_hits = 0
+        self.decoded_misses = 0
+        self.update_conflicts = 0
+        self.count_interval = count_interval
+        self._count: Optional[Tuple[float, int]] = None  # (monotonic time, COUNT(*)) for approx_len
+        # autocommit: transactions are opened explicitly (BEGIN IMMEDIATE for writes)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT NOT NULL, month TEXT NOT NULL, state TEXT NOT NULL, updated REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0, inventory TEXT, PRIMARY KEY (session_id, month))"
+        )
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in cols:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        if "inventory" not in cols:
+            # NULL marks rows written before the split: inventory and ledger are still inside `state`
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN inventory TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            " session_id TEXT NOT NULL, month TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, month, seq)) WITHOUT ROWID"
+        )
+        self._closed = False
+
+    def _expired(self, updated: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - updated > self.ttl_seconds
+
+    @contextmanager
+    def _write_txn(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _read(self, key: SessionKey, with_state: bool, after_seq: int = 0):
+        """One consistent snapshot: (version, updated, inventory[, state]) or None, and the raw events after `after_seq`."""
+        cols = "version, updated, inventory, state" if with_state else "version, updated, inventory"
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(f"SELECT {cols} FROM sessions WHERE session_id = ? AND month = ?", key).fetchone()
+                events = [] if row is None else [r[0] for r in self._conn.execute(
+                    "SELECT event FROM ledger WHERE session_id = ? AND month = ? AND seq > ? ORDER BY seq", (*key, after_seq)
+                )]
+            finally:
+                self._conn.execute("COMMIT")
+        return row, events
+
+    @staticmethod
+    def _assemble(plan: Dict[str, Any], inventory_raw: Optional[str], ledger: List[Any]) -> Dict[str, Any]:
+        state = dict(plan)
+        if inventory_raw is not None:
+            inventory = json.loads(inventory_raw)
+            if inventory is not None:
+                state["inventory"] = inventory
+            state["ledger"] = list(ledger)
+        return state
+
+    def get(self, session_id: str, month: str) -> Optional[Dict[str, Any]]:
+        key = (session_id, month)
+        with self._lock:
+            cached = self._decoded.get(key)
+            row, events = self._read(key, with_state=False, after_seq=len(cached[2]) if cached else 0)
+            if row is None:
+                self._decoded.pop(key, None)
+                return None
+            version, updated, inventory_raw = row
+            if self._expired(updated):
+                self.delete(session_id, month)
+                return None
+            if cached is not None and cached[0] == version:
+                self.decoded_hits += 1
+                plan, ledger = cached[1], cached[2] + [json.loads(e) for e in events]
+            else:
+                self.decoded_misses += 1
+                row, events = self._read(key, with_state=True)
+                if row is None:  # deleted between the two reads
+                    return self.get(session_id, month)
+                version, _, inventory_raw, raw = row
+                plan, ledger = json.loads(raw), [json.loads(e) for e in events]
+            self._decoded[key] = (version, plan, ledger)
+            self._decoded.move_to_end(key)
+            while len(self._decoded) > self.decoded_cache_size:
+                self._decoded.popitem(last=False)
+            return self._assemble(plan, inventory_raw, ledger)
+
+    def put(self, session_id: str, month: str, state: Dict[str, Any]) -> None:
+        key = (session_id, month)
+        plan = {k: v for k, v in state.items() if k not in _DETACHED}
+        ledger = state.get("ledger", [])
+        with self._lock:
+            self._decoded.pop(key, None)
+            with self._write_txn():
+                row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ? AND month = ?", key).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, month, state, inventory, updated, version) VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, _dumps(plan), _dumps(state.get("inventory")), time.time(), max(time.time_ns(), row[0] + 1 if row else 0)),
+                )
+                self._conn.execute("DELETE FROM ledger WHERE session_id = ? AND month = ?", key)
+                self._conn.executemany(
+                    "INSERT INTO ledger (session_id, month, seq, event) VALUES (?, ?, ?, ?)",
+                    [(*key, seq, _dumps(ev)) for seq, ev in enumerate(ledger, 1)],
+                )
+
+    def update(self, session_id: str, month: str, change: Callable[[Optional[Dict[str, Any]]], T]) -> T:
+        key = (session_id, month)
+        while True:
+            row, events = self._read(key, with_state=True)
+            if row is None or self._expired(row[1]):
+                return change(None)
+            version, _, inventory_raw, raw = row
+            # private copies: the cached state stays untouched if `change` raises or loses the race
+            state = self._assemble(json.loads(raw), inventory_raw, [json.loads(e) for e in events])
+            before = dict(state)
+            result = change(state)
+            if self._commit(key, version, inventory_raw, len(events), before, state):
+                return result
+            self.update_conflicts += 1
+
+    def _commit(self, key: SessionKey, version: int, inventory_raw: Optional[str], stored_events: int,
+                before: Dict[str, Any], state: Dict[str, Any]) -> bool:
+        """Store what an update changed; False if another writer got there first."""
+        ledger = state.get("ledger", [])
+        inventory = _dumps(state.get("inventory"))
+        new_events = ledger[stored_events:]
+        plan_keys = [k for k in state if k not in _DETACHED]
+        plan_changed = (
+            inventory_raw is None  # not split yet: this write splits it
+            or plan_keys != [k for k in before if k not in _DETACHED]
+            or any(state[k] is not before[k] for k in plan_keys)
+        )
+        if not plan_changed and not new_events:
+            if inventory == inventory_raw:
+                return True
+            plan_changed = True  # an inventory change without an event: guard it like a plan change
+        rows = [(*key, seq, _dumps(ev)) for seq, ev in enumerate(new_events, stored_events + 1)]
+        try:
+            with self._lock:
+                with self._write_txn():
+                    if plan_changed:
+                        self._decoded.pop(key, None)
+                        plan = {k: state[k] for k in plan_keys}
+                        cur = self._conn.execute(
+                            "UPDATE sessions SET state = ?, inventory = ?, updated = ?, version = ?"
+                            " WHERE session_id = ? AND month = ? AND version = ?",
+                            (_dumps(plan), inventory, time.time(), max(time.time_ns(), version + 1), *key, version),
+                        )
+                        # the version guards the plan, the event count the inventory
+                        count = self._conn.execute("SELECT COUNT(*) FROM ledger WHERE session_id = ? AND month = ?", key).fetchone()[0]
+                        if cur.rowcount == 0 or count != stored_events:
+                            raise _Conflict
+                    else:
+                        cur = self._conn.execute(
+                            "UPDATE sessions SET inventory = ?, updated = ? WHERE session_id = ? AND month = ? AND version = ?",
+                            (inventory, time.time(), *key, version),
+                        )
+                        if cur.rowcount == 0:
+                            raise _Conflict
+                    # a concurrent event with the same seq fails the primary key
+                    self._conn.executemany("INSERT INTO ledger (session_id, month, seq, event) VALUES (?, ?, ?, ?)", rows)
+        except (_Conflict, sqlite3.IntegrityError):
+            return False
+        return True
+
+    def delete(self, session_id: str, month: str) -> None:
+        key = (session_id, month)
+        with self._lock:
+            self._decoded.pop(key, None)
+            with self._write_txn():
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ? AND month = ?", key)
+                self._conn.execute("DELETE FROM ledger WHERE session_id = ? AND month = ?", key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            n = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            self._count = (time.monotonic(), n)
+            return n
+
+    def approx_len(self) -> int:
+        """COUNT(*) scans the table: recount at most every `count_interval` seconds."""
+        cached = self._count
+        if cached is not None and time.monotonic() - cached[0] < self.count_interval:
+            return cached[1]
+        return len(self)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store(url: Optional[str] = None) -> SessionStore:
+    """Build the store described by `url` (default: $MEALBOT_SESSION_STORE).
+
+    - "memory" (default): MemorySessionStore, sized by $MEALBOT_SESSION_MAX_ENTRIES
+    - "sqlite:///path/to/sessions.db": SQLiteSessionStore
+
+    $MEALBOT_SESSION_TTL (seconds) applies to both.
+    """
+    url = url or os.environ.get("MEALBOT_SESSION_STORE", "memory")
+    ttl_env = os.environ.get("MEALBOT_SESSION_TTL")
+    ttl = float(ttl_env) if ttl_env else None
+    if url == "memory":
+        return MemorySessionStore(max_entries=int(os.environ.get("MEALBOT_SESSION_MAX_ENTRIES", "10000")), ttl_seconds=ttl)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(Path(url[len("sqlite:///"):]), ttl_seconds=ttl)
+    raise ValueError(f"Unsupported MEALBOT_SESSION_STORE: {url}")
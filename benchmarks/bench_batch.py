@@ -0,0 +1,65 @@
+"""N sequential POST /start_month calls vs one POST /start_month/batch with N items.
+
+Run:
+  python -m benchmarks.bench_batch [--sizes 10,50,200]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def _profiles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        out.append({
+            "daily_targets": {"macros_g": {
+                "protein": round(rng.uniform(80, 170), 1),
+                "carbohydrates": round(rng.uniform(150, 300), 1),
+                "total_fat": round(rng.uniform(50, 100), 1),
+                "fiber": round(rng.uniform(20, 40), 1),
+            }},
+            "preferences": {
+                "dairy_limit_level": rng.choice(["low", "none"]),
+                "gluten_limit_level": rng.choice(["low", "very_low"]),
+            },
+        })
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,50,200")
+    ap.add_argument("--month", default="2026-03")
+    args = ap.parse_args()
+
+    client = TestClient(app)
+    client.post("/start_month", json={"month": args.month})  # warm-up
+
+    print(f"{'plans':>6} {'sequential s':>13} {'batch s':>9} {'speedup':>8}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        items = [{"month": args.month, "session_id": f"bench-{i}", "user_profile": p} for i, p in enumerate(_profiles(n))]
+
+        t0 = time.perf_counter()
+        sequential = [client.post("/start_month", json=item).json() for item in items]
+        t_seq = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = client.post("/start_month/batch", json={"items": items}).json()
+        t_batch = time.perf_counter() - t0
+
+        for a, b in zip(sequential, batch["results"]):
+            if a["month_plan"] != b["month_plan"]:
+                raise SystemExit("batch plan differs from sequential plan")
+        print(f"{n:>6} {t_seq:>13.3f} {t_batch:>9.3f} {t_seq / t_batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Chat command routing: parse+dispatch overhead and /chat/message per command.
+
+- parse: CommandRouter.parse alone (alias lookup + precompiled grammars)
+- chat_message: the full handler, awaited directly (no HTTP)
+- "pianifica (repeat)" hits the short-circuit for a month whose plan is current,
+  "pianifica (new)" stores the (plan-cached) month in a new session each time
+
+Run:
+  python -m benchmarks.bench_chat_router [--repeat 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from app.main import chat_message, chat_router
+from app.models import ChatMessageRequest
+
+MESSAGES = [
+    ("pianifica (repeat)", "pianifica 2026-03"),
+    ("spesa", "spesa 2026-03"),
+    ("giorno", "giorno 2026-03-05"),
+    ("ricetta (usage)", "ricetta 2026-03-05 xx"),
+    ("unknown", "ciao bot"),
+]
+
+
+def _us(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(chat_message(ChatMessageRequest(session_id="bench", message="pianifica 2026-03")))
+        print(f"{'message':>20} {'parse us':>9} {'chat_message us':>16}")
+        for label, text in MESSAGES:
+            req = ChatMessageRequest(session_id="bench", message=text)
+
+            def parse():
+                try:
+                    chat_router.parse(text)
+                except Exception:
+                    pass
+
+            parse_us = _us(parse, args.repeat)
+            full_us = _us(lambda: loop.run_until_complete(chat_message(req)), args.repeat // 10 or 1)
+            print(f"{label:>20} {parse_us:>9.2f} {full_us:>16.1f}")
+
+        sessions = itertools.count()
+        fresh_us = _us(lambda: loop.run_until_complete(chat_message(
+            ChatMessageRequest(session_id=f"bench-{next(sessions)}", message="pianifica 2026-03"))), args.repeat // 10 or 1)
+        print(f"{'pianifica (new)':>20} {'':>9} {fresh_us:>16.1f}")
+    finally:
+        loop.close()
+    print()
+    for name, s in chat_router.stats().items():
+        print(f"{name:>10} calls={s['calls']:<6} mean={s['mean_ms']:.4f} ms max={s['max_ms']:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
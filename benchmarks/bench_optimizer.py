@@ -0,0 +1,45 @@
+"""Plan quality vs latency: greedy planner vs optimize mode at several time budgets.
+
+Quality is the mean absolute % deviation from the daily macro targets and
+the mean % shortfall on the daily micro targets (lower is better).
+
+Run:
+  python -m benchmarks.bench_optimizer [--budgets 0,25,100,300,1000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.models import UserProfile
+from app.optimizer import optimize_month_plan, plan_quality
+from app.planner import build_month_plan, get_recipe_book
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--month", default="2026-03")
+    ap.add_argument("--budgets", default="0,25,100,300,1000")
+    args = ap.parse_args()
+
+    profile = UserProfile().model_dump()
+    book = get_recipe_book()
+
+    t0 = time.perf_counter()
+    greedy = build_month_plan(args.month, profile, book)
+    ms = (time.perf_counter() - t0) * 1000.0
+    macro, micro = plan_quality(greedy, profile)
+    print(f"{'mode':>16} {'latency ms':>11} {'macro dev %':>12} {'micro short %':>14} {'objective':>10}")
+    print(f"{'greedy':>16} {ms:>11.1f} {macro:>12.2f} {micro:>14.2f} {'':>10}")
+
+    for budget in (int(x) for x in args.budgets.split(",")):
+        t0 = time.perf_counter()
+        plan = optimize_month_plan(args.month, profile, book, time_budget_ms=budget)
+        ms = (time.perf_counter() - t0) * 1000.0
+        macro, micro = plan_quality(plan, profile)
+        label = f"optimize {budget}ms"
+        print(f"{label:>16} {ms:>11.1f} {macro:>12.2f} {micro:>14.2f} {plan['solver']['objective']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
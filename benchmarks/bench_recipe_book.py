@@ -0,0 +1,46 @@
+"""Requests/sec of POST /start_month with a per-call RecipeBook vs the shared one.
+
+Run:
+  python -m benchmarks.bench_recipe_book [--requests 50]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.planner import RecipeBook, get_recipe_book
+
+
+def _requests_per_sec(client: TestClient, n: int) -> float:
+    client.post("/start_month", json={"month": "2026-03"})  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(n):
+        r = client.post("/start_month", json={"month": "2026-03"})
+        r.raise_for_status()
+    return n / (time.perf_counter() - t0)
+
+
+def main_cli():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=50)
+    args = ap.parse_args()
+
+    client = TestClient(main.app)
+
+    # "before": every request re-reads and re-parses data/recipes.json
+    main.get_recipe_book = lambda: RecipeBook()
+    try:
+        before = _requests_per_sec(client, args.requests)
+    finally:
+        main.get_recipe_book = get_recipe_book
+    after = _requests_per_sec(client, args.requests)
+
+    print(f"per-request RecipeBook: {before:8.1f} req/s")
+    print(f"shared RecipeBook:      {after:8.1f} req/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,71 @@
+"""choose_recipe (scalar loop) vs RecipeScorer.choose (vectorized) at several catalog sizes.
+
+Candidates are lunch/dinner recipes of a synthetic catalog
+(scripts/generate_catalog.py). Also asserts that both pick the same recipe
+for every call.
+
+Run:
+  python -m benchmarks.bench_scoring [--sizes 32,1000,10000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from app.nutrition import NutritionDB
+from app.planner import Recipe, _macro_targets_for_meal, choose_recipe
+from app.scoring import RecipeScorer
+from scripts.generate_catalog import generate_catalog
+
+PREFS = [
+    {"refined_sugar": "avoid", "dairy_limit_level": "low", "gluten_limit_level": "low"},
+    {"refined_sugar": "allow_small", "dairy_limit_level": "none", "gluten_limit_level": "very_low"},
+]
+DAILY_MACROS = {"protein": 120.0, "carbohydrates": 220.0, "total_fat": 70.0, "fiber": 30.0}
+
+
+def synthetic_recipes(n: int, seed: int = 0, db: Optional[NutritionDB] = None) -> List[Recipe]:
+    """`n` lunch/dinner candidates from the synthetic catalog generator."""
+    return [Recipe(**r) for r in generate_catalog(n, seed, db, breakfast_share=0.0)]
+
+
+def _run(recipes: List[Recipe], calls: int, seed: int = 1):
+    rng = random.Random(seed)
+    scorer = RecipeScorer(recipes)
+    target = _macro_targets_for_meal(DAILY_MACROS, "lunch")
+    cases = []
+    for _ in range(calls):
+        recent = [r.recipe_id for r in rng.sample(recipes, min(8, len(recipes)))]
+        cases.append((rng.choice(PREFS), recent))
+
+    t0 = time.perf_counter()
+    slow = [choose_recipe(recipes, target, prefs, recent) for prefs, recent in cases]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = [scorer.choose(target, prefs, recent) for prefs, recent in cases]
+    t_vec = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(slow, fast) if a.recipe_id != b.recipe_id)
+    return t_loop / calls, t_vec / calls, mismatches
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="32,1000,10000")
+    ap.add_argument("--calls", type=int, default=93, help="picks per size (93 = one month)")
+    args = ap.parse_args()
+
+    db = NutritionDB()
+    print(f"{'recipes':>8} {'loop us/pick':>14} {'numpy us/pick':>14} {'speedup':>8} {'mismatches':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        t_loop, t_vec, bad = _run(synthetic_recipes(n, db=db), args.calls)
+        print(f"{n:>8} {t_loop * 1e6:>14.1f} {t_vec * 1e6:>14.1f} {t_loop / t_vec:>7.1f}x {bad:>10}")
+        if bad:
+            raise SystemExit(f"{bad} picks differ at {n} recipes")
+
+
+if __name__ == "__main__":
+    main()
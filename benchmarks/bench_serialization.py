@@ -0,0 +1,68 @@
+"""Serialization cost per response: FastAPI's response_model path vs model_response.
+
+"response_model" is what FastAPI does with a returned dict (validate against
+the model, dump it, jsonable_encoder, json.dumps); "fast" is
+app.responses.model_response (orjson when installed); "strict" is
+model_response with MEALBOT_STRICT_RESPONSES semantics.
+
+Run:
+  python -m benchmarks.bench_serialization [--repeat 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.executor import plan_month
+from app.main import _cook, _store_plan
+from app.models import CookMealRequest, CookMealResponse, StartMonthResponse, UserProfile
+from app.responses import model_response, orjson
+
+
+def _per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    profile = UserProfile().model_dump()
+    month_plan, grocery = plan_month("2026-03", profile)
+    payloads = {
+        "start_month": (StartMonthResponse, _store_plan("bench", "2026-03", profile, month_plan, grocery)),
+        "cook": (CookMealResponse, _cook(CookMealRequest(date="2026-03-04", meal="lunch", session_id="bench"))),
+    }
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'response':>12} {'bytes':>7} {'response_model us':>18} {'fast us':>9} {'strict us':>10} {'speedup':>8}")
+    for name, (model, content) in payloads.items():
+        field = create_model_field(name=f"Response_{name}", type_=model, mode="serialization")
+        loop = asyncio.new_event_loop()
+
+        def fastapi_path():
+            return JSONResponse(loop.run_until_complete(serialize_response(field=field, response_content=content))).body
+
+        try:
+            size = len(fastapi_path())
+            slow = _per_call_us(fastapi_path, args.repeat)
+            fast = _per_call_us(lambda: model_response(model, content, strict=False).body, args.repeat)
+            strict = _per_call_us(lambda: model_response(model, content, strict=True).body, args.repeat)
+        finally:
+            loop.close()
+        print(f"{name:>12} {size:>7} {slow:>18.1f} {fast:>9.1f} {strict:>10.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time to first byte and total time: POST /start_month vs POST /start_month/stream.
+
+Runs against a real uvicorn server with the plan cache disabled, so every
+request is planned. TTFB for /start_month is the whole response; for the
+stream it is the first DayPlan line.
+
+Run:
+  python -m benchmarks.bench_stream [--requests 30]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+import httpx
+
+from .load_start_month import _free_port, _pct, _start_server
+
+
+def _measure(http: httpx.Client, path: str, n: int) -> Tuple[List[float], List[float]]:
+    ttfb: List[float] = []
+    total: List[float] = []
+    for i in range(n):
+        body = {"month": "2026-03", "session_id": f"stream-{i}"}
+        t0 = time.perf_counter()
+        with http.stream("POST", path, json=body) as r:
+            r.raise_for_status()
+            first = None
+            for _ in r.iter_raw():
+                if first is None:
+                    first = time.perf_counter()
+        end = time.perf_counter()
+        ttfb.append((first - t0) * 1000.0)
+        total.append((end - t0) * 1000.0)
+    return ttfb, total
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=30)
+    args = ap.parse_args()
+
+    port = _free_port()
+    proc = _start_server(port, 0, MEALBOT_PLAN_CACHE_SIZE="0")
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as http:
+            _measure(http, "/start_month", 3)  # warm-up
+            print(f"{'endpoint':>28} {'ttfb p50':>9} {'ttfb p99':>9} {'total p50':>10}")
+            for path in ("/start_month", "/start_month/stream", "/start_month/stream?format=sse"):
+                ttfb, total = _measure(http, path, args.requests)
+                print(f"{path:>28} {statistics.median(ttfb):>9.2f} {_pct(ttfb, 99):>9.2f} {statistics.median(total):>10.2f}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-message latency of the integrations' client: HTTP vs MEALBOT_API_BASE=inproc://.
+
+HTTP goes to a real uvicorn server on localhost (keep-alive connection);
+inproc:// calls app.main.chat_message in the client's own event loop. Both
+replay the same conversation and must return identical replies.
+
+Run:
+  python -m benchmarks.bench_transport [--rounds 50]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from integrations.client import INPROC_BASE, MealBotClient
+
+from .load_start_month import _free_port, _pct, _start_server
+
+CONVERSATION = [
+    "pianifica 2026-03",
+    "giorno 2026-03-05",
+    "spesa 2026-03",
+    "ricetta 2026-03-05 cena",
+    "boh",
+]
+
+
+async def _replay(base: str, rounds: int):
+    latencies: Dict[str, List[float]] = {m.split()[0]: [] for m in CONVERSATION}
+    replies = []
+    async with MealBotClient(base) as client:
+        await client.chat("pianifica 2026-03", "bench-warmup")
+        for r in range(rounds):
+            for message in CONVERSATION:
+                t0 = time.perf_counter()
+                replies.append(await client.chat(message, f"bench-{r}"))
+                latencies[message.split()[0]].append((time.perf_counter() - t0) * 1000.0)
+    return latencies, replies
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    port = _free_port()
+    proc = _start_server(port, 0)
+    try:
+        http_lat, http_replies = asyncio.run(_replay(f"http://127.0.0.1:{port}", args.rounds))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    inproc_lat, inproc_replies = asyncio.run(_replay(INPROC_BASE, args.rounds))
+
+    print(f"identical replies: {http_replies == inproc_replies}")
+    print(f"{'command':>10} {'http p50':>9} {'inproc p50':>11} {'http p99':>9} {'inproc p99':>11}")
+    for cmd in http_lat:
+        h, i = http_lat[cmd], inproc_lat[cmd]
+        print(f"{cmd:>10} {statistics.median(h):>9.2f} {statistics.median(i):>11.2f} {_pct(h, 99):>9.2f} {_pct(i, 99):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
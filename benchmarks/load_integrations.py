@@ -0,0 +1,125 @@
+"""Messages/sec through the chat integrations' API client with 100 concurrent chats.
+
+Starts a stub Mealbot API (uvicorn, POST /chat/message answers after a fixed
+delay) and drives it the way the bots do, from async handlers:
+
+- "blocking": the previous handlers, requests.post inside the coroutine
+  (a new connection per message, the event loop stalls on each call)
+- "pooled":   integrations.client.MealBotClient (keep-alive pool, no blocking)
+
+Run:
+  python -m benchmarks.load_integrations [--chats 100] [--messages 5] [--latency-ms 20] [--busy-rate 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List
+
+import httpx
+import requests
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from integrations.client import MealBotClient
+
+from .load_start_month import _free_port, _pct
+
+# -- stub API --------------------------------------------------------------------
+
+stub_app = FastAPI()
+_STUB_LATENCY = float(os.environ.get("MEALBOT_STUB_LATENCY_MS", "20")) / 1000.0
+_STUB_BUSY_RATE = float(os.environ.get("MEALBOT_STUB_BUSY_RATE", "0"))
+
+
+@stub_app.post("/chat/message")
+async def _stub_chat(payload: dict):
+    await asyncio.sleep(_STUB_LATENCY)
+    if random.random() < _STUB_BUSY_RATE:
+        return JSONResponse({"detail": "Planner busy, retry shortly"}, status_code=503, headers={"Retry-After": "0"})
+    return {"reply": f"ok: {payload.get('text', '')}"}
+
+
+def _start_stub(port: int, latency_ms: float, busy_rate: float) -> subprocess.Popen:
+    env = dict(os.environ, MEALBOT_STUB_LATENCY_MS=str(latency_ms), MEALBOT_STUB_BUSY_RATE=str(busy_rate))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.load_integrations:stub_app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("stub did not start")
+
+
+# -- drivers ---------------------------------------------------------------------
+
+
+async def _drive(send: Callable, chats: int, messages: int):
+    latencies: List[float] = []
+    errors = 0
+
+    async def chat(c: int):
+        nonlocal errors
+        for m in range(messages):
+            t0 = time.perf_counter()
+            try:
+                await send(f"giorno 2026-03-{m + 1:02d}", f"load-{c}")
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(chat(c) for c in range(chats)))
+    return latencies, errors, chats * messages / (time.perf_counter() - t0)
+
+
+async def _blocking(base: str, chats: int, messages: int):
+    async def send(text: str, session_id: str):
+        r = requests.post(f"{base}/chat/message", json={"text": text, "session_id": session_id}, timeout=20)
+        r.raise_for_status()
+        return r.json()
+
+    return await _drive(send, chats, messages)
+
+
+async def _pooled(base: str, chats: int, messages: int):
+    async with MealBotClient(base) as client:
+        return await _drive(client.chat, chats, messages)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chats", type=int, default=100)
+    ap.add_argument("--messages", type=int, default=5)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--busy-rate", type=float, default=0.05, help="share of stub replies that are 503 + Retry-After")
+    args = ap.parse_args()
+
+    port = _free_port()
+    proc = _start_stub(port, args.latency_ms, args.busy_rate)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        print(f"{args.chats} chats x {args.messages} messages, stub latency {args.latency_ms} ms, busy rate {args.busy_rate}")
+        print(f"{'client':>10} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name, run in (("blocking", _blocking), ("pooled", _pooled)):
+            lat, errors, rate = asyncio.run(run(base, args.chats, args.messages))
+            print(f"{name:>10} {rate:>8.1f} {statistics.median(lat):>8.1f} {_pct(lat, 99):>8.1f} {errors:>7}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Load test for POST /start_month: p50/p99 latency at 1, 8 and 32 concurrent clients.
+
+Starts a real uvicorn server for each planner mode (inline threadpool vs
+process pool) and drives it with httpx.AsyncClient (httpx is in
+requirements-optional.txt).
+
+Run:
+  python -m benchmarks.load_start_month [--pool-workers 4] [--requests 96]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+try:
+    import httpx
+except ImportError:
+    raise SystemExit("This load test needs httpx: pip install -r requirements-optional.txt")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int, planner_workers: int, **extra_env: str) -> subprocess.Popen:
+    env = dict(os.environ, MEALBOT_PLANNER_WORKERS=str(planner_workers), **extra_env)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/chat", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+def _pct(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+async def _load(base: str, concurrency: int, total: int):
+    latencies: List[float] = []
+    statuses: dict = {}
+    queue = list(range(total))
+
+    async def client(http: httpx.AsyncClient):
+        while queue:
+            i = queue.pop()
+            t0 = time.perf_counter()
+            r = await http.post("/start_month", json={"month": "2026-03", "session_id": f"load-{i}"})
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return latencies, statuses, total / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pool-workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--requests", type=int, default=96)
+    ap.add_argument("--concurrency", default="1,8,32")
+    args = ap.parse_args()
+
+    print(f"{'mode':>12} {'clients':>8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>7}  statuses")
+    for workers in (0, args.pool_workers):
+        mode = "inline" if workers == 0 else f"pool x{workers}"
+        port = _free_port()
+        proc = _start_server(port, workers)
+        try:
+            for c in (int(x) for x in args.concurrency.split(",")):
+                lat, statuses, rps = asyncio.run(_load(f"http://127.0.0.1:{port}", c, args.requests))
+                print(f"{mode:>12} {c:>8} {statistics.median(lat):>8.1f} {_pct(lat, 99):>8.1f} {rps:>7.1f}  {statuses}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Offline benchmark suite: per-function micro-benchmarks and in-process end-to-end requests.
+
+For each catalog size a synthetic recipe catalog (scripts/generate_catalog.py)
+is written to a temporary directory and a fresh worker process loads it via
+MEALBOT_RECIPES_PATH (so every size starts cold, with its own RecipeBook and
+caches). With --jsonl the catalogs are written as compiled JSON Lines, which
+the app opens lazily (LazyRecipeBook). The worker records its resident
+memory after loading the catalog and times
+
+  micro:  choose_recipe, RecipeScorer.choose, build_month_plan,
+          aggregate_grocery_list, grocery_list_items, round_for_purchase,
+          NutritionDB.get_food_row
+  e2e:    POST /start_month, GET /day, POST /cook, POST /chat/message
+          through the ASGI app in-process (TestClient, no sockets), with the
+          plan cache off so /start_month always plans
+
+Each benchmark runs in a few rounds of calibrated loops and reports the
+median and best time per operation in microseconds. Results are written as
+JSON; `compare` diffs two result files and exits 1 on a regression.
+
+Run:
+  python -m benchmarks.suite run [--sizes 32,1000,10000] [--out results.json] [--quick] [--jsonl]
+  python -m benchmarks.suite compare baseline.json results.json [--threshold 0.15] [--stat min_us]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+MONTH = "2026-03"
+DAY = "2026-03-05"
+RESULTS_FORMAT = 1
+
+
+def _measure(fn: Callable[[], Any], ops: int = 1, rounds: int = 5, round_s: float = 0.05) -> Dict[str, Any]:
+    """Median/best microseconds per operation; `fn` performs `ops` operations per call."""
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - t0, 1e-7)
+    loops = max(1, int(round_s / once))
+    per_op: List[float] = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_op.append((time.perf_counter() - t0) / (loops * ops) * 1e6)
+    return {
+        "median_us": round(statistics.median(per_op), 3),
+        "min_us": round(min(per_op), 3),
+        "rounds": rounds,
+        "ops": loops * ops,
+    }
+
+
+def _micro(rounds: int, round_s: float) -> Dict[str, Dict[str, Any]]:
+    from app.inventory import aggregate_grocery_list, grocery_list_items, round_for_purchase
+    from app.models import UserProfile
+    from app.nutrition import get_nutrition_db
+    from app.planner import _macro_targets_for_meal, build_month_plan, choose_recipe, get_recipe_book
+
+    book = get_recipe_book()
+    db = get_nutrition_db()
+    profile = UserProfile().model_dump()
+    prefs = profile["preferences"]
+    target = _macro_targets_for_meal(profile["daily_targets"]["macros_g"], "lunch")
+    lunch = book.for_meal("lunch")
+    scorer = book.scorer_for("lunch")
+    rng = random.Random(1)
+    recents = [[r.recipe_id for r in rng.sample(lunch, min(8, len(lunch)))] for _ in range(16)]
+    plan = build_month_plan(MONTH, profile, book)
+    totals = aggregate_grocery_list(plan, book)
+    names = {fk: db.food_name(fk) for fk in totals}
+    food_keys = sorted({ing["food_key"] for r in book.recipes for ing in r.ingredients})
+
+    def bench(fn, ops=1):
+        return _measure(fn, ops, rounds, round_s)
+
+    return {
+        "choose_recipe": bench(lambda: [choose_recipe(lunch, target, prefs, recent) for recent in recents], len(recents)),
+        "scorer.choose": bench(lambda: [scorer.choose(target, prefs, recent) for recent in recents], len(recents)),
+        "build_month_plan": bench(lambda: build_month_plan(MONTH, profile, book)),
+        "aggregate_grocery_list": bench(lambda: aggregate_grocery_list(plan, book)),
+        "grocery_list_items": bench(lambda: grocery_list_items(totals, db)),
+        "round_for_purchase": bench(lambda: [round_for_purchase(fk, g, names[fk]) for fk, g in totals.items()], len(totals)),
+        "get_food_row": bench(lambda: [db.get_food_row(fk) for fk in food_keys], len(food_keys)),
+    }
+
+
+def _e2e(rounds: int, round_s: float) -> Dict[str, Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+
+    import app.main as main
+
+    session = "bench"
+    results: Dict[str, Dict[str, Any]] = {}
+    with TestClient(main.app) as client:
+        def call(method: str, url: str, **kwargs) -> Callable[[], None]:
+            def fn():
+                client.request(method, url, **kwargs).raise_for_status()
+            return fn
+
+        def bench(fn):
+            return _measure(fn, 1, rounds, round_s)
+
+        results["POST /start_month"] = bench(call("POST", "/start_month", json={"month": MONTH, "session_id": session}))
+        results["GET /day"] = bench(call("GET", f"/day/{MONTH}/{DAY}", params={"session_id": session}))
+        results["POST /chat/message"] = bench(call("POST", "/chat/message", json={"session_id": session, "message": f"giorno {DAY}"}))
+        # last: every call appends a ledger event to the session
+        results["POST /cook"] = bench(call("POST", "/cook", json={"date": DAY, "meal": "lunch", "session_id": session}))
+    return results
+
+
+def _worker(args) -> None:
+    from app.metrics import rss_bytes
+    from app.planner import get_recipe_book
+
+    book = get_recipe_book()
+    rss = rss_bytes()
+    rounds, round_s = (3, 0.02) if args.quick else (5, 0.05)
+    out = {
+        "recipes": len(book.recipes),
+        "catalog_version": book.version,
+        "catalog_format": "jsonl" if book.path.suffix == ".jsonl" else "json",
+        "rss_after_load_mb": round(rss / 2**20, 1),
+        "micro": _micro(rounds, round_s),
+        "e2e": _e2e(rounds, round_s),
+    }
+    print(json.dumps(out))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> None:
+    from app.nutrition import NutritionDB
+    from scripts.generate_catalog import generate_catalog, write_catalog
+
+    db = NutritionDB()
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="mealbot-bench-") as tmp:
+        for n in (int(x) for x in args.sizes.split(",")):
+            path = Path(tmp) / f"recipes-{n}.{'jsonl' if args.jsonl else 'json'}"
+            write_catalog(generate_catalog(n, args.seed, db), path)
+            env = dict(os.environ, MEALBOT_RECIPES_PATH=str(path), MEALBOT_PLAN_CACHE_SIZE="0",
+                       MEALBOT_PLANNER_WORKERS="0", MEALBOT_SESSION_STORE="memory")
+            env.pop("MEALBOT_ADMIN_TOKEN", None)
+            cmd = [sys.executable, "-m", "benchmarks.suite", "_worker"] + (["--quick"] if args.quick else [])
+            t0 = time.perf_counter()
+            proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                sys.stderr.write(proc.stderr)
+                raise SystemExit(f"benchmark worker failed for {n} recipes")
+            results[str(n)] = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{n:>6} recipes done in {time.perf_counter() - t0:.1f}s "
+                  f"(worker RSS after load {results[str(n)]['rss_after_load_mb']} MB)", file=sys.stderr)
+
+    doc = {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "quick": args.quick,
+        "jsonl": args.jsonl,
+        "sizes": results,
+    }
+    _print_results(doc)
+    if args.out:
+        Path(args.out).write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+        print(f"\nwrote {args.out}")
+
+
+def _flatten(doc: Dict[str, Any], stat: str = "median_us") -> Dict[str, float]:
+    """'<size>/<kind>/<name>' -> us/op (`stat`: median_us or min_us)."""
+    return {
+        f"{size}/{kind}/{name}": r[stat]
+        for size, res in doc["sizes"].items()
+        for kind in ("micro", "e2e")
+        for name, r in res.get(kind, {}).items()
+    }
+
+
+def _print_results(doc: Dict[str, Any]) -> None:
+    print(f"{'benchmark':<44} {'median us/op':>14} {'best us/op':>12}")
+    for size, res in doc["sizes"].items():
+        for kind in ("micro", "e2e"):
+            for name, r in res[kind].items():
+                print(f"{f'{size}/{kind}/{name}':<44} {r['median_us']:>14.2f} {r['min_us']:>12.2f}")
+
+
+def compare(args) -> None:
+    base = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    cur = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    a, b = _flatten(base, args.stat), _flatten(cur, args.stat)
+    regressions = []
+    print(f"{'benchmark':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in sorted(a.keys() & b.keys(), key=lambda k: (int(k.split("/")[0]), k)):
+        change = b[key] / a[key] - 1.0 if a[key] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{key:<44} {a[key]:>12.2f} {b[key]:>12.2f} {change:>+7.1%}{flag}")
+    for key in sorted(a.keys() - b.keys()):
+        print(f"{key:<44} missing from {args.current}")
+    for key in sorted(b.keys() - a.keys()):
+        print(f"{key:<44} new (no baseline)")
+    if base.get("platform") != cur.get("platform") or base.get("cpus") != cur.get("cpus"):
+        print("\nnote: baseline was recorded on a different machine; timings may not be comparable")
+    if regressions:
+        raise SystemExit(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+    print(f"\nno regressions over {args.threshold:.0%}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run the suite and write JSON results")
+    p.add_argument("--sizes", default="32,1000,10000", help="synthetic catalog sizes")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", help="results file (default: print only)")
+    p.add_argument("--quick", action="store_true", help="fewer, shorter rounds (noisier)")
+    p.add_argument("--jsonl", action="store_true", help="write the catalogs as compiled JSON Lines (lazy RecipeBook)")
+    p.set_defaults(fn=run)
+    p = sub.add_parser("compare", help="flag regressions of `current` against `baseline`")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts as a regression")
+    p.add_argument("--stat", choices=("median_us", "min_us"), default="median_us",
+                   help="statistic to compare (min_us is steadier on noisy machines)")
+    p.set_defaults(fn=compare)
+    p = sub.add_parser("_worker")  # internal: one catalog size, in a fresh process
+    p.add_argument("--quick", action="store_true")
+    p.set_defaults(fn=_worker)
+    args = ap.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
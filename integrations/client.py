@@ -0,0 +1,173 @@
+"""Shared async client for the Mealbot API, used by the chat integrations.
+
+One `MealBotClient` per process keeps a pool of keep-alive connections to
+`MEALBOT_API_BASE`, so a message costs one request on an open connection
+instead of a new TCP (and TLS) handshake, and never blocks the event loop.
+
+With `MEALBOT_API_BASE=inproc://` the bot and the API share the process:
+messages go straight to `app.main.chat_message` on the bot's event loop, with
+no HTTP or JSON round trip. Replies and errors look exactly as over HTTP
+(response validated by ChatMessageResponse, API errors raised as
+httpx.HTTPStatusError).
+
+Env:
+  MEALBOT_API_BASE             API root (default http://127.0.0.1:8000), or inproc://
+  MEALBOT_API_TIMEOUT          seconds per request (default 20)
+  MEALBOT_API_MAX_CONCURRENCY  requests in flight per process (default 16)
+  MEALBOT_API_RETRIES          extra attempts on retryable failures (default 2)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+DEFAULT_API_BASE = "http://127.0.0.1:8000"
+INPROC_BASE = "inproc://"
+
+logger = logging.getLogger(__name__)
+
+# Only failures where the API cannot have acted on the message are retried:
+# the connection never opened, or the API refused it with 503 (planner busy).
+# A read timeout may mean the command ran (e.g. a meal was cooked), so it is not.
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_RETRYABLE_STATUS = {503}
+
+
+class MealBotClient:
+    """Pooled async client for POST /chat/message with timeouts, retries and a concurrency limit.
+
+    At most `max_concurrency` requests are in flight (one pooled connection
+    each); further messages wait for a slot. Keep it small: httpcore scans
+    the whole pool for every queued request, so with 100 chats a 16-slot
+    pool moves several times more messages per second than a 100-slot one.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 20.0, max_concurrency: int = 16,
+                 retries: int = 2, backoff: float = 0.25, transport: Optional[httpx.AsyncBaseTransport] = None):
+        base_url = base_url or os.environ.get("MEALBOT_API_BASE", DEFAULT_API_BASE)
+        self.inproc = base_url.startswith(INPROC_BASE)
+        self.base_url = base_url if self.inproc else base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._core = None  # app.main, imported on first in-process call
+
+    def _client(self) -> httpx.AsyncClient:
+        # created on first use so it binds to the event loop that runs the bot
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                transport=self._transport,
+            )
+        return self._http
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Exponential backoff with full jitter, at least the server's Retry-After."""
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        send = self._post_inproc if self.inproc else self._post_http
+        async with self._slots:
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                try:
+                    return await send(path, payload)
+                except _RETRYABLE_ERRORS:
+                    if last:
+                        raise
+                    await asyncio.sleep(self._delay(attempt, None))
+                except httpx.HTTPStatusError as e:
+                    if last or e.response.status_code not in _RETRYABLE_STATUS:
+                        raise
+                    await asyncio.sleep(self._delay(attempt, e.response))
+        raise AssertionError("unreachable")
+
+    async def _post_http(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        r = await self._client().post(path, json=payload)
+        r.raise_for_status()
+        return r.json()
+
+    async def _post_inproc(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if path != "/chat/message":
+            raise ValueError(f"{INPROC_BASE} only serves /chat/message, not {path}")
+        if self._core is None:
+            from app import main as core  # loads NutritionDB/RecipeBook: only when actually in-process
+            from app.models import ChatMessageRequest, ChatMessageResponse
+
+            # what the API's lifespan would do (a no-op unless MEALBOT_PLANNER_WORKERS > 0)
+            await asyncio.to_thread(core.planner_executor.start)
+            self._core = (core, ChatMessageRequest, ChatMessageResponse)
+        core, request_model, response_model = self._core
+        try:
+            request = request_model(**payload)
+        except ValidationError as e:
+            # the body FastAPI answers an invalid request with
+            errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            raise self._status_error(path, 422, {"detail": jsonable_encoder(errors)}, None) from e
+        try:
+            result = await core.chat_message(request)
+        except HTTPException as e:
+            raise self._status_error(path, e.status_code, {"detail": e.detail}, e.headers) from e
+        except Exception as e:
+            logger.exception("in-process %s failed", path)
+            raise self._status_error(path, 500, None, None) from e
+        return response_model.model_validate(result).model_dump(mode="json")
+
+    def _status_error(self, path: str, status: int, body: Optional[Dict[str, Any]],
+                      headers: Optional[Dict[str, str]]) -> httpx.HTTPStatusError:
+        """The error `raise_for_status` would have raised for this status over HTTP."""
+        request = httpx.Request("POST", f"{self.base_url}{path}")
+        response = httpx.Response(status, headers=headers, json=body, request=request) if body is not None \
+            else httpx.Response(status, headers=headers, text="Internal Server Error", request=request)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            return e
+        raise AssertionError(f"status {status} is not an error")
+
+    async def chat(self, text: str, session_id: str = "default") -> Dict[str, Any]:
+        """POST /chat/message; returns the ChatMessageResponse dict."""
+        return await self.post("/chat/message", {"session_id": session_id, "text": text})
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._core is not None:
+            await asyncio.to_thread(self._core[0].planner_executor.shutdown)
+            self._core = None
+
+    async def __aenter__(self) -> "MealBotClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+
+def create_mealbot_client() -> MealBotClient:
+    """MealBotClient configured from the MEALBOT_API_* environment variables."""
+    return MealBotClient(
+        timeout=float(os.environ.get("MEALBOT_API_TIMEOUT", "20")),
+        max_concurrency=int(os.environ.get("MEALBOT_API_MAX_CONCURRENCY", "16")),
+        retries=int(os.environ.get("MEALBOT_API_RETRIES", "2")),
+    )
@@ -3,21 +3,24 @@
 Usage:
   export TELEGRAM_BOT_TOKEN="..."
   export MEALBOT_API_BASE="http://127.0.0.1:8000"
-  python -m mealbot.integrations.telegram_bot
+  python -m integrations.telegram_bot
 
 Notes:
   - Requires: python-telegram-bot
   - This forwards user text to POST /chat/message and returns reply.
+  - Each Telegram chat gets its own session ("tg-<chat id>").
+  - Requests go through the shared pooled client (integrations/client.py).
 """
 
 import os
-import requests
 
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
+from telegram.ext import Application, ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
 
+from .client import create_mealbot_client
 
-API_BASE = os.environ.get("MEALBOT_API_BASE", "http://127.0.0.1:8000")
+
+client = create_mealbot_client()
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -27,20 +30,23 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text
     try:
-        r = requests.post(f"{API_BASE}/chat/message", json={"text": text}, timeout=20)
-        r.raise_for_status()
-        reply = r.json().get("reply", "(nessuna risposta)")
+        data = await client.chat(text, session_id=f"tg-{update.effective_chat.id}")
+        reply = data.get("reply", "(nessuna risposta)")
     except Exception as e:
         reply = f"Errore nel contattare API: {e}"
     await update.message.reply_text(reply)
 
 
+async def _close_client(app: Application):
+    await client.aclose()
+
+
 def main():
     token = os.environ.get("TELEGRAM_BOT_TOKEN")
     if not token:
         raise SystemExit("Missing TELEGRAM_BOT_TOKEN")
 
-    app = ApplicationBuilder().token(token).build()
+    app = ApplicationBuilder().token(token).post_shutdown(_close_client).build()
     app.add_handler(CommandHandler("start", start))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
     app.run_polling()
@@ -11,31 +11,42 @@ Env:
   MEALBOT_API_BASE="http://127.0.0.1:8000"
 
 Run:
-  pip install fastapi uvicorn requests
-  uvicorn mealbot.integrations.whatsapp_twilio:app --reload --port 9000
+  pip install fastapi uvicorn httpx
+  uvicorn integrations.whatsapp_twilio:app --reload --port 9000
+
+Each sender gets its own session ("wa-<From>"); requests go through the
+shared pooled client (integrations/client.py).
 """
 
-import os
-import requests
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Form
 from fastapi.responses import PlainTextResponse
 
+from .client import create_mealbot_client
+
+
+client = create_mealbot_client()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await client.aclose()
 
-API_BASE = os.environ.get("MEALBOT_API_BASE", "http://127.0.0.1:8000")
 
-app = FastAPI(title="Mealbot WhatsApp (Twilio) Webhook")
+app = FastAPI(title="Mealbot WhatsApp (Twilio) Webhook", lifespan=lifespan)
 
 
 @app.post("/twilio", response_class=PlainTextResponse)
-def twilio_webhook(Body: str = Form("")):
-    # Twilio sends the message text in 'Body'
+async def twilio_webhook(Body: str = Form(""), From: str = Form("")):
+    # Twilio sends the message text in 'Body' and the sender in 'From'
     text = (Body or "").strip()
     if not text:
         return ""
     try:
-        r = requests.post(f"{API_BASE}/chat/message", json={"text": text}, timeout=20)
-        r.raise_for_status()
-        reply = r.json().get("reply", "")
+        data = await client.chat(text, session_id=f"wa-{From}" if From else "default")
+        reply = data.get("reply", "")
     except Exception as e:
         reply = f"Errore nel contattare API: {e}"
 
@@ -1 +0,0 @@
-# Integration modules (Telegram, WhatsApp/Twilio, etc.)
\ No newline at end of file
@@ -1,312 +1,433 @@
 from __future__ import annotations
 
+import argparse
+import csv
+import hashlib
 import json
+import os
+import textwrap
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from app.catalog import compile_catalog, load_compiled_catalog
 from app.nutrition import NutritionDB
-
+from app.planner import CATALOG_MANIFEST_FORMAT, catalog_manifest_path
+
+# Builds the recipe catalog (data/recipes.json) from recipe definitions.
+#
+# Definitions (default data/recipe_definitions.json; .json, .yaml/.yml or .csv):
+#   JSON/YAML: {"foods": {alias: {"query": str | [str, ...], "prefer": str}},
+#               "recipes": [{recipe_id, title, meal_types, tags,
+#                            ingredients: [{"food": ..., "grams": ...}]}]}
+#   CSV: one row per ingredient with columns recipe_id, title, meal_types,
+#        tags, food, grams; meal_types/tags are "|"-separated and read from a
+#        recipe's first row.
+# An ingredient's "food" is an alias from "foods", a food_key, or a search
+# query over the nutrition dataset (first match; with "prefer", the first of
+# the top 50 matches containing that text; a list of queries is tried in
+# order). Ingredients may also give "food_key" directly.
+#
+# Pantry assumed by the shipped definitions: salt, pepper, spices, herbs,
+# vinegar/lemon, water. Goal: low gluten, low dairy, no refined sugar.
+#
+# All food references are resolved in one batched search, nutrients are
+# computed per chunk of recipes as one sparse product (NutritionDB.
+# nutrients_for_recipes), chunks can be spread over worker processes, and the
+# output is written chunk by chunk (to a temp file renamed at the end).
+# --compact writes one recipe per line, much faster than the indented layout.
+# An --out ending in .jsonl writes JSON Lines (one recipe object per line, no
+# enclosing array) and compiles its column index (app/catalog.py), the format
+# the app opens lazily (LazyRecipeBook) for very large catalogs.
+#
+# Builds are incremental: the manifest next to the output (recipes.json.manifest.json)
+# keeps a content hash per recipe (resolved ingredients + nutrition dataset
+# version) and a catalog version id, which RecipeBook.version (and so the plan
+# cache) uses. Only recipes whose hash changed are recomputed; an unchanged
+# catalog is not rewritten.
+
+DEFINITIONS_PATH = Path(__file__).resolve().parents[1] / "data" / "recipe_definitions.json"
 OUT_PATH = Path(__file__).resolve().parents[1] / "data" / "recipes.json"
 
-db = NutritionDB()
-
-def key_of(query: str, prefer_substring: Optional[str] = None) -> str:
-    """Return a food_key matching a query string."""
-    results = db.search(query, limit=50)
-    if not results:
-        raise ValueError(f"No food matches query: {query}")
-    if prefer_substring:
-        for r in results:
-            if prefer_substring.lower() in r["food"].lower():
-                return r["food_key"]
-    return results[0]["food_key"]
-
-def nutrients_for_ingredients(ingredients: List[Dict]) -> Dict[str, float]:
-    totals: Dict[str, float] = {}
-    for ing in ingredients:
-        fk = str(ing["food_key"])
-        g = float(ing["grams"])
-        n = db.nutrients_for_grams(fk, g)
-        for k, v in n.items():
-            totals[k] = totals.get(k, 0.0) + float(v)
-    return totals
-
-def make_recipe(recipe_id: str, title: str, meal_types: List[str], ingredients: List[Dict], tags: List[str]) -> Dict:
-    return {
-        "recipe_id": recipe_id,
-        "title": title,
-        "meal_types": meal_types,
-        "tags": tags,
-        "ingredients": ingredients,
-        "nutrients_per_serving": nutrients_for_ingredients(ingredients),
-    }
+SEARCH_LIMIT = 50
+
+
+def load_definitions(path: Path) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """(food aliases, recipe definitions) from a .json, .yaml/.yml or .csv file."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return {}, _load_csv(path)
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("YAML definitions need PyYAML: pip install pyyaml")
+        doc = yaml.safe_load(path.read_text(encoding="utf-8"))
+    elif suffix == ".json":
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        raise ValueError(f"Unsupported definitions format: {path.name} (use .json, .yaml or .csv)")
+    if isinstance(doc, list):
+        return {}, doc
+    return doc.get("foods") or {}, doc["recipes"]
+
+
+def _number(text: str) -> float:
+    v = float(text)
+    return int(v) if v.is_integer() and "." not in text else v
+
+
+def _split(text: Optional[str]) -> List[str]:
+    return [t.strip() for t in (text or "").split("|") if t.strip()]
+
+
+def _load_csv(path: Path) -> List[Dict[str, Any]]:
+    recipes: Dict[str, Dict[str, Any]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            rid = (row.get("recipe_id") or "").strip()
+            if not rid or not (row.get("food") or "").strip():
+                raise ValueError(f"{path.name}:{line}: recipe_id and food are required")
+            r = recipes.get(rid)
+            if r is None:
+                r = recipes[rid] = {
+                    "recipe_id": rid,
+                    "title": (row.get("title") or rid).strip(),
+                    "meal_types": _split(row.get("meal_types")),
+                    "tags": _split(row.get("tags")),
+                    "ingredients": [],
+                }
+            r["ingredients"].append({"food": row["food"].strip(), "grams": _number(row["grams"])})
+    return list(recipes.values())
+
+
+class FoodResolver:
+    """Resolves ingredient food references to food_keys with one batched search."""
+
+    def __init__(self, db: NutritionDB, foods: Dict[str, Dict[str, Any]]):
+        self.db = db
+        self.foods = foods
+
+    def _spec(self, ref: str) -> Dict[str, Any]:
+        spec = self.foods.get(ref)
+        if spec is not None:
+            return spec
+        if self.db.has_food(ref):
+            return {"food_key": ref}
+        return {"query": ref}
+
+    def resolve(self, refs: Iterable[str]) -> Dict[str, str]:
+        """ref -> food_key for every distinct ref; raises ValueError for a ref nothing matches."""
+        specs = {ref: self._spec(ref) for ref in dict.fromkeys(refs)}
+        queries = list(dict.fromkeys(
+            q for spec in specs.values() if "food_key" not in spec
+            for q in ([spec["query"]] if isinstance(spec["query"], str) else spec["query"])
+        ))
+        found = dict(zip(queries, self.db.search_many(queries, limit=SEARCH_LIMIT)))
+
+        keys: Dict[str, str] = {}
+        for ref, spec in specs.items():
+            if "food_key" in spec:
+                self.db.row_index(spec["food_key"])  # KeyError for an unknown key
+                keys[ref] = spec["food_key"]
+                continue
+            alternatives = [spec["query"]] if isinstance(spec["query"], str) else spec["query"]
+            results = next((found[q] for q in alternatives if found[q]), None)
+            if results is None:
+                raise ValueError(f"No food matches query: {alternatives[-1]} (ingredient {ref!r})")
+            keys[ref] = self._pick(results, spec.get("prefer"))
+        return keys
+
+    @staticmethod
+    def _pick(results: List[Dict[str, str]], prefer: Optional[str]) -> str:
+        if prefer:
+            for r in results:
+                if prefer.lower() in r["food"].lower():
+                    return r["food_key"]
+        return results[0]["food_key"]
+
+
+def _ref(ing: Dict[str, Any]) -> str:
+    return str(ing.get("food_key") or ing["food"])
+
+
+def resolve_definitions(defs: Sequence[Dict[str, Any]], resolver: FoodResolver) -> List[Dict[str, Any]]:
+    """Recipe definitions with every ingredient as {"food_key", "grams"}."""
+    keys = resolver.resolve(_ref(ing) for d in defs for ing in d["ingredients"])
+    seen = set()
+    out = []
+    for d in defs:
+        if d["recipe_id"] in seen:
+            raise ValueError(f"Duplicate recipe_id: {d['recipe_id']}")
+        seen.add(d["recipe_id"])
+        out.append({
+            "recipe_id": d["recipe_id"],
+            "title": d["title"],
+            "meal_types": list(d["meal_types"]),
+            "tags": list(d.get("tags") or []),
+            "ingredients": [{"food_key": keys[_ref(ing)], "grams": ing["grams"]} for ing in d["ingredients"]],
+        })
+    return out
+
+
+def recipe_hashes(recipe: Dict[str, Any], nutrition_version: str) -> Tuple[str, str]:
+    """(ingredients hash, content hash) of a resolved definition.
+
+    The ingredients hash covers what nutrients_per_serving depends on: the
+    resolved ingredients and the nutrition dataset version. The content hash
+    adds the metadata (title, meal_types, tags).
+    """
+    ingredients = json.dumps([nutrition_version, recipe["ingredients"]], ensure_ascii=False, separators=(",", ":"))
+    ingredients_hash = hashlib.sha256(ingredients.encode("utf-8")).hexdigest()[:16]
+    meta = {k: v for k, v in recipe.items() if k not in ("ingredients", "nutrients_per_serving")}
+    content = json.dumps([meta, ingredients_hash], ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return ingredients_hash, hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def catalog_version(content_hashes: Sequence[str], nutrition_version: str) -> str:
+    """Version id of the catalog content (recipes in order), independent of the file layout."""
+    return hashlib.sha256(",".join([nutrition_version, *content_hashes]).encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(out: Path) -> Optional[Dict[str, Any]]:
+    """The previous build's manifest, if it still describes the file at `out`."""
+    try:
+        manifest = json.loads(catalog_manifest_path(out).read_text(encoding="utf-8"))
+        st = out.stat()
+    except (OSError, ValueError):
+        return None
+    src = manifest.get("source", {})
+    if manifest.get("format") != CATALOG_MANIFEST_FORMAT or src.get("size") != st.st_size:
+        return None
+    if src.get("mtime_ns") != st.st_mtime_ns and src.get("sha256") != hashlib.sha256(out.read_bytes()).hexdigest():
+        return None
+    return manifest
+
+
+def previous_elements(out: Path, manifest: Dict[str, Any]) -> Dict[str, str]:
+    """recipe_id -> JSON text of each recipe in the previous catalog, laid out as in that file.
+
+    Elements are split on the layout this script writes (one per line with
+    --compact or JSON Lines, else closed by a 2-space-indented brace); {} if
+    that fails.
+    """
+    if is_jsonl(out):
+        lines = out.read_text(encoding="utf-8").split("\n")[:-1]
+    else:
+        lines = out.read_text(encoding="utf-8").split("\n")[1:-1]
+    if manifest.get("compact"):
+        texts = [line[:-1] if line.endswith(",") else line for line in lines]
+    else:
+        texts, start = [], 0
+        for i, line in enumerate(lines):
+            if line in ("  }", "  },"):
+                texts.append("\n".join(lines[start:i] + ["  }"]))
+                start = i + 1
+    ids = list(manifest.get("recipes", {}))
+    return dict(zip(ids, texts)) if len(ids) == len(texts) else {}
+
+
+def _done(entry: Union[str, Dict[str, Any]]) -> bool:
+    return isinstance(entry, str) or "nutrients_per_serving" in entry
+
+
+def build_chunk(entries: List[Union[str, Dict[str, Any]]], db: NutritionDB) -> List[Union[str, Dict[str, Any]]]:
+    """Resolved definitions -> catalog recipes, computing nutrients_per_serving where it isn't set yet.
+
+    Entries that are already rendered JSON text (unchanged recipes) pass through.
+    """
+    todo = [r for r in entries if not _done(r)]
+    nutrients = iter(db.nutrients_for_recipes([r["ingredients"] for r in todo]))
+    return [r if _done(r) else {**r, "nutrients_per_serving": next(nutrients)} for r in entries]
+
+
+def _render(entries: List[Union[str, Dict[str, Any]]], compact: bool = False) -> List[str]:
+    if compact:
+        # one recipe per line; json's C encoder only runs without indent
+        return [r if isinstance(r, str) else json.dumps(r, ensure_ascii=False) for r in entries]
+    # each element exactly as json.dumps(catalog, indent=2) would lay it out
+    return [r if isinstance(r, str) else textwrap.indent(json.dumps(r, ensure_ascii=False, indent=2), "  ")
+            for r in entries]
+
+
+_WORKER_DB: Optional[NutritionDB] = None
+
+
+def _init_worker() -> None:
+    global _WORKER_DB
+    _WORKER_DB = NutritionDB()
+
+
+def _build_chunk_in_worker(entries: List[Union[str, Dict[str, Any]]], compact: bool) -> List[str]:
+    return _render(build_chunk(entries, _WORKER_DB), compact)
+
+
+def is_jsonl(path: Path) -> bool:
+    return path.suffix == ".jsonl"
+
+
+class CatalogWriter:
+    """Writes a JSON array (JSON Lines with `lines`) element by element to `<path>.tmp`;
+    `commit()` renames it to `path`.
+
+    Size and sha256 of the output are tracked while writing (for the manifest).
+    """
+
+    def __init__(self, path: Path, lines: bool = False):
+        self.path = path
+        self.lines = lines
+        self.tmp = path.with_name(path.name + ".tmp")
+        self.count = 0
+        self.size = 0
+        self._sha = hashlib.sha256()
+        # --out may name a new directory; the manifest is written next to `path` too
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.tmp, "wb")
+        if not lines:
+            self._write("[")
+
+    def _write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._f.write(data)
+        self._sha.update(data)
+        self.size += len(data)
+
+    def write(self, elements: List[str]) -> None:
+        for text in elements:
+            if self.lines:
+                self._write(text + "\n")
+            else:
+                self._write(",\n" if self.count else "\n")
+                self._write(text)
+            self.count += 1
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the temp file; returns its source record (size, mtime_ns, sha256) for the manifest."""
+        if not self.lines:
+            self._write("\n]" if self.count else "]")
+        self._f.close()
+        # os.replace keeps the mtime, so the record stays valid for `path`
+        return {"size": self.size, "mtime_ns": self.tmp.stat().st_mtime_ns, "sha256": self._sha.hexdigest()}
+
+    def commit(self) -> None:
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+def _write_manifest(out: Path, manifest: Dict[str, Any]) -> None:
+    path = catalog_manifest_path(out)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def build(definitions: Path, out: Path, workers: int = 0, chunk_size: int = 2000, compact: bool = False,
+          full: bool = False, db: Optional[NutritionDB] = None) -> Dict[str, Any]:
+    """Build the catalog at `out`, recomputing only recipes whose content hash changed (all with `full`).
+
+    Writes `out` and its manifest (catalog version id + per-recipe hashes),
+    manifest first: os.replace keeps the temp file's mtime, so a reader that
+    sees the new catalog also sees a manifest matching it. If the catalog
+    version and layout are unchanged nothing is written at all (the file's
+    mtime, and every cache keyed on it, stays put).
+
+    A .jsonl `out` is written as JSON Lines (always one recipe per line) and
+    its column index is compiled from the temp file before the rename, so a
+    worker never opens the new catalog without it (an up-to-date catalog gets
+    it again if it's missing or stale).
+
+    Returns {"catalog_version", "recipes", "recomputed", "written"}.
+    """
+    jsonl = is_jsonl(out)
+    compact = compact or jsonl
+    db = db or NutritionDB()
+    foods, defs = load_definitions(definitions)
+    recipes = resolve_definitions(defs, FoodResolver(db, foods))
+    hashes = [recipe_hashes(r, db.version) for r in recipes]
+    version = catalog_version([content for _, content in hashes], db.version)
+
+    previous = None if full else load_manifest(out)
+    if previous is not None and previous.get("catalog_version") == version and previous.get("compact") == compact:
+        if jsonl and load_compiled_catalog(out) is None:
+            compile_catalog(out)
+        return {"catalog_version": version, "recipes": len(recipes), "recomputed": 0, "written": False}
+
+    old_hashes = previous.get("recipes", {}) if previous is not None else {}
+    old_texts = previous_elements(out, previous) if previous is not None else {}
+    same_layout = previous is not None and previous.get("compact") == compact
+    entries: List[Union[str, Dict[str, Any]]] = []
+    for r, (ingredients_hash, content_hash) in zip(recipes, hashes):
+        old = old_hashes.get(r["recipe_id"])
+        text = old_texts.get(r["recipe_id"])
+        if text is not None and same_layout and old == [ingredients_hash, content_hash]:
+            entries.append(text)  # unchanged: copied as is
+        elif text is not None and old is not None and old[0] == ingredients_hash:
+            # only metadata (or the layout) changed: keep the computed nutrients
+            entries.append({**r, "nutrients_per_serving": json.loads(text)["nutrients_per_serving"]})
+        else:
+            entries.append(r)
+    recomputed = sum(1 for e in entries if not _done(e))
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+
+    writer = CatalogWriter(out, lines=jsonl)
+    try:
+        if workers > 1 and len(chunks) > 1 and recomputed > chunk_size:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                # at most 2 chunks per worker in flight, written in order as they finish
+                pending: List[Future] = []
+                for chunk in chunks:
+                    pending.append(pool.submit(_build_chunk_in_worker, chunk, compact))
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.pop(0).result())
+                for fut in pending:
+                    writer.write(fut.result())
+        else:
+            for chunk in chunks:
+                writer.write(_render(build_chunk(chunk, db), compact))
+        source = writer.close()
+        if jsonl:
+            # index the temp file: it is in place before the catalog it describes
+            compile_catalog(out, source=writer.tmp)
+        _write_manifest(out, {
+            "format": CATALOG_MANIFEST_FORMAT,
+            "catalog_version": version,
+            "nutrition_version": db.version,
+            "compact": compact,
+            "source": source,
+            "recipes": {r["recipe_id"]: list(h) for r, h in zip(recipes, hashes)},
+        })
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+    return {"catalog_version": version, "recipes": len(recipes), "recomputed": recomputed, "written": True}
+
 
 def main():
-    # Pantry assumed: salt, pepper, spices, herbs, vinegar/lemon, water.
-    # Goal: low gluten, low dairy, no refined sugar.
-
-    foods = {
-        "oats_dry": key_of("Cereals, oats, regular", "dry"),
-        "egg_whole": key_of("Egg, whole, raw"),
-        "egg_white": key_of("Egg, white, raw"),
-        "banana": key_of("Bananas, raw") if db.search("Bananas, raw") else key_of("banana"),
-        "apple": key_of("Apples, raw") if db.search("Apples, raw") else key_of("apple"),
-        "blueberries": key_of("Blueberries"),
-        "quinoa_dry": key_of("Quinoa, uncooked"),
-        "rice_brown_dry": key_of("Rice, brown", "dry"),
-        "lentils_cooked": key_of("Lentils", "boiled"),
-        "chickpeas_cooked": key_of("Chickpeas", "boiled"),
-        "tofu_firm": key_of("Tofu, firm"),
-        "chicken_breast_raw": key_of("Chicken, broilers or fryers, breast", "raw"),
-        "salmon_raw": key_of("Fish, salmon", "raw"),
-        "tuna_canned": key_of("Fish, tuna", "canned in water") if db.search("canned in water") else key_of("Fish, tuna"),
-        "olive_oil": key_of("Oil, olive"),
-        "avocado": key_of("Avocados, raw"),
-        "spinach": key_of("Spinach, raw"),
-        "broccoli": key_of("Broccoli, raw"),
-        "tomato": key_of("Tomatoes, red, ripe, raw"),
-        "carrot": key_of("Carrots, raw"),
-        "onion": key_of("Onions, raw"),
-        "garlic": key_of("Garlic, raw"),
-        "almonds": key_of("Almonds"),
-        "walnuts": key_of("Walnuts"),
-        "chia": key_of("Seeds, chia") if db.search("chia") else key_of("Seeds"),
-        "yogurt": key_of("Yogurt, plain", "low fat"),
-    }
-
-    recipes: List[Dict] = []
-
-    # Helper for compact definitions
-    def R(rid, title, meal_types, ing, tags):
-        recipes.append(make_recipe(rid, title, meal_types, ing, tags))
-
-    # Breakfasts (10)
-    R("b1", "Porridge d'avena con banana e mirtilli", ["breakfast"], [
-        {"food_key": foods["oats_dry"], "grams": 60},
-        {"food_key": foods["banana"], "grams": 120},
-        {"food_key": foods["blueberries"], "grams": 80},
-        {"food_key": foods["chia"], "grams": 10},
-    ], ["low_gluten", "dairy_free", "no_refined_sugar"])
-
-    R("b2", "Uova strapazzate con spinaci e avocado", ["breakfast"], [
-        {"food_key": foods["egg_whole"], "grams": 120},
-        {"food_key": foods["spinach"], "grams": 80},
-        {"food_key": foods["avocado"], "grams": 70},
-        {"food_key": foods["olive_oil"], "grams": 5},
-    ], ["gluten_free", "low_dairy", "no_refined_sugar"])
-
-    R("b3", "Yogurt con mela e noci", ["breakfast"], [
-        {"food_key": foods["yogurt"], "grams": 200},
-        {"food_key": foods["apple"], "grams": 150},
-        {"food_key": foods["walnuts"], "grams": 20},
-    ], ["gluten_free", "contains_dairy", "no_refined_sugar"])
-
-    R("b4", "Frittata leggera albumi+uovo con pomodoro", ["breakfast"], [
-        {"food_key": foods["egg_white"], "grams": 180},
-        {"food_key": foods["egg_whole"], "grams": 60},
-        {"food_key": foods["tomato"], "grams": 160},
-        {"food_key": foods["olive_oil"], "grams": 5},
-    ], ["gluten_free", "low_dairy", "no_refined_sugar"])
-
-    R("b5", "Overnight oats con mela e mandorle", ["breakfast"], [
-        {"food_key": foods["oats_dry"], "grams": 55},
-        {"food_key": foods["apple"], "grams": 180},
-        {"food_key": foods["chia"], "grams": 12},
-        {"food_key": foods["almonds"], "grams": 15},
-    ], ["low_gluten", "dairy_free", "no_refined_sugar"])
-
-    R("b6", "Pudding di chia con yogurt e mirtilli", ["breakfast"], [
-        {"food_key": foods["chia"], "grams": 25},
-        {"food_key": foods["yogurt"], "grams": 180},
-        {"food_key": foods["blueberries"], "grams": 120},
-    ], ["gluten_free", "contains_dairy", "no_refined_sugar"])
-
-    R("b7", "Omelette con broccoli e pomodoro", ["breakfast"], [
-        {"food_key": foods["egg_whole"], "grams": 140},
-        {"food_key": foods["broccoli"], "grams": 120},
-        {"food_key": foods["tomato"], "grams": 120},
-        {"food_key": foods["olive_oil"], "grams": 5},
-    ], ["gluten_free", "low_dairy", "no_refined_sugar"])
-
-    R("b8", "Uova e avocado con pomodori", ["breakfast"], [
-        {"food_key": foods["egg_whole"], "grams": 120},
-        {"food_key": foods["avocado"], "grams": 90},
-        {"food_key": foods["tomato"], "grams": 180},
-    ], ["gluten_free", "low_dairy", "no_refined_sugar"])
-
-    R("b9", "Porridge d'avena con mela e noci", ["breakfast"], [
-        {"food_key": foods["oats_dry"], "grams": 60},
-        {"food_key": foods["apple"], "grams": 170},
-        {"food_key": foods["walnuts"], "grams": 18},
-    ], ["low_gluten", "dairy_free", "no_refined_sugar"])
-
-    R("b10", "Yogurt con banana e chia", ["breakfast"], [
-        {"food_key": foods["yogurt"], "grams": 220},
-        {"food_key": foods["banana"], "grams": 140},
-        {"food_key": foods["chia"], "grams": 12},
-    ], ["gluten_free", "contains_dairy", "no_refined_sugar"])
-
-    # Lunch/Dinner (22)
-    R("m1", "Bowl quinoa, ceci, spinaci e pomodoro", ["lunch", "dinner"], [
-        {"food_key": foods["quinoa_dry"], "grams": 70},
-        {"food_key": foods["chickpeas_cooked"], "grams": 150},
-        {"food_key": foods["spinach"], "grams": 80},
-        {"food_key": foods["tomato"], "grams": 150},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m2", "Riso integrale con pollo e broccoli", ["lunch", "dinner"], [
-        {"food_key": foods["rice_brown_dry"], "grams": 80},
-        {"food_key": foods["chicken_breast_raw"], "grams": 160},
-        {"food_key": foods["broccoli"], "grams": 200},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m3", "Salmone al forno con carote e spinaci", ["lunch", "dinner"], [
-        {"food_key": foods["salmon_raw"], "grams": 170},
-        {"food_key": foods["carrot"], "grams": 220},
-        {"food_key": foods["spinach"], "grams": 80},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m4", "Tofu saltato con broccoli e riso", ["lunch", "dinner"], [
-        {"food_key": foods["tofu_firm"], "grams": 220},
-        {"food_key": foods["broccoli"], "grams": 220},
-        {"food_key": foods["rice_brown_dry"], "grams": 70},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m5", "Insalata di tonno, avocado e pomodori", ["lunch", "dinner"], [
-        {"food_key": foods["tuna_canned"], "grams": 160},
-        {"food_key": foods["avocado"], "grams": 90},
-        {"food_key": foods["tomato"], "grams": 220},
-        {"food_key": foods["spinach"], "grams": 60},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m6", "Zuppa di lenticchie con spinaci", ["lunch", "dinner"], [
-        {"food_key": foods["lentils_cooked"], "grams": 260},
-        {"food_key": foods["spinach"], "grams": 90},
-        {"food_key": foods["onion"], "grams": 60},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg", "batch"])
-
-    R("m7", "Quinoa con salmone e avocado", ["lunch", "dinner"], [
-        {"food_key": foods["quinoa_dry"], "grams": 70},
-        {"food_key": foods["salmon_raw"], "grams": 150},
-        {"food_key": foods["avocado"], "grams": 80},
-        {"food_key": foods["spinach"], "grams": 60},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m8", "Riso integrale con ceci e broccoli", ["lunch", "dinner"], [
-        {"food_key": foods["rice_brown_dry"], "grams": 75},
-        {"food_key": foods["chickpeas_cooked"], "grams": 180},
-        {"food_key": foods["broccoli"], "grams": 220},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg", "batch"])
-
-    R("m9", "Pollo con quinoa e pomodori", ["lunch", "dinner"], [
-        {"food_key": foods["chicken_breast_raw"], "grams": 170},
-        {"food_key": foods["quinoa_dry"], "grams": 65},
-        {"food_key": foods["tomato"], "grams": 220},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m10", "Tofu e spinaci con quinoa", ["lunch", "dinner"], [
-        {"food_key": foods["tofu_firm"], "grams": 220},
-        {"food_key": foods["spinach"], "grams": 120},
-        {"food_key": foods["quinoa_dry"], "grams": 70},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m11", "Salmone con riso integrale e broccoli", ["lunch", "dinner"], [
-        {"food_key": foods["salmon_raw"], "grams": 160},
-        {"food_key": foods["rice_brown_dry"], "grams": 75},
-        {"food_key": foods["broccoli"], "grams": 200},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m12", "Tonno con quinoa e pomodori", ["lunch", "dinner"], [
-        {"food_key": foods["tuna_canned"], "grams": 160},
-        {"food_key": foods["quinoa_dry"], "grams": 70},
-        {"food_key": foods["tomato"], "grams": 200},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m13", "Ceci e spinaci con avocado", ["lunch", "dinner"], [
-        {"food_key": foods["chickpeas_cooked"], "grams": 220},
-        {"food_key": foods["spinach"], "grams": 120},
-        {"food_key": foods["avocado"], "grams": 70},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m14", "Lenticchie con riso integrale", ["lunch", "dinner"], [
-        {"food_key": foods["lentils_cooked"], "grams": 260},
-        {"food_key": foods["rice_brown_dry"], "grams": 70},
-        {"food_key": foods["onion"], "grams": 50},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg", "batch"])
-
-    R("m15", "Pollo con spinaci e pomodori", ["lunch", "dinner"], [
-        {"food_key": foods["chicken_breast_raw"], "grams": 180},
-        {"food_key": foods["spinach"], "grams": 140},
-        {"food_key": foods["tomato"], "grams": 200},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m16", "Tofu con carote e broccoli", ["lunch", "dinner"], [
-        {"food_key": foods["tofu_firm"], "grams": 240},
-        {"food_key": foods["carrot"], "grams": 200},
-        {"food_key": foods["broccoli"], "grams": 200},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m17", "Salmone con pomodori e spinaci", ["lunch", "dinner"], [
-        {"food_key": foods["salmon_raw"], "grams": 170},
-        {"food_key": foods["tomato"], "grams": 250},
-        {"food_key": foods["spinach"], "grams": 90},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m18", "Tonno e broccoli con riso", ["lunch", "dinner"], [
-        {"food_key": foods["tuna_canned"], "grams": 160},
-        {"food_key": foods["broccoli"], "grams": 250},
-        {"food_key": foods["rice_brown_dry"], "grams": 70},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m19", "Insalatona pollo-avocado-spinaci", ["lunch", "dinner"], [
-        {"food_key": foods["chicken_breast_raw"], "grams": 160},
-        {"food_key": foods["avocado"], "grams": 100},
-        {"food_key": foods["spinach"], "grams": 120},
-        {"food_key": foods["tomato"], "grams": 180},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    R("m20", "Quinoa con lenticchie e pomodoro", ["lunch", "dinner"], [
-        {"food_key": foods["quinoa_dry"], "grams": 65},
-        {"food_key": foods["lentils_cooked"], "grams": 220},
-        {"food_key": foods["tomato"], "grams": 220},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg", "batch"])
-
-    R("m21", "Ceci e avocado con pomodori", ["lunch", "dinner"], [
-        {"food_key": foods["chickpeas_cooked"], "grams": 220},
-        {"food_key": foods["avocado"], "grams": 90},
-        {"food_key": foods["tomato"], "grams": 220},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar", "veg"])
-
-    R("m22", "Pollo con riso e carote", ["lunch", "dinner"], [
-        {"food_key": foods["chicken_breast_raw"], "grams": 170},
-        {"food_key": foods["rice_brown_dry"], "grams": 80},
-        {"food_key": foods["carrot"], "grams": 220},
-        {"food_key": foods["olive_oil"], "grams": 10},
-    ], ["gluten_free", "dairy_free", "no_refined_sugar"])
-
-    OUT_PATH.write_text(json.dumps(recipes, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {len(recipes)} recipes to {OUT_PATH}")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("definitions", nargs="?", type=Path, default=DEFINITIONS_PATH)
+    ap.add_argument("--out", type=Path, default=OUT_PATH, help="catalog to write (.jsonl: JSON Lines + column index)")
+    ap.add_argument("--workers", type=int, default=0, help="worker processes for nutrient computation (0/1 = in-process)")
+    ap.add_argument("--chunk-size", type=int, default=2000, help="recipes per chunk (unit of work and of output writes)")
+    ap.add_argument("--compact", action="store_true",
+                    help="one recipe per line instead of the indented layout (much faster to write; for large catalogs)")
+    ap.add_argument("--full", action="store_true", help="recompute every recipe, ignoring the previous build")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    result = build(args.definitions, args.out, workers=args.workers, chunk_size=args.chunk_size,
+                   compact=args.compact, full=args.full)
+    took = time.perf_counter() - t0
+    if result["written"]:
+        print(f"Wrote {result['recipes']} recipes ({result['recomputed']} recomputed) to {args.out} in {took:.2f}s")
+    else:
+        print(f"{args.out} is up to date ({result['recipes']} recipes, checked in {took:.2f}s)")
+    print(f"catalog version {result['catalog_version']}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from app.nutrition import DATA_PATH, NutritionDB
+
+
+def main():
+    """Compile data/nutrition.csv into a memory-mappable .npy matrix plus a JSON index."""
+    ap = argparse.ArgumentParser()
+    ap.add_argument("csv", nargs="?", type=Path, default=DATA_PATH)
+    args = ap.parse_args()
+
+    db = NutritionDB(args.csv, use_compiled=False)
+    npy_path, index_path = db.compile(args.csv)
+    print(f"Compiled {len(db)} foods x {len(db.nutrient_cols)} nutrients to {npy_path} and {index_path}")
+
+
+if __name__ == "__main__":
+    main()
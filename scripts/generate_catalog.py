@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.catalog import compile_catalog
+from app.nutrition import NutritionDB
+from app.scoring import MACRO_KEYS
+
+# Synthetic recipe catalogs for scale testing. Recipes are composed from
+# NutritionDB foods picked by food group, one food per "slot" of a meal
+# template (protein + grain + vegetables + oil, cereal + fruit + nuts, ...),
+# with gram ranges per slot; nutrients_per_serving is computed from the
+# ingredients exactly like scripts/build_recipes.py does. The same seed and
+# dataset always give the same catalog.
+
+
+@dataclass(frozen=True)
+class Slot:
+    name: str
+    group: str
+    include: str  # regex on the lowercased food name
+    grams: Tuple[int, int]
+    exclude: Optional[str] = None
+    step: int = 5  # grams are rounded to a multiple of this
+
+
+SKIP = r"skin only|separable fat|backfat|fat, raw|giblets|liver|heart|gizzard|kidney|brain|lung|spleen|tongue|with salt"
+
+# plain dry oats only: ready-to-eat cereals and flavored oatmeals carry sugar and
+# often wheat, which their names don't tell
+PLAIN_OATS = r"^cereals, (oats, (regular and quick|instant, fortified, plain)|quaker, (quick oats|oat bran))"
+
+SLOTS: Dict[str, Slot] = {s.name: s for s in (
+    # breakfast bases
+    Slot("cereal", "Breakfast Cereals", PLAIN_OATS + r".*dry", (40, 80)),
+    Slot("yogurt", "Dairy and Egg Products", r"^yogurt|^cheese, cottage|kefir", (150, 250)),
+    Slot("egg", "Dairy and Egg Products", r"^egg, (whole|white)", (100, 180), exclude=r"dried|frozen"),
+    Slot("fruit", "Fruits and Fruit Juices", r", raw", (80, 200), exclude=r"juice|dried|cooked"),
+    Slot("nuts", "Nut and Seed Products", r"^nuts,|^seeds,", (10, 30), exclude=r"butter|paste|oil|flour|meal|salt added|with salt"),
+    # lunch/dinner
+    Slot("poultry", "Poultry Products", r"breast.*raw|meat only, raw", (130, 200), exclude=SKIP),
+    Slot("fish", "Finfish and Shellfish Products", r", raw|canned in water", (130, 200), exclude=SKIP),
+    Slot("beef", "Beef Products", r"lean only.*raw|ground.*raw", (120, 180), exclude=SKIP),
+    Slot("pork", "Pork Products", r"lean only.*raw", (120, 180), exclude=SKIP),
+    Slot("legumes", "Legumes and Legume Products", r"mature seeds, cooked, boiled|^tofu,", (150, 260), exclude=SKIP),
+    Slot("grain", "Cereal Grains and Pasta", r"dry|uncooked|raw", (55, 90), exclude=r"flour|bran|starch|germ"),
+    Slot("vegetable", "Vegetables and Vegetable Products", r", raw", (60, 250), exclude=r"seeds|sprouted"),
+    Slot("oil", "Fats and Oils", r"^oil, ", (5, 15), exclude=r"hydrogenated|industrial|cocoa butter|spray", step=1),
+)}
+
+# (slot names to pick one from, probability the slot is used); a slot may repeat for 2 vegetables
+BREAKFAST = ((("cereal", "yogurt", "egg"), 1.0), (("fruit",), 1.0), (("nuts",), 0.6))
+MAIN = (
+    (("poultry", "fish", "legumes", "legumes", "beef", "pork"), 1.0),
+    (("grain",), 0.85),
+    (("vegetable",), 1.0),
+    (("vegetable",), 0.6),
+    (("oil",), 0.9),
+)
+
+MEATS = {"Poultry Products", "Finfish and Shellfish Products", "Beef Products", "Pork Products"}
+GLUTEN = re.compile(r"wheat|pasta|spaghetti|macaroni|noodle|couscous|bulgur|barley|\brye\b|semolina|spelt|bread|farina")
+OATS = re.compile(PLAIN_OATS)
+SUGAR = re.compile(r"(?<!un)sweetened|sugar|honey|syrup|frosted|vanilla|chocolate|with fruit|fruit, low fat|, fruit")
+
+
+class FoodPools:
+    """Candidate rows of the nutrition table for every slot."""
+
+    def __init__(self, db: NutritionDB, slots: Dict[str, Slot] = SLOTS):
+        self.db = db
+        macros = np.asarray(db.values[:, [db.nutrient_cols.index(k) for k in MACRO_KEYS]])
+        usable = ~np.isnan(macros).any(axis=1)
+        names = [f.lower() for f in db.foods]
+        self.pools: Dict[str, List[int]] = {}
+        for slot in slots.values():
+            inc = re.compile(slot.include)
+            exc = re.compile(slot.exclude) if slot.exclude else None
+            rows = [
+                i for i, (name, group) in enumerate(zip(names, db.groups))
+                if group == slot.group and usable[i] and inc.search(name) and not (exc and exc.search(name))
+                and db.row_index(db.food_keys[i]) == i  # skip duplicated keys
+            ]
+            if not rows:
+                raise ValueError(f"No foods for slot {slot.name!r} in this dataset")
+            self.pools[slot.name] = rows
+
+    def pick(self, slot: str, rng: random.Random, taken: Sequence[int]) -> int:
+        pool = self.pools[slot]
+        for _ in range(8):
+            i = pool[rng.randrange(len(pool))]
+            if i not in taken:
+                return i
+        return i
+
+
+GENERIC_HEADS = {"beans", "cereals ready-to-eat", "cereals", "cheese", "egg", "fish", "nuts", "oil", "rice", "seeds", "yogurt"}
+
+
+def _short(food: str) -> str:
+    """'Fish, salmon, Atlantic, raw' -> 'Fish (salmon)', 'Broccoli, raw' -> 'Broccoli'."""
+    parts = [p.strip() for p in food.split(",")]
+    if parts[0].lower() in GENERIC_HEADS and len(parts) > 1:
+        return f"{parts[0]} ({parts[1]})"
+    return parts[0]
+
+
+def _tags(rows: Sequence[int], db: NutritionDB, main: bool) -> List[str]:
+    names = [db.foods[i].lower() for i in rows]
+    groups = [db.groups[i] for i in rows]
+    dairy = any(g == "Dairy and Egg Products" and not n.startswith("egg") for n, g in zip(names, groups))
+    eggs = any(n.startswith("egg") for n in names)
+    if any(GLUTEN.search(n) for n in names):
+        tags = []
+    elif any(OATS.search(n) for n in names):
+        tags = ["low_gluten"]
+    else:
+        tags = ["gluten_free"]
+    tags.append("contains_dairy" if dairy else "low_dairy" if eggs else "dairy_free")
+    tags.append("refined_sugar" if any(SUGAR.search(n) for n in names) else "no_refined_sugar")
+    if main and not any(g in MEATS for g in groups):
+        tags.append("veg")
+    if main and any(g == "Legumes and Legume Products" for g in groups) and "tofu" not in " ".join(names):
+        tags.append("batch")
+    return tags
+
+
+def _compose(template, pools: FoodPools, rng: random.Random) -> List[Tuple[int, float]]:
+    picked: List[Tuple[int, float]] = []
+    for choices, p in template:
+        if rng.random() >= p:
+            continue
+        slot = SLOTS[rng.choice(choices)]
+        i = pools.pick(slot.name, rng, [r for r, _ in picked])
+        lo, hi = slot.grams
+        grams = max(slot.step, round(rng.uniform(lo, hi) / slot.step) * slot.step)
+        picked.append((i, grams))
+    return picked
+
+
+def generate_catalog(n: int, seed: int = 0, db: Optional[NutritionDB] = None,
+                     breakfast_share: float = 10 / 32) -> List[Dict]:
+    """`n` recipes in the data/recipes.json format, deterministic for (`n`, `seed`, dataset).
+
+    About `breakfast_share` of them are breakfasts (the shipped catalog's
+    mix by default), the rest lunch/dinner.
+    """
+    db = db or NutritionDB()
+    pools = FoodPools(db)
+    rng = random.Random(seed)
+    n_breakfast = round(n * breakfast_share)
+    recipes: List[Dict] = []
+    for k in range(n):
+        breakfast = k < n_breakfast
+        picked = _compose(BREAKFAST if breakfast else MAIN, pools, rng)
+        rows = [i for i, _ in picked]
+        ingredients = [{"food_key": db.food_keys[i], "grams": g} for i, g in picked]
+        recipes.append({
+            "recipe_id": f"gb{k + 1}" if breakfast else f"gm{k - n_breakfast + 1}",
+            "title": " · ".join(_short(db.foods[i]) for i in rows),
+            "meal_types": ["breakfast"] if breakfast else ["lunch", "dinner"],
+            "tags": _tags(rows, db, main=not breakfast),
+            "ingredients": ingredients,
+            "nutrients_per_serving": db.nutrients_for_ingredients(ingredients),
+        })
+    return recipes
+
+
+def write_catalog(recipes: Sequence[Dict], out: Path) -> None:
+    """Write `recipes` as a JSON array, or as JSON Lines plus its compiled column index if `out` ends in .jsonl."""
+    if out.suffix == ".jsonl":
+        with open(out, "w", encoding="utf-8") as f:
+            for r in recipes:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        compile_catalog(out)
+    else:
+        out.write_text(json.dumps(recipes, ensure_ascii=False), encoding="utf-8")
+
+
+def main():
+    """Write a synthetic catalog that RecipeBook (MEALBOT_RECIPES_PATH) and the benchmarks can load."""
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", type=int, help="number of recipes")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, required=True, help="catalog to write (.jsonl: JSON Lines, opened lazily)")
+    ap.add_argument("--breakfast-share", type=float, default=10 / 32)
+    args = ap.parse_args()
+
+    recipes = generate_catalog(args.n, args.seed, breakfast_share=args.breakfast_share)
+    write_catalog(recipes, args.out)
+    print(f"Wrote {len(recipes)} recipes (seed {args.seed}) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
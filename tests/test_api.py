@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app.main as main  # noqa: E402
+
+
+def test_recipe_removed_by_a_catalog_reload_asks_for_a_replan(monkeypatch):
+    with TestClient(main.app) as client:
+        body = client.post("/start_month", json={"month": "2026-03", "session_id": "stale"}).json()
+        day = body["month_plan"]["days"][0]
+        monkeypatch.setattr(main, "get_recipe_book", lambda: SimpleNamespace(by_id={}))
+
+        resp = client.post("/cook", json={"date": day["date"], "meal": "lunch", "session_id": "stale"})
+        assert resp.status_code == 409
+        assert day["lunch"]["recipe_id"] in resp.json()["detail"]
+        assert "replan" in resp.json()["detail"]
+
+        chat = client.post("/chat/message", json={"session_id": "stale", "message": f"ricetta {day['date']} pranzo"})
+        assert chat.status_code == 200
+        assert "replan" in chat.json()["reply"]
+        assert client.get("/ledger/2026-03", params={"session_id": "stale"}).json()["events"] == []
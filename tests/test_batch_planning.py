@@ -0,0 +1,49 @@
+import pytest
+
+from app.executor import split_time_budget
+from app.models import UserProfile
+from app.planner import LazyRecipeBook, RecipeBook, build_month_plan, build_month_plans
+from scripts.generate_catalog import generate_catalog, write_catalog
+
+
+def _profile(macros=None, **prefs):
+    profile = UserProfile(preferences=prefs).model_dump()
+    if macros is not None:
+        profile["daily_targets"]["macros_g"] = macros
+    return profile
+
+
+PROFILES = [
+    _profile(),
+    _profile(refined_sugar="allow_small", dairy_limit_level="none", gluten_limit_level="very_low"),
+    _profile({"protein": 90.0, "carbohydrates": 300.0, "total_fat": 50.0, "fiber": 25.0}, dairy_limit_level="none"),
+    _profile({"fiber": 40.0, "protein": 150.0, "total_fat": 60.0}),  # other key order, missing carbohydrates
+    _profile({"protein": 100.0, "carbohydrates": 250.0, "total_fat": 65.0, "fiber": 30.0, "sugar": 20.0}),  # non-macro key
+]
+JOBS = [(month, p) for month in ("2026-02", "2026-03", "2024-02") for p in PROFILES] + [("2026-03", PROFILES[0])]
+
+
+def _assert_batch_matches(book):
+    batched = build_month_plans(JOBS, book)
+    assert len(batched) == len(JOBS)
+    for (month, profile), plan in zip(JOBS, batched):
+        assert plan == build_month_plan(month, profile, book)
+
+
+def test_batched_plans_equal_single_plans_on_the_shipped_catalog():
+    _assert_batch_matches(RecipeBook())
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_batched_plans_equal_single_plans_on_a_generated_catalog(tmp_path, suffix):
+    path = tmp_path / f"recipes{suffix}"
+    write_catalog(generate_catalog(400, seed=5), path)
+    _assert_batch_matches(LazyRecipeBook(path) if suffix == ".jsonl" else RecipeBook(path))
+
+
+def test_batch_optimizer_budgets_are_scaled_to_the_total():
+    solvers = [("optimize", 10_000)] * 1000 + [("greedy", 300)]
+    split = split_time_budget(solvers, 10_000)
+    assert sum(b for s, b in split if s == "optimize") <= 10_000
+    assert split[0] == ("optimize", 10) and split[-1] == ("greedy", 300)
+    assert split_time_budget([("optimize", 300), ("greedy", 300)], 10_000) == [("optimize", 300), ("greedy", 300)]
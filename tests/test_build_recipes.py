@@ -0,0 +1,130 @@
+import json
+import sys
+
+import pytest
+
+from app.catalog import compiled_catalog_paths, load_compiled_catalog
+from app.nutrition import NutritionDB
+from app.planner import catalog_manifest_path
+from scripts import build_recipes
+from scripts.build_recipes import DEFINITIONS_PATH, build
+
+DB = NutritionDB()
+
+
+@pytest.fixture
+def definitions(tmp_path):
+    path = tmp_path / "defs.json"
+    path.write_text(DEFINITIONS_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    return path
+
+
+def _edit(path, recipe_id, change):
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    change(next(r for r in doc["recipes"] if r["recipe_id"] == recipe_id))
+    path.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+
+
+def _build(definitions, out, **kw):
+    return build(definitions, out, chunk_size=5, db=DB, **kw)
+
+
+def _assert_same_as_full(definitions, out, **kw):
+    """`out` (built incrementally) equals a --full build of the same definitions, manifest included."""
+    full = out.parent / "full" / out.name
+    _build(definitions, full, full=True, **kw)
+    assert out.read_bytes() == full.read_bytes()
+    manifests = [json.loads(catalog_manifest_path(p).read_text(encoding="utf-8")) for p in (out, full)]
+    for m in manifests:
+        del m["source"]["mtime_ns"]
+    assert manifests[0] == manifests[1]
+
+
+def test_unchanged_catalog_is_not_rewritten(definitions, tmp_path, monkeypatch, capsys):
+    out = tmp_path / "recipes.json"
+    first = _build(definitions, out)
+    assert first["written"] and first["recomputed"] == first["recipes"] == 32
+    assert out.read_bytes() == (DEFINITIONS_PATH.parent / "recipes.json").read_bytes()
+    mtime = out.stat().st_mtime_ns
+
+    again = _build(definitions, out)
+    assert again == {**first, "recomputed": 0, "written": False}
+    assert out.stat().st_mtime_ns == mtime
+
+    monkeypatch.setattr(sys, "argv", ["build_recipes", str(definitions), "--out", str(out)])
+    build_recipes.main()
+    assert "is up to date (32 recipes" in capsys.readouterr().out
+    assert out.stat().st_mtime_ns == mtime
+
+
+def test_editing_one_recipe_recomputes_only_that_recipe(definitions, tmp_path):
+    out = tmp_path / "recipes.json"
+    first = _build(definitions, out)
+    _edit(definitions, "m3", lambda r: r["ingredients"][0].update(grams=r["ingredients"][0]["grams"] + 20))
+
+    result = _build(definitions, out)
+    assert result["written"] and result["recomputed"] == 1
+    assert result["catalog_version"] != first["catalog_version"]
+    _assert_same_as_full(definitions, out)
+
+
+def test_metadata_only_change_keeps_the_computed_nutrients(definitions, tmp_path):
+    out = tmp_path / "recipes.json"
+    _build(definitions, out)
+    before = {r["recipe_id"]: r for r in json.loads(out.read_text(encoding="utf-8"))}
+    _edit(definitions, "m12", lambda r: r.update(title="Nuovo titolo", tags=r["tags"] + ["batch"]))
+
+    result = _build(definitions, out)
+    assert result["written"] and result["recomputed"] == 0
+    after = {r["recipe_id"]: r for r in json.loads(out.read_text(encoding="utf-8"))}
+    assert after["m12"]["title"] == "Nuovo titolo"
+    assert after["m12"]["nutrients_per_serving"] == before["m12"]["nutrients_per_serving"]
+    _assert_same_as_full(definitions, out)
+
+
+def test_layout_switch_rewrites_without_recomputing(definitions, tmp_path):
+    out = tmp_path / "recipes.json"
+    _build(definitions, out)
+    result = _build(definitions, out, compact=True)
+    assert result["written"] and result["recomputed"] == 0
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 32 + 2
+    _assert_same_as_full(definitions, out, compact=True)
+
+    result = _build(definitions, out)  # and back to the indented layout
+    assert result["written"] and result["recomputed"] == 0
+    _assert_same_as_full(definitions, out)
+
+
+def test_jsonl_catalog_is_built_incrementally_with_its_index(definitions, tmp_path):
+    out = tmp_path / "recipes.jsonl"
+    _build(definitions, out)
+    assert load_compiled_catalog(out) is not None
+    _edit(definitions, "b1", lambda r: r["ingredients"].pop())
+
+    result = _build(definitions, out)
+    assert result["written"] and result["recomputed"] == 1
+    assert load_compiled_catalog(out) is not None
+    _assert_same_as_full(definitions, out)
+
+    for sidecar in compiled_catalog_paths(out):
+        sidecar.unlink()
+    assert load_compiled_catalog(out) is None
+    assert not _build(definitions, out)["written"]
+    assert load_compiled_catalog(out) is not None  # an up-to-date catalog still gets its index back
+
+
+@pytest.mark.parametrize("damage", ["edited catalog", "missing manifest", "other format"])
+def test_stale_or_missing_manifest_means_a_full_rebuild(definitions, tmp_path, damage):
+    out = tmp_path / "recipes.json"
+    _build(definitions, out)
+    manifest = catalog_manifest_path(out)
+    if damage == "edited catalog":
+        out.write_text(out.read_text(encoding="utf-8").replace("Porridge", "Pappa"), encoding="utf-8")
+    elif damage == "missing manifest":
+        manifest.unlink()
+    else:
+        manifest.write_text(json.dumps({**json.loads(manifest.read_text(encoding="utf-8")), "format": -1}), encoding="utf-8")
+
+    result = _build(definitions, out)
+    assert result["written"] and result["recomputed"] == 32
+    _assert_same_as_full(definitions, out)
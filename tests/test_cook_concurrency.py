@@ -0,0 +1,59 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.inventory import meal_usage  # noqa: E402
+import app.main as main  # noqa: E402
+from app.main import app  # noqa: E402
+from app.planner import get_recipe_book  # noqa: E402
+from app.sessions import SQLiteSessionStore  # noqa: E402
+
+MONTH = "2026-03"
+SESSION = "cook-race"
+
+
+# each meal is cooked `rounds` times (the inventory bottoms out at 0); SQLite
+# conflicts are caught by the database, so fewer rounds are enough there
+@pytest.mark.parametrize("store, rounds", [("memory", 8), ("sqlite", 2)])
+def test_concurrent_cooks_keep_ledger_and_inventory_consistent(store, rounds, tmp_path, monkeypatch):
+    if store == "sqlite":
+        monkeypatch.setattr(main, "sessions", SQLiteSessionStore(tmp_path / "sessions.db"))
+    with TestClient(app) as client:
+        started = client.post("/start_month", json={"month": MONTH, "session_id": SESSION})
+        assert started.status_code == 200
+        body = started.json()
+        initial = body["inventory"]
+        meals = [(day, meal) for day in body["month_plan"]["days"] for meal in ("breakfast", "lunch", "dinner")] * rounds
+
+        def cook(item):
+            day, meal = item
+            resp = client.post("/cook", json={"date": day["date"], "meal": meal, "session_id": SESSION, "inventory_mode": "delta"})
+            assert resp.status_code == 200
+            return resp.json()["ledger_seq"]
+
+        # switch threads often so unsynchronized read-modify-writes would interleave
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                seqs = list(pool.map(cook, meals))
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert sorted(seqs) == list(range(1, len(meals) + 1))
+        ledger = client.get(f"/ledger/{MONTH}", params={"session_id": SESSION}).json()["events"]
+        assert [ev["seq"] for ev in ledger] == list(range(1, len(meals) + 1))
+
+        book = get_recipe_book()
+        used = {}
+        for day, meal in meals:
+            for fk, grams in meal_usage(book.by_id[day[meal]["recipe_id"]], day[meal]["servings"]).items():
+                used[fk] = used.get(fk, 0.0) + grams
+        inventory = client.get(f"/inventory/{MONTH}", params={"session_id": SESSION}).json()["inventory"]
+        for fk, before in initial.items():
+            # every cook rounds to 0.1 g
+            assert inventory[fk] == pytest.approx(max(0.0, before - used.get(fk, 0.0)), abs=0.05 * len(meals))
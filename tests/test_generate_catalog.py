@@ -0,0 +1,22 @@
+from app.nutrition import NutritionDB
+from scripts.generate_catalog import GLUTEN, SUGAR, FoodPools, generate_catalog
+
+
+def test_cereal_slot_holds_only_plain_oats():
+    db = NutritionDB()
+    names = [db.foods[i].lower() for i in FoodPools(db).pools["cereal"]]
+    assert names
+    for name in names:
+        assert "oat" in name and "ready-to-eat" not in name
+        assert not SUGAR.search(name) and not GLUTEN.search(name)
+
+
+def test_oat_breakfasts_are_tagged_from_their_other_ingredients():
+    db = NutritionDB()
+    oats = {db.food_keys[i] for i in FoodPools(db).pools["cereal"]}
+    breakfasts = [r for r in generate_catalog(300, seed=1, db=db) if any(x["food_key"] in oats for x in r["ingredients"])]
+    assert breakfasts
+    for r in breakfasts:
+        names = [db.foods[db.row_index(x["food_key"])].lower() for x in r["ingredients"]]
+        assert ("low_gluten" in r["tags"]) != any(GLUTEN.search(n) for n in names)
+        assert ("refined_sugar" in r["tags"]) == any(SUGAR.search(n) for n in names)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.inventory import inventory_snapshot, record_cook, replay_cook, undo_cook
+from app.planner import Recipe
+
+OMELETTE = Recipe("omelette", "Omelette", ["breakfast"], [], [{"food_key": "egg", "grams": 120}, {"food_key": "milk", "grams": 30}], {})
+INITIAL = {"egg": 300.0, "milk": 100.0}
+
+
+def test_cook_consumes_in_place_and_logs_the_applied_deltas():
+    ledger, inventory = [], dict(INITIAL)
+    event = record_cook(ledger, inventory, OMELETTE, 1.5, date="2026-03-01", meal="breakfast")
+    assert inventory == {"egg": 120.0, "milk": 55.0}
+    assert ledger == [event]
+    assert event["seq"] == 1 and event["kind"] == "cook" and event["meal"] == "breakfast"
+    assert event["usage"] == {"egg": 180.0, "milk": 45.0}
+    assert event["deltas"] == {"egg": -180.0, "milk": -45.0}
+
+
+def test_cook_clamps_at_zero_and_undo_gives_back_only_what_was_removed():
+    ledger, inventory = [], dict(INITIAL)
+    record_cook(ledger, inventory, OMELETTE, 2)
+    second = record_cook(ledger, inventory, OMELETTE, 2)
+    assert inventory == {"egg": 0.0, "milk": 0.0}
+    assert second["deltas"] == {"egg": -60.0, "milk": -40.0}
+
+    undo = undo_cook(ledger, inventory, 2)
+    assert undo["kind"] == "undo" and undo["target_seq"] == 2 and undo["seq"] == 3
+    assert undo["deltas"] == {"egg": 60.0, "milk": 40.0}
+    assert inventory == {"egg": 60.0, "milk": 40.0}
+
+
+def test_undo_twice_is_rejected_and_replay_reapplies_the_usage():
+    ledger, inventory = [], dict(INITIAL)
+    record_cook(ledger, inventory, OMELETTE, 1)
+    undo_cook(ledger, inventory, 1)
+    assert inventory == INITIAL
+    with pytest.raises(ValueError):
+        undo_cook(ledger, inventory, 1)
+    replay = replay_cook(ledger, inventory, 1)
+    assert replay["target_seq"] == 1 and replay["deltas"] == {"egg": -120.0, "milk": -30.0}
+    assert inventory == {"egg": 180.0, "milk": 70.0}
+    with pytest.raises(ValueError):
+        replay_cook(ledger, inventory, 1)
+
+    # after the replay, undo gives back the replay's deltas
+    assert [ev["kind"] for ev in ledger] == ["cook", "undo", "replay"]
+    undo_cook(ledger, inventory, 1)
+    assert inventory == INITIAL
+
+
+def test_undo_and_replay_only_target_cook_events():
+    ledger, inventory = [], dict(INITIAL)
+    record_cook(ledger, inventory, OMELETTE, 1)
+    undo_cook(ledger, inventory, 1)
+    for seq in (0, 2, 3):
+        with pytest.raises(KeyError):
+            undo_cook(ledger, inventory, seq)
+        with pytest.raises(KeyError):
+            replay_cook(ledger, inventory, seq)
+
+
+def test_snapshot_folds_the_ledger_up_to_a_seq_or_a_time():
+    ledger, inventory = [], dict(INITIAL)
+    record_cook(ledger, inventory, OMELETTE, 1)
+    record_cook(ledger, inventory, OMELETTE, 1)
+    undo_cook(ledger, inventory, 1)
+    base = datetime.fromisoformat(ledger[0]["ts"])
+    for i, ev in enumerate(ledger):  # one event per hour
+        ev["ts"] = (base + timedelta(hours=i)).isoformat()
+
+    assert inventory_snapshot(INITIAL, ledger) == (inventory, 3)
+    assert inventory_snapshot(INITIAL, ledger, upto_seq=0) == (INITIAL, 0)
+    assert inventory_snapshot(INITIAL, ledger, upto_seq=2) == ({"egg": 60.0, "milk": 40.0}, 2)
+    assert inventory_snapshot(INITIAL, ledger, at=base + timedelta(minutes=30)) == ({"egg": 180.0, "milk": 70.0}, 1)
+    assert inventory_snapshot(INITIAL, ledger, upto_seq=2, at=base) == ({"egg": 180.0, "milk": 70.0}, 1)
+    assert inventory_snapshot(INITIAL, ledger, at=base - timedelta(seconds=1)) == (INITIAL, 0)
@@ -0,0 +1,41 @@
+from app.catalog import load_compiled_catalog
+from app.inventory import aggregate_grocery_list, grocery_list_items
+from app.models import UserProfile
+from app.nutrition import NutritionDB
+from app.planner import LazyRecipeBook, RecipeBook, build_month_plan
+from scripts.build_recipes import DEFINITIONS_PATH, build
+from scripts.generate_catalog import generate_catalog, write_catalog
+
+DB = NutritionDB()
+PROFILES = [
+    UserProfile().model_dump(),
+    UserProfile(preferences={"refined_sugar": "allow_small", "dairy_limit_level": "none",
+                             "gluten_limit_level": "very_low"}).model_dump(),
+]
+
+
+def _assert_same_plans_and_groceries(lazy, eager):
+    assert len(lazy.recipes) == len(eager.recipes)
+    for month in ("2026-02", "2026-03"):
+        for profile in PROFILES:
+            plan = build_month_plan(month, profile, lazy)
+            assert plan == build_month_plan(month, profile, eager)
+            totals = aggregate_grocery_list(plan, lazy)
+            assert totals == aggregate_grocery_list(plan, eager)
+            assert grocery_list_items(totals, DB) == grocery_list_items(aggregate_grocery_list(plan, eager), DB)
+
+
+def test_lazy_book_matches_the_shipped_catalog(tmp_path):
+    out = tmp_path / "recipes.jsonl"
+    build(DEFINITIONS_PATH, out, db=DB)
+    assert load_compiled_catalog(out) is not None
+    lazy, eager = LazyRecipeBook(out), RecipeBook()
+    assert lazy.version == eager.version
+    _assert_same_plans_and_groceries(lazy, eager)
+
+
+def test_lazy_book_matches_a_generated_catalog(tmp_path):
+    recipes = generate_catalog(600, seed=7, db=DB)
+    write_catalog(recipes, tmp_path / "recipes.jsonl")
+    write_catalog(recipes, tmp_path / "recipes.json")
+    _assert_same_plans_and_groceries(LazyRecipeBook(tmp_path / "recipes.jsonl"), RecipeBook(tmp_path / "recipes.json"))
@@ -0,0 +1,27 @@
+from app.plan_cache import PlanCache
+
+PLAN = ({"month": "2026-03", "days": []}, {"items": [], "totals": {}})
+
+
+def test_overwriting_a_plan_does_not_count_as_a_new_file(tmp_path):
+    cache = PlanCache(directory=tmp_path, max_disk_entries=3)
+    for _ in range(5):
+        cache.put("a" * 64, *PLAN)
+    assert cache.stats()["disk_entries"] == 1
+    for key in ("b", "c"):
+        cache.put(key * 64, *PLAN)
+    assert cache.stats()["disk_entries"] == 3
+    assert cache.stats()["disk_evictions"] == 0
+
+
+def test_pruning_only_touches_plan_files(tmp_path):
+    (tmp_path / "notes.json").write_text("{}")
+    (tmp_path / ("f" * 64 + ".json")).write_text("{}")  # a plan file under the old name
+    cache = PlanCache(directory=tmp_path, max_disk_entries=2)
+    for key in "abc":
+        cache.put(key * 64, *PLAN)
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert "notes.json" in names
+    assert "f" * 64 + ".json" not in names
+    assert len([n for n in names if n.endswith(".plan.json")]) == 1  # pruned to 90% of 2
+    assert PlanCache(directory=tmp_path).get("c" * 64) == PLAN
@@ -0,0 +1,52 @@
+import dataclasses
+import itertools
+import random
+
+import pytest
+
+from app.planner import MEALS, Recipe, RecipeBook, _macro_targets_for_meal, choose_recipe
+from app.scoring import RecipeScorer
+from scripts.generate_catalog import generate_catalog
+
+PREFS = [
+    {"refined_sugar": sugar, "dairy_limit_level": dairy, "gluten_limit_level": gluten}
+    for sugar, dairy, gluten in itertools.product(("avoid", "allow_small"), ("none", "low", "normal"), ("very_low", "low"))
+]
+DAILY_MACROS = [
+    {"protein": 120.0, "carbohydrates": 220.0, "total_fat": 70.0, "fiber": 30.0},
+    {"protein": 90.0, "carbohydrates": 300.0, "total_fat": 50.0, "fiber": 25.0},
+    {"fiber": 40.0, "protein": 150.0},  # other key order, missing keys
+]
+
+
+def _assert_same_picks(recipes, meal, seed=0):
+    rng = random.Random(seed)
+    scorer = RecipeScorer(recipes)
+    ids = [r.recipe_id for r in recipes]
+    recents = [[], rng.sample(ids, min(8, len(ids))), ids[:-1], ids]  # ids: every candidate excluded -> fallback
+    for prefs, daily, recent in itertools.product(PREFS, DAILY_MACROS, recents):
+        target = _macro_targets_for_meal(daily, meal)
+        expected = choose_recipe(recipes, target, prefs, recent)
+        assert scorer.choose(target, prefs, recent).recipe_id == expected.recipe_id, (prefs, daily, len(recent))
+
+
+@pytest.mark.parametrize("meal", MEALS)
+def test_scorer_matches_choose_recipe_on_the_shipped_catalog(meal):
+    _assert_same_picks(list(RecipeBook().for_meal(meal)), meal)
+
+
+@pytest.mark.parametrize("meal", MEALS)
+def test_scorer_matches_choose_recipe_on_a_generated_catalog(meal):
+    recipes = [Recipe(**r) for r in generate_catalog(600, seed=3) if meal in r["meal_types"]]
+    assert recipes
+    _assert_same_picks(recipes, meal, seed=3)
+
+
+def test_ties_go_to_the_first_candidate():
+    base = list(RecipeBook().for_meal("lunch"))
+    # every recipe twice under another id: each score is tied with its copy
+    recipes = [x for r in base for x in (r, dataclasses.replace(r, recipe_id=r.recipe_id + "-copy"))]
+    _assert_same_picks(recipes, "lunch")
+    target = _macro_targets_for_meal(DAILY_MACROS[0], "lunch")
+    pick = RecipeScorer(recipes).choose(target, PREFS[0], [])
+    assert not pick.recipe_id.endswith("-copy")
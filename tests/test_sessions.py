@@ -0,0 +1,145 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.sessions import MemorySessionStore, SQLiteSessionStore
+
+
+def _append(value):
+    def change(state):
+        state["ledger"].append(value)
+        return len(state["ledger"])
+    return change
+
+
+def test_sqlite_put_is_visible_to_other_stores(tmp_path):
+    a, b = SQLiteSessionStore(tmp_path / "s.db"), SQLiteSessionStore(tmp_path / "s.db")
+    a.put("u", "2026-03", {"ledger": []})
+    assert b.get("u", "2026-03") == {"ledger": []}
+    b.delete("u", "2026-03")
+    assert a.get("u", "2026-03") is None
+
+
+def test_sqlite_update_retries_when_another_store_wrote_first(tmp_path):
+    a, b = SQLiteSessionStore(tmp_path / "s.db"), SQLiteSessionStore(tmp_path / "s.db")
+    a.put("u", "2026-03", {"ledger": []})
+
+    def interleaved(state):
+        if not state["ledger"]:
+            b.update("u", "2026-03", _append(2))  # lands between a's read and a's write
+        state["ledger"].append(1)
+
+    a.update("u", "2026-03", interleaved)
+    assert a.get("u", "2026-03") == {"ledger": [2, 1]}
+    assert b.get("u", "2026-03") == {"ledger": [2, 1]}
+    assert a.update_conflicts == 1
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_concurrent_updates_are_not_lost(tmp_path, kind):
+    if kind == "memory":
+        stores = [MemorySessionStore()] * 4
+    else:
+        stores = [SQLiteSessionStore(tmp_path / "s.db") for _ in range(4)]
+    stores[0].put("u", "2026-03", {"ledger": []})
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        lengths = list(pool.map(lambda i: stores[i % 4].update("u", "2026-03", _append(i)), range(200)))
+    assert sorted(lengths) == list(range(1, 201))
+    assert sorted(stores[0].get("u", "2026-03")["ledger"]) == list(range(200))
+
+
+def test_update_without_state_stores_nothing(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "s.db")
+    assert store.update("u", "2026-03", lambda state: state) is None
+    assert store.get("u", "2026-03") is None
+    assert len(store) == 0
+
+
+def test_sqlite_cached_state_is_not_shared_with_callers(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "s.db")
+    store.put("u", "2026-03", {"ledger": []})
+    store.get("u", "2026-03")["grocery"] = {"items": []}  # decoded, cached, then modified by the caller
+    assert "grocery" not in store.get("u", "2026-03")
+    assert store.decoded_hits == 1
+
+    with pytest.raises(RuntimeError):
+        def broken(state):
+            state["ledger"].append(1)
+            raise RuntimeError
+        store.update("u", "2026-03", broken)
+    assert store.get("u", "2026-03") == {"ledger": []}
+
+
+def _version(store, key=("u", "2026-03")):
+    return store._conn.execute("SELECT version FROM sessions WHERE session_id = ? AND month = ?", key).fetchone()[0]
+
+
+def _cook(state):
+    state["inventory"]["egg"] -= 50.0
+    state["ledger"].append({"seq": len(state["ledger"]) + 1, "deltas": {"egg": -50.0}})
+
+
+def test_sqlite_events_are_appended_without_rewriting_the_plan(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "s.db")
+    store.put("u", "2026-03", {"month_plan": {"days": []}, "inventory": {"egg": 300.0}, "ledger": []})
+    version = _version(store)
+    store.update("u", "2026-03", _cook)
+    store.update("u", "2026-03", _cook)
+    assert _version(store) == version
+    assert store._conn.execute("SELECT seq FROM ledger ORDER BY seq").fetchall() == [(1,), (2,)]
+    state = SQLiteSessionStore(tmp_path / "s.db").get("u", "2026-03")
+    assert state["inventory"] == {"egg": 200.0}
+    assert [ev["seq"] for ev in state["ledger"]] == [1, 2]
+
+    # a plan change bumps the version; a new plan drops the old ledger
+    store.update("u", "2026-03", lambda s: s.__setitem__("grocery", {"items": []}))
+    assert _version(store) > version
+    assert store.get("u", "2026-03")["ledger"][-1]["seq"] == 2
+    store.put("u", "2026-03", {"month_plan": {"days": []}, "inventory": {"egg": 300.0}, "ledger": []})
+    assert store.get("u", "2026-03")["ledger"] == []
+
+
+def test_sqlite_plan_change_retries_after_a_concurrent_event(tmp_path):
+    a, b = SQLiteSessionStore(tmp_path / "s.db"), SQLiteSessionStore(tmp_path / "s.db")
+    a.put("u", "2026-03", {"inventory": {"egg": 300.0}, "ledger": []})
+
+    def fill_in(state):
+        if not state["ledger"]:
+            b.update("u", "2026-03", _cook)  # logged after a's read: a must not write back its stale inventory
+        state["grocery"] = {"items": []}
+
+    a.update("u", "2026-03", fill_in)
+    state = b.get("u", "2026-03")
+    assert state["inventory"] == {"egg": 250.0}
+    assert state["grocery"] == {"items": []}
+    assert a.update_conflicts == 1
+
+
+def test_sqlite_rows_stored_before_the_ledger_table_are_split_on_update(tmp_path):
+    conn = sqlite3.connect(tmp_path / "s.db")
+    conn.execute("CREATE TABLE sessions (session_id TEXT NOT NULL, month TEXT NOT NULL, state TEXT NOT NULL, updated REAL NOT NULL,"
+                 " version INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (session_id, month))")
+    legacy = {"inventory": {"egg": 250.0}, "ledger": [{"seq": 1, "deltas": {"egg": -50.0}}]}
+    conn.execute("INSERT INTO sessions VALUES ('u', '2026-03', ?, 1e12, 1)", (json.dumps(legacy),))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteSessionStore(tmp_path / "s.db")
+    assert store.get("u", "2026-03") == legacy
+    store.update("u", "2026-03", _cook)
+    state = SQLiteSessionStore(tmp_path / "s.db").get("u", "2026-03")
+    assert state["inventory"] == {"egg": 200.0}
+    assert [ev["seq"] for ev in state["ledger"]] == [1, 2]
+    assert store._conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0] == 2
+
+
+def test_sqlite_approx_len_recounts_at_most_every_interval(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "s.db", count_interval=3600)
+    store.put("u", "2026-03", {"ledger": []})
+    assert store.approx_len() == 1
+    store.put("u", "2026-04", {"ledger": []})
+    assert store.approx_len() == 1
+    assert len(store) == 2
+    assert store.approx_len() == 2